@@ -1,79 +1,100 @@
 import streamlit as st
-import pandas as pd
 import os
-import hashlib
-from github import Github
+import sys
+import importlib
 
 # --- CORRECTED IMPORTS USING YOUR FILE NAMES ---
-# IMPORTANT: Removed the non-existent 'user_management' module.
-from views import admin_tool # admin_tool handles login/child/user management
+# Only what the login screen needs is imported up front; each page's module (and the
+# heavy libraries it uses, e.g. plotly or PyGithub) is imported on first navigation.
+from views import admin_tools # admin_tools handles login/child/user management
 from views import database as db # database handles persistence and will be used for analytics
-from views import dashboard, planner, tracker # These map to progress_charts, session_planning, progress_tracking
+from views import perf # per-rerun timings (off unless enabled)
+from views import scheduler # background auto-save, compaction and aggregate refresh
 # ---------------------------------------------
 
 
-# --- NEW FUNCTION TO COMMIT CHANGES TO GITHUB ---
-def commit_to_github():
-    """Uses PyGithub to commit the local CSV files back to the repository."""
+# --- PAGE REGISTRY ---
+# Menu label -> (roles allowed, module, function). Menus list the pages in this order.
+PAGES = {
+    "Dashboard": (('admin', 'staff', 'parent'), 'views.dashboard', 'show_dashboard_page'),
+    "Progress Tracking": (('admin', 'staff', 'parent'), 'views.tracker', 'show_progress_tracking'),
+    "Session Planning": (('admin', 'staff'), 'views.planner', 'show_session_planning'),
+    "Data & Analytics": (('admin', 'staff'), 'views.database', 'show_data_analytics'),
+    "Search": (('admin', 'staff'), 'views.search', 'show_search_page'),
+    "Reports": (('admin', 'staff'), 'views.reports', 'show_reports_page'),
+    "User Management": (('admin',), 'views.admin_tools', 'show_user_management'),
+    "Child Management": (('admin',), 'views.admin_tools', 'show_child_management'),
+    "Centers": (('admin',), 'views.centers', 'show_centers_overview'),
+    "Performance": (('admin',), 'views.perf', 'show_perf_panel'),
+}
+
+def pages_for_role(role):
+    """Menu labels available to a role, in menu order."""
+    return [label for label, (roles, _module, _function) in PAGES.items() if role in roles] or ["Dashboard"]
+
+def show_page(label, role):
+    """Imports the page's module (once per process) and renders the page."""
+    roles, module_name, function_name = PAGES[label]
+    if role not in roles:
+        st.error("Access Denied. You do not have permission to view this page.")
+        return
+    st.header(label)
+    with perf.span(f"page:{label}"):
+        getattr(importlib.import_module(module_name), function_name)()
 
-    # Check if running in Streamlit Cloud (where GITHUB_TOKEN is available)
-    if "GITHUB_TOKEN" not in st.secrets:
-        st.error("Error: GITHUB_TOKEN not found in secrets. Cannot save to GitHub.")
-        return False
 
-    try:
-        # 1. Initialize GitHub connection
-        g = Github(st.secrets["GITHUB_TOKEN"])
-        
-        # Use the environment variable to get the current repo name (Format: owner/repo)
-        repo_name = os.environ["STREAMLIT_GITHUB_REPO"]
-        repo = g.get_repo(repo_name)
-        
-        # 2. Iterate through data files and commit
-        files_to_commit = [f for f in os.listdir("data") if f.endswith(".csv")]
-        
-        for file_name in files_to_commit:
-            full_path = os.path.join("data", file_name)
-            
-            # Read the content of the file saved on the Streamlit server
-            with open(full_path, "r") as file:
-                content = file.read()
-
-            # Get the existing file SHA to update it (required by GitHub API)
-            try:
-                # Get the existing file contents object
-                contents = repo.get_contents(full_path, ref="main")
-                
-                # Update the file
-                repo.update_file(
-                    path=contents.path, 
-                    message=f"AUTO-SAVE: Updated {file_name} from Streamlit app", 
-                    content=content, 
-                    sha=contents.sha, 
-                    branch="main"
-                )
-            except Exception:
-                # If file doesn't exist, create it 
-                repo.create_file(
-                    path=full_path, 
-                    message=f"AUTO-SAVE: Created {file_name} from Streamlit app", 
-                    content=content, 
-                    branch="main"
-                )
-
-        st.session_state["save_status"] = "✅ Successfully saved all data to GitHub!"
+# --- NEW FUNCTION TO COMMIT CHANGES TO GITHUB ---
+def configure_auto_sync():
+    """Hands the GitHub secrets to the background scheduler, which then saves changes
+    on its own a little while after each burst of edits. Returns False if not configured."""
+    if scheduler.sync_enabled():
         return True
+    try:
+        token = st.secrets["GITHUB_TOKEN"] if "GITHUB_TOKEN" in st.secrets else None
+    except FileNotFoundError:
+        token = None # No secrets.toml (local development)
+    # Use the environment variable to get the current repo name (Format: owner/repo)
+    repo_name = os.environ.get("STREAMLIT_GITHUB_REPO")
+    if not token or not repo_name:
+        return False
+    # Secrets are read here, on the script thread, and handed to the scheduler
+    scheduler.configure_sync(token, repo_name)
+    return True
 
-    except Exception as e:
-        # st.exception(e) # Uncomment for detailed error logging
-        st.session_state["save_status"] = f"❌ Error saving to GitHub: {e.__class__.__name__}. Check token permissions."
+def commit_to_github():
+    """Queues a background commit of the changed CSV files back to the repository.
+
+    Covers the user's center and the shared users table. Only files whose contents
+    differ from the last sync are sent, one commit per folder (see views/github_sync.py).
+    Returns immediately; progress shows in the sidebar.
+    """
+    if not configure_auto_sync():
+        st.session_state["save_status"] = "❌ Error saving to GitHub: GITHUB_TOKEN or STREAMLIT_GITHUB_REPO is not set."
         return False
+
+    # Runs on the scheduler thread straight away, coalesced with any pending auto-save.
+    # Until that run starts, the sidebar says it is queued.
+    st.session_state["save_queued_after"] = _sync_job_status()['runs']
+    scheduler.sync_now({db.current_center(), None})
+    st.session_state["save_status"] = "🕒 Save queued..."
+    return True
+
+def _sync_job_status():
+    return next(job for job in scheduler.status() if job['job'] == 'github_sync')
 # --- END NEW FUNCTION ---
 
 
 def main():
     """Main function to run the TILP Connect App."""
+    # Each rerun is one trace; the label is read at the end, after navigation
+    with perf.trace(lambda: st.session_state.get('menu_selection') if st.session_state.get('authenticated') else "Login",
+                    lambda: st.session_state.get('username')):
+        _run()
+
+def _run():
     st.set_page_config(layout="wide", page_title="TILP Connect App", page_icon="🧩")
+    scheduler.start()
+    configure_auto_sync()
 
     # --- INITIAL SETUP & STATE MANAGEMENT ---
     
@@ -91,12 +112,15 @@ def main():
     if 'child_link' not in st.session_state:
         st.session_state['child_link'] = 'All'
 
+    # Every read and write of this rerun goes to the user's center (see views/database.py)
+    db.set_center(st.session_state.get('center'))
+
 
     # --- AUTHENTICATION ---
     
     if not st.session_state['authenticated']:
-        # Calls the login function from your admin_tool module
-        admin_tool.show_login_page() 
+        # Calls the login function from your admin_tools module
+        admin_tools.show_login_page()
         return
 
     # --- SIDEBAR LAYOUT & MENU ---
@@ -104,32 +128,8 @@ def main():
         st.title("TILP Connect 🧩")
         st.header(f"Welcome, {st.session_state['username']}!")
         
-        # Determine available menu options based on role
-        if st.session_state['user_role'] == 'admin':
-            menu_options = [
-                "Dashboard", 
-                "Progress Tracking", 
-                "Session Planning", 
-                "Data & Analytics", 
-                "User Management", # Keep the menu option
-                "Child Management"
-            ]
-        # ... (other roles remain the same)
-        elif st.session_state['user_role'] == 'staff':
-            menu_options = [
-                "Dashboard", 
-                "Progress Tracking", 
-                "Session Planning",
-                "Data & Analytics"
-            ]
-        elif st.session_state['user_role'] == 'parent':
-            menu_options = [
-                "Dashboard", 
-                "Progress Tracking", 
-                "Data & Analytics"
-            ]
-        else: # Should not happen
-             menu_options = ["Dashboard"]
+        # Determine available menu options based on role (see PAGES)
+        menu_options = pages_for_role(st.session_state['user_role'])
 
         # Menu Selection
         st.session_state['menu_selection'] = st.radio(
@@ -138,9 +138,21 @@ def main():
             index=menu_options.index(st.session_state['menu_selection']) if st.session_state['menu_selection'] in menu_options else 0
         )
 
+        # Admins can work in any center; everyone else stays in their own
+        if st.session_state['user_role'] == 'admin':
+            centers = db.list_centers()
+            if len(centers) > 1:
+                current = st.session_state.get('center')
+                selected = st.selectbox("Center", centers, format_func=db.center_label,
+                                        index=centers.index(current) if current in centers else 0)
+                if selected != current:
+                    st.session_state['center'] = selected
+                    st.session_state['child_link'] = 'All'
+                    db.set_center(selected)
+
         # Child Filter (Available to all roles who can see data)
         if st.session_state['user_role'] in ['admin', 'staff']:
-            children_df = db.get_data('children')
+            children_df = db.get_data('children', columns=['child_name'])
             child_names = children_df['child_name'].tolist()
             child_filter_list = ['All'] + sorted(child_names)
             
@@ -153,14 +165,19 @@ def main():
                 index=default_index
             )
         else: # Parents only see their own children
-            st.session_state['child_link'] = st.session_state.get('child_link', 'All') # Default to what was set during login
+            child_names = list(db.current_scope())
+            if len(child_names) > 1:
+                default_index = child_names.index(st.session_state['child_link']) if st.session_state['child_link'] in child_names else 0
+                st.session_state['child_link'] = st.selectbox("Select Child", child_names, index=default_index)
+            else:
+                st.session_state['child_link'] = child_names[0] if child_names else 'All'
 
         
         # --- LOGOUT BUTTON ---
         st.sidebar.markdown("---")
         if st.button("Logout"):
-            # Calls the logout function from your admin_tool module
-            admin_tool.logout_user()
+            # Calls the logout function from your admin_tools module
+            admin_tools.logout_user()
 
 
         # --- DATA MANAGEMENT (GITHUB SAVE) ---
@@ -168,59 +185,37 @@ def main():
         st.sidebar.subheader("💾 Data Persistence")
 
         if st.sidebar.button("Save Data to GitHub Permanently"):
-            with st.spinner("Committing changes to repository..."):
-                commit_to_github()
+            commit_to_github()
                 
         # Display the result of the save operation
+        sync_job = _sync_job_status()
+        queued_after = st.session_state.get("save_queued_after")
+        if queued_after is not None and (sync_job['runs'] > queued_after or sync_job['state'] == 'running'):
+            # The queued save has started: its own status says more from here on
+            st.session_state.pop("save_queued_after")
+            st.session_state.pop("save_status", None)
         if "save_status" in st.session_state:
             st.sidebar.info(st.session_state["save_status"])
+            if "save_queued_after" in st.session_state and st.sidebar.button("Refresh save status"):
+                st.rerun()
+        elif 'views.github_sync' in sys.modules:
+            # Nothing to report until a save was requested in this process
+            sync_status = sys.modules['views.github_sync'].get_status()
+            if sync_status['message']:
+                st.sidebar.info(sync_status['message'])
+                if sync_status['state'] == 'running' and st.sidebar.button("Refresh save status"):
+                    st.rerun()
+
+        # Pending auto-save (see views/scheduler.py)
+        if scheduler.sync_enabled() and sync_job['next_run_in'] is not None and sync_job['state'] != 'running':
+            if sync_job['failures']:
+                st.sidebar.caption(f"⚠️ Auto-save failed ({sync_job['last_error']}); retrying in {sync_job['next_run_in']:.0f} s.")
+            else:
+                st.sidebar.caption(f"🕒 Recent changes are auto-saved in {sync_job['next_run_in']:.0f} s.")
 
 
     # --- PAGE ROUTING ---
-    
-    if st.session_state['menu_selection'] == 'Dashboard':
-        st.header("Dashboard")
-        
-        # Only show charts if a specific child is selected
-        if st.session_state['child_link'] != 'All':
-            # Uses your dashboard module
-            dashboard.display_child_dashboard(st.session_state['child_link'])
-        else:
-            st.info("Select a child from the filter to view their individual dashboard.")
-            
-    elif st.session_state['menu_selection'] == 'Progress Tracking':
-        st.header("Progress Tracking")
-        # Uses your tracker module
-        tracker.show_progress_tracking()
-        
-    elif st.session_state['menu_selection'] == 'Session Planning':
-        st.header("Session Planning")
-        # Uses your planner module
-        planner.show_session_planning()
-
-    elif st.session_state['menu_selection'] == 'Data & Analytics':
-        if st.session_state['user_role'] in ['admin', 'staff']:
-            st.header("Data & Analytics")
-            # Uses your database module (or the correct module)
-            db.show_data_analytics() 
-        else:
-            st.error("Access Denied. You do not have permission to view this page.")
-
-    elif st.session_state['menu_selection'] == 'User Management':
-        if st.session_state['user_role'] == 'admin':
-            st.header("User Management")
-            # Since user_management.py doesn't exist, we assume this function is in admin_tool.py
-            admin_tool.show_user_management() 
-        else:
-            st.error("Access Denied. You do not have permission to view this page.")
-
-    elif st.session_state['menu_selection'] == 'Child Management':
-        if st.session_state['user_role'] == 'admin':
-            st.header("Child Management")
-            # Uses your admin_tool module
-            admin_tool.show_child_management()
-        else:
-            st.error("Access Denied. You do not have permission to view this page.")
+    show_page(st.session_state['menu_selection'], st.session_state['user_role'])
 
 
 # Run the application
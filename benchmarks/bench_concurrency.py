@@ -0,0 +1,99 @@
+# benchmarks/bench_concurrency.py (Stress test: many sessions inserting progress notes at once)
+#
+# Usage: python -m benchmarks.bench_concurrency [--threads 1,4,16] [--notes 200] [--processes 1] [--backend csv]
+#
+# Every thread stands in for a staff member saving notes. After each run the table is
+# re-read from disk by a fresh backend and checked for lost rows and duplicate ids.
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+import pandas as pd
+
+
+def _insert_notes(data_dir, backend, thread_count, notes, tag):
+    """Runs `thread_count` threads that each add `notes` progress rows. Returns failures."""
+    os.environ["TILP_STORAGE_BACKEND"] = backend
+    from views import database as db
+    db.DATA_DIR = data_dir
+    failures = []
+
+    def session(number):
+        for i in range(notes):
+            row = {'date': '2024-01-01', 'child_name': 'Stress Child', 'discipline': 'OT',
+                   'goal_area': 'Fine Motor', 'status': 'Met Goal', 'notes': f"{tag}-{number}-{i}"}
+            if not db.add_data('progress', row):
+                failures.append(row['notes'])
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(failures)
+
+def _process_main(args):
+    return _insert_notes(*args)
+
+def _check(data_dir, backend, expected):
+    """Reads the table back with a new backend and verifies every note is there once."""
+    from views import storage
+    if backend == 'sqlite':
+        reader = storage.SQLiteBackend(os.path.join(data_dir, "tilp.db"), data_dir)
+    else:
+        reader = storage.CSVBackend(data_dir)
+    progress = reader.read('progress')
+    lost = expected - len(progress)
+    duplicate_ids = int(progress['id'].duplicated().sum())
+    duplicate_notes = int(progress['notes'].duplicated().sum())
+    return len(progress), lost, duplicate_ids, duplicate_notes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', default="1,4,16", help="comma-separated concurrent session counts")
+    parser.add_argument('--notes', type=int, default=200, help="notes saved per session")
+    parser.add_argument('--processes', type=int, default=1, help="app processes sharing the data folder")
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    args = parser.parse_args(argv)
+
+    ok = True
+    for thread_count in [int(n) for n in args.threads.split(',')]:
+        data_dir = tempfile.mkdtemp(prefix="tilp_stress_")
+        try:
+            pd.DataFrame(columns=['username', 'password', 'role', 'child_link']).to_csv(
+                os.path.join(data_dir, "users.csv"), index=False)
+            pd.DataFrame([{'id': 1, 'child_name': 'Stress Child', 'parent_username': '', 'date_of_birth': '2018-01-01'}]).to_csv(
+                os.path.join(data_dir, "children.csv"), index=False)
+            pd.DataFrame(columns=['id', 'date', 'child_name', 'discipline', 'goal_area', 'status', 'notes', 'media_path']).to_csv(
+                os.path.join(data_dir, "progress.csv"), index=False)
+            if args.backend == 'sqlite':
+                from views import storage
+                storage.migrate_csv_to_sqlite(data_dir, os.path.join(data_dir, "tilp.db"))
+
+            jobs = [(data_dir, args.backend, thread_count, args.notes, f"p{p}") for p in range(args.processes)]
+            start = time.perf_counter()
+            if args.processes == 1:
+                failures = _insert_notes(*jobs[0])
+            else:
+                with multiprocessing.get_context('spawn').Pool(args.processes) as pool:
+                    failures = sum(pool.map(_process_main, jobs))
+            elapsed = time.perf_counter() - start
+
+            expected = thread_count * args.notes * args.processes
+            rows, lost, duplicate_ids, duplicate_notes = _check(data_dir, args.backend, expected)
+            good = failures == 0 and lost == 0 and duplicate_ids == 0 and duplicate_notes == 0
+            ok = ok and good
+            print(f"{args.processes} x {thread_count:3d} sessions: {expected} notes in {elapsed:6.2f} s "
+                  f"({expected / elapsed:8.1f} notes/s)   rows {rows}   lost {lost}   "
+                  f"duplicate ids {duplicate_ids}   {'OK' if good else 'FAILED'}")
+        finally:
+            shutil.rmtree(data_dir)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
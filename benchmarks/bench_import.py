@@ -0,0 +1,81 @@
+# benchmarks/bench_import.py (Bulk import of historical progress notes vs. one form save per note)
+#
+# Usage: python -m benchmarks.bench_import [--rows 100000] [--backend csv]
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+def _write_fixtures(data_dir, rows, children=200):
+    names = [f"Child {i}" for i in range(children)]
+    pd.DataFrame(columns=['username', 'password', 'role', 'child_link']).to_csv(os.path.join(data_dir, "users.csv"), index=False)
+    pd.DataFrame({'id': range(1, children + 1), 'child_name': names, 'parent_username': '',
+                  'date_of_birth': '2018-01-01'}).to_csv(os.path.join(data_dir, "children.csv"), index=False)
+    pd.DataFrame({'name': ['OT', 'SLP', 'ABA']}).to_csv(os.path.join(data_dir, "disciplines.csv"), index=False)
+    pd.DataFrame({'name': ['Fine Motor', 'Communication', 'Social']}).to_csv(os.path.join(data_dir, "goal_areas.csv"), index=False)
+    pd.DataFrame(columns=['id', 'date', 'child_name', 'discipline', 'goal_area', 'status', 'notes', 'media_path']).to_csv(
+        os.path.join(data_dir, "progress.csv"), index=False)
+
+    rng = np.random.default_rng(0)
+    source = pd.DataFrame({
+        'date': (pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), unit='D')).strftime('%Y-%m-%d'),
+        'child_name': rng.choice(names, rows),
+        'discipline': rng.choice(['OT', 'SLP', 'ABA'], rows),
+        'goal_area': rng.choice(['Fine Motor', 'Communication', 'Social'], rows),
+        'status': rng.choice(['Met Goal', 'Working Towards', 'Not Observed'], rows),
+        'notes': "Imported note",
+    })
+    # A few rows that must be rejected
+    source.loc[::1000, 'child_name'] = "Nobody"
+    path = os.path.join(tempfile.gettempdir(), f"tilp_import_{os.getpid()}.csv")
+    source.to_csv(path, index=False)
+    return path, int((source['child_name'] == "Nobody").sum())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--form-saves', type=int, default=200, help="single saves timed for comparison")
+    args = parser.parse_args(argv)
+
+    os.environ["TILP_STORAGE_BACKEND"] = args.backend
+    from views import database as db
+    from views import bulk, storage
+
+    data_dir = tempfile.mkdtemp(prefix="tilp_import_")
+    source_path, bad_rows = _write_fixtures(data_dir, args.rows)
+    try:
+        db.DATA_DIR = data_dir
+        if args.backend == 'sqlite':
+            storage.migrate_csv_to_sqlite(data_dir, os.path.join(data_dir, db.SQLITE_FILE))
+
+        start = time.perf_counter()
+        imported, rejected = bulk.import_rows('progress', source_path, source_path)
+        elapsed = time.perf_counter() - start
+        assert imported == args.rows - bad_rows and len(rejected) == bad_rows, (imported, len(rejected))
+        ids = db.get_data('progress', columns=['id'])['id']
+        assert len(ids) == imported and ids.is_unique
+        print(f"bulk import: {imported} notes in {elapsed:6.2f} s ({imported / elapsed:9.0f} notes/s), {len(rejected)} rejected")
+
+        row = {'date': '2024-01-01', 'child_name': 'Child 1', 'discipline': 'OT', 'goal_area': 'Social', 'status': 'Met Goal'}
+        start = time.perf_counter()
+        for _ in range(args.form_saves):
+            db.add_data('progress', dict(row))
+        per_save = (time.perf_counter() - start) / args.form_saves
+        print(f"form saves:  {per_save * 1000:6.2f} ms per note -> {per_save * args.rows / 60:8.1f} min for {args.rows} notes")
+
+        start = time.perf_counter()
+        size = sum(len(part) for part in bulk.export_chunks('progress', child_name='Child 1'))
+        print(f"export one child: {size / 1024:8.1f} KiB in {(time.perf_counter() - start) * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(data_dir)
+        os.remove(source_path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,93 @@
+# benchmarks/bench_login.py (Login lookup and password-verification latency under concurrent sessions)
+#
+# Usage: python -m benchmarks.bench_login [--users 5000] [--iterations 600000] [--sessions 1,4,16]
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import statistics
+import threading
+import pandas as pd
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=None, help="PBKDF2 iterations (default: the app's setting)")
+    parser.add_argument('--sessions', default="1,4,16", help="comma-separated concurrent session counts")
+    parser.add_argument('--logins', type=int, default=8, help="logins per session")
+    args = parser.parse_args(argv)
+
+    if args.iterations:
+        os.environ["TILP_PASSWORD_ITERATIONS"] = str(args.iterations)
+    from views import database as db
+    from views import admin_tools
+
+    data_dir = tempfile.mkdtemp(prefix="tilp_login_")
+    try:
+        db.DATA_DIR = data_dir
+        legacy = hashlib.sha256(b"secret").hexdigest()
+        users = pd.DataFrame({
+            'username': [f"user{i}" for i in range(args.users)],
+            'password': [legacy] * args.users,
+            'role': 'staff',
+            'child_link': 'All',
+        })
+        users.to_csv(os.path.join(data_dir, "users.csv"), index=False)
+        target = f"user{args.users - 1}"
+
+        # 1. Lookup: the old boolean-mask scan vs the username index
+        users_df = db.get_data('users')
+        start = time.perf_counter()
+        for _ in range(200):
+            users_df[users_df['username'] == target]
+        scan_us = (time.perf_counter() - start) / 200 * 1e6
+        db.get_user_index()
+        start = time.perf_counter()
+        for _ in range(200):
+            db.get_user(target)
+        index_us = (time.perf_counter() - start) / 200 * 1e6
+        print(f"user lookup ({args.users} users): mask scan {scan_us:9.1f} us   index {index_us:9.1f} us")
+
+        # 2. Rehash-on-login migration
+        start = time.perf_counter()
+        assert admin_tools.authenticate(target, "secret") is not None
+        migrate_ms = (time.perf_counter() - start) * 1000
+        assert db.get_user(target)['password'].startswith(admin_tools.PASSWORD_ALGORITHM)
+        print(f"first login with legacy hash (verify + rehash + write): {migrate_ms:8.1f} ms")
+
+        # 3. Concurrent logins
+        print(f"PBKDF2 iterations: {admin_tools.PASSWORD_ITERATIONS}, hashing workers: {admin_tools.PASSWORD_WORKERS}")
+        for sessions in [int(n) for n in args.sessions.split(',')]:
+            latencies = []
+            lock = threading.Lock()
+
+            def session():
+                for _ in range(args.logins):
+                    start = time.perf_counter()
+                    assert admin_tools.authenticate(target, "secret") is not None
+                    with lock:
+                        latencies.append((time.perf_counter() - start) * 1000)
+
+            threads = [threading.Thread(target=session) for _ in range(sessions)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            print(f"{sessions:3d} sessions: p50 {statistics.median(latencies):8.1f} ms   "
+                  f"p95 {_percentile(latencies, 0.95):8.1f} ms   {len(latencies) / elapsed:7.1f} logins/s")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,249 @@
+# benchmarks/bench_suite.py (Database layer and page computations on synthetic data at several scales)
+#
+# Usage: python -m benchmarks.bench_suite [--scales 1k,100k,1m] [--backends csv,sqlite]
+#                                         [--output results.json] [--baseline old.json] [--tolerance 1.25]
+#
+# Each scale gets a fresh temporary DATA_DIR with generated users, children, progress
+# notes and session plans. Streamlit runs in bare mode, so the page code executes
+# without a browser and its st.* calls do nothing. Results are written as JSON; with
+# --baseline each case is compared to the same case in an earlier file, and the exit
+# status is 1 if any case got slower than the tolerance allows.
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import numpy as np
+import pandas as pd
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+DISCIPLINES = ['OT', 'SLP', 'ABA', 'PT', 'Music']
+GOAL_AREAS = ['Fine Motor', 'Communication', 'Social', 'Self Care', 'Regulation', 'Gross Motor']
+STATUSES = ['Met Goal', 'Working Towards', 'Not Observed', 'Regressed']
+WORDS = ("child used visual schedule during transition with minimal prompting and moved to the next "
+         "activity calmly peer turn taking improved sensory break requested independently fine motor "
+         "tracing practice completed attention sustained for ten minutes communication board used").split()
+
+
+# --- SYNTHETIC DATA ---
+
+def _text(rng, count, words):
+    """`count` random sentences of about `words` words each."""
+    picks = rng.choice(WORDS, size=(count, words))
+    return [' '.join(row) for row in picks]
+
+def generate(data_dir, progress_rows, children=300, plans=500, users=1000, seed=0):
+    """Writes a full set of table CSVs into `data_dir`. Returns the child names."""
+    rng = np.random.default_rng(seed)
+    names = [f"Child {i:04d}" for i in range(children)]
+    legacy = hashlib.sha256(b"secret").hexdigest()
+
+    parents = [f"parent{i}" for i in range(users - 10)]
+    pd.DataFrame({
+        'username': [f"staff{i}" for i in range(10)] + parents,
+        'password': legacy,
+        'role': ['staff'] * 10 + ['parent'] * len(parents),
+        'child_link': ['All'] * 10 + [names[i % children] for i in range(len(parents))],
+    }).to_csv(os.path.join(data_dir, "users.csv"), index=False)
+    pd.DataFrame({
+        'id': range(1, children + 1), 'child_name': names,
+        'parent_username': [parents[i % len(parents)] for i in range(children)],
+        'date_of_birth': (pd.Timestamp('2016-01-01') + pd.to_timedelta(rng.integers(0, 2000, children), unit='D')).strftime('%Y-%m-%d'),
+    }).to_csv(os.path.join(data_dir, "children.csv"), index=False)
+    pd.DataFrame({'name': DISCIPLINES}).to_csv(os.path.join(data_dir, "disciplines.csv"), index=False)
+    pd.DataFrame({'name': GOAL_AREAS}).to_csv(os.path.join(data_dir, "goal_areas.csv"), index=False)
+
+    # Notes are drawn from a pool, like real notes that reuse the same phrases
+    note_pool = np.array(_text(rng, 2000, 25), dtype=object)
+    pd.DataFrame({
+        'id': np.arange(1, progress_rows + 1),
+        'date': (pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 1500, progress_rows), unit='D')).strftime('%Y-%m-%d'),
+        'child_name': rng.choice(names, progress_rows),
+        'discipline': rng.choice(DISCIPLINES, progress_rows),
+        'goal_area': rng.choice(GOAL_AREAS, progress_rows),
+        'status': rng.choice(STATUSES, progress_rows),
+        'notes': note_pool[rng.integers(0, len(note_pool), progress_rows)],
+        'media_path': '',
+    }).to_csv(os.path.join(data_dir, "progress.csv"), index=False)
+    pd.DataFrame(columns=['id', 'progress_id', 'media_path']).to_csv(os.path.join(data_dir, "progress_media.csv"), index=False)
+
+    # Session plans carry long free text in every activity field
+    plan_fields = ['warm_up', 'learning_block', 'regulation_break', 'social_play', 'closing_routine', 'internal_notes']
+    plans_df = pd.DataFrame({
+        'id': np.arange(1, plans + 1),
+        'date': (pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 1500, plans), unit='D')).strftime('%Y-%m-%d'),
+        'lead_staff': rng.choice([f"staff{i}" for i in range(10)], plans),
+        'support_staff': rng.choice([f"staff{i}" for i in range(10)], plans),
+    })
+    for field in plan_fields:
+        plans_df[field] = _text(rng, plans, 150)
+    plans_df['materials_needed'] = "scissors, glue, visual timer, picture cards"
+    plans_df = plans_df[['id', 'date', 'lead_staff', 'support_staff', 'warm_up', 'learning_block', 'regulation_break',
+                         'social_play', 'closing_routine', 'materials_needed', 'internal_notes']]
+    plans_df.to_csv(os.path.join(data_dir, "session_plans.csv"), index=False)
+    return names
+
+
+# --- TIMING ---
+
+def _measure(function, repeat, setup=None):
+    """Runs `function` `repeat` times (calling `setup` untimed before each). Returns ms per run."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def _result(case, times):
+    times = sorted(times)
+    return {
+        'case': case, 'runs': len(times),
+        'median_ms': round(statistics.median(times), 4),
+        'min_ms': round(times[0], 4),
+        'p95_ms': round(times[min(int(len(times) * 0.95), len(times) - 1)], 4),
+    }
+
+def run_scale(scale, rows, backend, repeat):
+    """Generates one data set and times every case on it. Returns a list of results."""
+    os.environ["TILP_STORAGE_BACKEND"] = backend
+    from views import database as db
+    from views import storage, analytics, dashboard, relations
+
+    db.STORAGE_BACKEND = backend
+    data_dir = tempfile.mkdtemp(prefix=f"tilp_bench_{scale}_")
+    results = []
+
+    def case(name, function, repeat=repeat, setup=None):
+        results.append(_result(name, _measure(function, repeat, setup)))
+        print(f"  {scale:>5} {backend:<6} {name:<28} {results[-1]['median_ms']:10.2f} ms")
+
+    try:
+        names = generate(data_dir, rows)
+        db.DATA_DIR = data_dir
+        if backend == 'sqlite':
+            storage.migrate_csv_to_sqlite(data_dir, os.path.join(data_dir, db.SQLITE_FILE))
+        rng = np.random.default_rng(1)
+        child = names[len(names) // 2]
+
+        # Reads: the very first load parses the CSV; later cold loads can use snapshots
+        case('get_data.first', lambda: db.get_data('progress'), repeat=1)
+        case('get_data.cold', lambda: db.get_data('progress'), setup=lambda: db.clear_cache('progress'))
+        case('get_data.warm', lambda: db.get_data('progress'))
+        case('get_data.columns', lambda: db.get_data('progress', columns=['id', 'date', 'child_name', 'status']))
+        case('get_data.session_plans', lambda: db.get_data('session_plans'), setup=lambda: db.clear_cache('session_plans'))
+        case('query.child_recent', lambda: db.query('progress', filters={'child_name': child}, order_by='date',
+                                                     ascending=False, limit=5))
+        case('query_page.search', lambda: db.query_page('progress', limit=25, order_by='date', ascending=False,
+                                                         search='sensory'))
+
+        # Login: building the username index, then lookups against it
+        case('login.index_build', lambda: db.get_user_index(), setup=lambda: db._USER_INDEXES.clear())
+        case('login.lookup', lambda: db.get_user('parent500'))
+
+        # Page computations, with fresh summaries each run
+        def reset_summaries():
+            analytics._SUMMARIES.clear()
+        case('analytics.summary_build', analytics.get_summary, setup=reset_summaries)
+        case('analytics.cohort_overview', analytics.cohort_overview, setup=lambda: analytics.get_summary().derived.clear())
+        case('analytics.attainment', lambda: analytics.attainment('goal_area', child))
+        case('dashboard.child', lambda: dashboard.display_child_dashboard(child))
+
+        # Writes (relation index and summaries are built by the reads above)
+        relations.get_index()
+        row = {'date': '2024-06-01', 'child_name': child, 'discipline': 'OT', 'goal_area': 'Social',
+               'status': 'Met Goal', 'notes': 'Benchmark note', 'media_path': ''}
+        case('add_data', lambda: db.add_data('progress', dict(row)))
+        ids = iter(rng.choice(np.arange(1, rows + 1), size=repeat * 2, replace=False).tolist())
+        case('update_data', lambda: db.update_data('progress', next(ids), {'status': 'Working Towards'}))
+        case('delete_data', lambda: db.delete_data('progress', next(ids)))
+        case('get_data.after_writes', lambda: db.get_data('progress'), setup=lambda: db.clear_cache('progress'))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return [{'scale': scale, 'rows': rows, 'backend': backend, **result} for result in results]
+
+
+# --- RESULTS ---
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def compare(results, baseline, tolerance, min_ms=0.5):
+    """Prints each case's change against `baseline`. Returns the cases slower than `tolerance`.
+
+    Cases that take under `min_ms` either way are too noisy to call a regression.
+    """
+    old = {(r['scale'], r['backend'], r['case']): r for r in baseline['results']}
+    regressions = []
+    print(f"\ncompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('created')}):")
+    for result in results:
+        previous = old.get((result['scale'], result['backend'], result['case']))
+        if previous is None or previous['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / previous['median_ms']
+        slower = ratio > tolerance and result['median_ms'] >= min_ms
+        flag = "  SLOWER" if slower else ("  faster" if ratio < 1 / tolerance and previous['median_ms'] >= min_ms else "")
+        print(f"  {result['scale']:>5} {result['backend']:<6} {result['case']:<28} "
+              f"{previous['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:5.2f}{flag}")
+        if slower:
+            regressions.append(result)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scales', default="1k,100k", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument('--backends', default="csv", help="comma-separated: csv, sqlite")
+    parser.add_argument('--repeat', type=int, default=7, help="timed runs per case")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON file from an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=1.25, help="slowdown ratio reported as a regression")
+    parser.add_argument('--min-ms', type=float, default=0.5, help="cases faster than this are never flagged")
+    args = parser.parse_args(argv)
+
+    # Bare-mode Streamlit warns on every st.* call made outside a running app
+    from streamlit import config, logger
+    config.set_option('logger.level', 'error')
+    logger.set_log_level('error')
+    os.environ.setdefault("TILP_PASSWORD_ITERATIONS", "1000")
+
+    results = []
+    for backend in args.backends.split(','):
+        for scale in args.scales.split(','):
+            results.extend(run_scale(scale, SCALES[scale], backend, args.repeat))
+
+    report = {'meta': _metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"\nresults written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance, args.min_ms):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,60 @@
+# benchmarks/bench_sync.py (Checks the GitHub sync against the fake client and counts API calls)
+#
+# Usage: python -m benchmarks.bench_sync
+import os
+import time
+import shutil
+import tempfile
+from views import github_sync
+from benchmarks.fake_github import FakeGithub, FakeRepo
+
+
+def _write(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+def main():
+    data_dir = tempfile.mkdtemp(prefix="tilp_sync_")
+    try:
+        tables = [f"table_{i}" for i in range(7)]
+        for name in tables:
+            _write(os.path.join(data_dir, f"{name}.csv"), "id,value\n1,a\n")
+
+        repo = FakeRepo()
+        client = FakeGithub(repo)
+
+        def sync(label):
+            repo.calls.clear()
+            start = time.perf_counter()
+            result = github_sync.sync_data(repo, data_dir)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:<32} committed={len(result['committed']):>2}  api_calls={len(repo.calls):>2}  {elapsed:7.2f} ms")
+            return result
+
+        first = sync("first sync (7 new files)")
+        assert len(first['committed']) == 7 and len(repo.calls) == 6
+
+        second = sync("no changes")
+        assert second['committed'] == [] and repo.calls == []
+
+        _write(os.path.join(data_dir, "table_3.csv"), "id,value\n1,a\n2,b\n")
+        third = sync("one file changed")
+        assert third['committed'] == [github_sync._repo_path(data_dir, "table_3.csv")]
+        assert len(repo.calls) == 6
+        assert repo.head_files()[third['committed'][0]].endswith("2,b\n")
+
+        # Full path as the scheduler runs it: status reports success with the one file
+        _write(os.path.join(data_dir, "table_5.csv"), "id,value\n9,z\n")
+        start = time.perf_counter()
+        result = github_sync.run_sync("token", "owner/repo", data_dir, client_factory=lambda token: client)
+        print(f"{'run_sync':<32} committed={len(result['committed']):>2}  {(time.perf_counter() - start) * 1000:7.2f} ms")
+        status = github_sync.get_status()
+        print(f"{'status':<32} {status['state']}: {status['message']}")
+        assert status['state'] == 'success' and len(status['files']) == 1
+        print("OK")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/fake_github.py (In-memory stand-in for the parts of PyGithub the sync uses)
+import hashlib
+import itertools
+from types import SimpleNamespace
+from views.github_sync import git_blob_sha
+
+_counter = itertools.count(1)
+
+def _new_sha(prefix):
+    return hashlib.sha1(f"{prefix}-{next(_counter)}".encode()).hexdigest()
+
+
+class FakeRef:
+    def __init__(self, repo, name, sha):
+        self._repo = repo
+        self.ref = name
+        self.object = SimpleNamespace(sha=sha)
+
+    def edit(self, sha, force=False):
+        self._repo.calls.append('ref.edit')
+        self.object = SimpleNamespace(sha=sha)
+        self._repo.refs[self.ref] = sha
+
+
+class FakeRepo:
+    """Keeps commits, trees and blobs in dicts and logs every API call in `calls`."""
+
+    def __init__(self, files=None, branch="main"):
+        self.calls = []
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        tree_sha = self._store_tree({path: self._store_blob(content) for path, content in (files or {}).items()})
+        root = _new_sha('commit')
+        self.commits[root] = SimpleNamespace(sha=root, tree=SimpleNamespace(sha=tree_sha), parents=[], message="initial")
+        self.refs = {f"refs/heads/{branch}": root}
+
+    def _store_blob(self, content):
+        content = content.encode() if isinstance(content, str) else content
+        sha = git_blob_sha(content)
+        self.blobs[sha] = content
+        return sha
+
+    def _store_tree(self, entries):
+        sha = _new_sha('tree')
+        self.trees[sha] = dict(entries)
+        return sha
+
+    # --- API surface used by views/github_sync.py ---
+
+    def get_git_ref(self, ref):
+        self.calls.append('get_git_ref')
+        name = f"refs/{ref}"
+        return FakeRef(self, name, self.refs[name])
+
+    def get_git_commit(self, sha):
+        self.calls.append('get_git_commit')
+        return self.commits[sha]
+
+    def get_git_tree(self, sha, recursive=False):
+        self.calls.append('get_git_tree')
+        entries = [SimpleNamespace(path=path, sha=blob, type='blob') for path, blob in self.trees[sha].items()]
+        return SimpleNamespace(sha=sha, tree=entries)
+
+    def create_git_tree(self, tree, base_tree=None):
+        self.calls.append('create_git_tree')
+        entries = dict(self.trees[base_tree.sha]) if base_tree is not None else {}
+        for element in tree:
+            identity = element._identity
+            entries[identity['path']] = self._store_blob(identity['content'])
+        return SimpleNamespace(sha=self._store_tree(entries))
+
+    def create_git_commit(self, message, tree, parents):
+        self.calls.append('create_git_commit')
+        sha = _new_sha('commit')
+        self.commits[sha] = SimpleNamespace(sha=sha, tree=tree, parents=parents, message=message)
+        return self.commits[sha]
+
+    # --- helpers for checks ---
+
+    def head_files(self, branch="main"):
+        """Returns {path: text} at the tip of `branch`."""
+        tree = self.trees[self.commits[self.refs[f"refs/heads/{branch}"]].tree.sha]
+        return {path: self.blobs[sha].decode() for path, sha in tree.items()}
+
+
+class FakeGithub:
+    """Drop-in for `github.Github(token)`; every repo name maps to the same FakeRepo."""
+
+    def __init__(self, repo=None):
+        self.repo = repo or FakeRepo()
+
+    def get_repo(self, name):
+        return self.repo
@@ -0,0 +1,87 @@
+# benchmarks/profile_imports.py (Import-time profile of app.py and time to the login screen)
+#
+# Usage: python -m benchmarks.profile_imports [--runs 3] [--top 15]
+#
+# Each run starts a fresh interpreter, so the numbers match a cold start. The import
+# profile comes from `python -X importtime`; the login-screen timings render app.py
+# with Streamlit's AppTest (first run, then a rerun of the same session).
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_RENDER_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=60)
+ready = time.perf_counter()
+at.run()
+first = time.perf_counter()
+at.run()
+rerun = time.perf_counter()
+import sys
+print(json.dumps({
+    'first_run_ms': (first - ready) * 1000,
+    'rerun_ms': (rerun - first) * 1000,
+    'views_loaded': sorted(m for m in sys.modules if m.startswith('views.')),
+    'heavy_loaded': sorted(m for m in ('github', 'plotly.graph_objects', 'sqlalchemy', 'pyarrow', 'PIL.Image') if m in sys.modules),
+    'errors': [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def import_profile():
+    """Returns ({module: cumulative us}, total us) for `import app` in a fresh interpreter."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, capture_output=True, text=True)
+    cumulative, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _self, cum, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(cum)
+        if not name.startswith('  '):
+            # Top-level imports: their cumulative times add up to the whole import
+            total += int(cum)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return cumulative, total
+
+def render_login():
+    result = subprocess.run([sys.executable, '-c', _RENDER_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    totals = [total for _profile, total in profiles]
+    print(f"import app: median {statistics.median(totals) / 1000:8.1f} ms over {args.runs} cold runs")
+
+    profile = profiles[-1][0]
+    print(f"\nslowest modules (cumulative, last run):")
+    for name, cum in sorted(profile.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+    print("\nview modules imported by app.py: " + ", ".join(sorted(n for n in profile if n.startswith('views.'))))
+
+    renders = [render_login() for _ in range(args.runs)]
+    print(f"\nlogin screen: first run median {statistics.median(r['first_run_ms'] for r in renders):8.1f} ms, "
+          f"rerun median {statistics.median(r['rerun_ms'] for r in renders):8.1f} ms")
+    print("  view modules loaded: " + ", ".join(renders[-1]['views_loaded']))
+    print("  heavy dependencies loaded: " + (", ".join(renders[-1]['heavy_loaded']) or "none"))
+    if renders[-1]['errors']:
+        print("  errors: " + "; ".join(renders[-1]['errors']))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
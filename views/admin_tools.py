@@ -1,51 +1,157 @@
-# views/admin_tool.py (Handles Authentication, User, and Child Management)
+# views/admin_tools.py (Handles Authentication, User, and Child Management)
 import streamlit as st
 import pandas as pd
+import os
+import hmac
+import base64
 import hashlib
 import uuid
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from views import database as db # CRITICAL: To read/write user and child data
+from views import relations
+from views import perf
+from views.components import paginated_table
 
 # --- AUTHENTICATION FUNCTIONS ---
 
-def hash_password(password):
-    """Hashes a password using SHA256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+# Passwords are stored as "pbkdf2_sha256$<iterations>$<salt>$<hash>". Raise the iteration
+# count over time; older hashes (and legacy unsalted SHA-256 hex digests) are upgraded
+# the next time their owner logs in.
+PASSWORD_ALGORITHM = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = int(os.environ.get("TILP_PASSWORD_ITERATIONS", 600_000))
+
+# Hashes are computed on a pool with one worker per CPU, off the script thread: the
+# login form shows "Signing in..." and polls the result, so a queue of logins never
+# holds up a session's reruns (hashlib releases the GIL while it works).
+PASSWORD_WORKERS = int(os.environ.get("TILP_PASSWORD_WORKERS", os.cpu_count() or 1))
+_HASH_POOL = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password-hash")
+LOGIN_POLL_SECONDS = 0.25
+
+_DUMMY_HASH = None
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+def hash_password(password, iterations=None):
+    """Hashes a password with salted PBKDF2-HMAC-SHA256."""
+    iterations = iterations or PASSWORD_ITERATIONS
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f"{PASSWORD_ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}"
+
+def verify_password(password, stored_hash):
+    """Checks a password against a stored hash. Returns (matches, needs_rehash)."""
+    if not isinstance(stored_hash, str):
+        return False, False
+    if stored_hash.startswith(PASSWORD_ALGORITHM + "$"):
+        try:
+            _algorithm, iterations, salt, digest = stored_hash.split("$")
+            iterations = int(iterations)
+            expected = base64.b64decode(digest)
+            actual = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), iterations)
+        except ValueError:
+            return False, False
+        return hmac.compare_digest(actual, expected), iterations < PASSWORD_ITERATIONS
+    # Legacy: unsalted SHA-256 hex digest
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, stored_hash), True
+
+def _check_credentials(password, stored_hash):
+    """Runs on the hashing pool. Returns (matches, new hash if the stored one is outdated)."""
+    matches, needs_rehash = verify_password(password, stored_hash)
+    return matches, (hash_password(password) if matches and needs_rehash else None)
+
+def authenticate_async(username, password):
+    """Starts checking a login on the hashing pool.
+
+    Returns a Future of (user row or None, version of the users table the row was
+    read at, new hash or None); pass its result to finish_authentication.
+    """
+    version = db.table_version('users')[0]
+    user = db.get_user(username)
+
+    def check():
+        global _DUMMY_HASH
+        if user is not None:
+            stored_hash = user['password']
+        else:
+            # Unknown users still pay for one hash, so timing doesn't reveal which names exist
+            _DUMMY_HASH = _DUMMY_HASH or hash_password(uuid.uuid4().hex)
+            stored_hash = _DUMMY_HASH
+        matches, new_hash = _check_credentials(password, stored_hash)
+        return (user if user is not None and matches else None), version, new_hash
+    return _HASH_POOL.submit(check)
+
+def finish_authentication(username, result):
+    """Returns the user's row if the login succeeded, else None.
+
+    A successful login with an outdated hash stores the fresh one, unless the users
+    table changed since the row was read (the upgrade is retried at the next login).
+    """
+    user, version, new_hash = result
+    if user is not None and new_hash is not None:
+        db.update_data('users', username, {'password': new_hash}, expected_version=version)
+    return user
+
+@perf.timed("auth.authenticate")
+def authenticate(username, password):
+    """Checks a login and waits for the answer (see authenticate_async)."""
+    return finish_authentication(username, authenticate_async(username, password).result())
 
 def show_login_page():
     """Displays the login form."""
     st.title("Login to TILP Connect App")
-    
+
+    if '_login_pending' in st.session_state:
+        _await_login()
+        return
+
     with st.form("login_form"):
         username = st.text_input("Username")
         password = st.text_input("Password", type="password")
         submitted = st.form_submit_button("Login")
         
         if submitted:
-            users_df = db.get_data('users')
-            
             # Check if user exists and password matches
-            if users_df.empty:
+            if not db.get_user_index():
                 st.error("No users found. Please contact the administrator.")
                 return
 
-            hashed_input = hash_password(password)
-            
-            user_data = users_df[users_df['username'] == username]
-            
-            if not user_data.empty and user_data['password'].iloc[0] == hashed_input:
-                st.session_state['authenticated'] = True
-                st.session_state['username'] = username
-                st.session_state['user_role'] = user_data['role'].iloc[0]
-                st.session_state['child_link'] = user_data['child_link'].iloc[0] # For parents
-                st.success(f"Welcome, {username}!")
-                st.rerun()
-            else:
-                st.error("Invalid Username or Password")
+            # The password is checked on the hashing pool; _await_login picks up the answer
+            st.session_state['_login_pending'] = (username, authenticate_async(username, password))
+            st.rerun()
+
+    if st.session_state.pop('_login_failed', False):
+        st.error("Invalid Username or Password")
+
+@st.fragment(run_every=LOGIN_POLL_SECONDS)
+def _await_login():
+    """Shows "Signing in..." until the pending login's hash is done, then logs in."""
+    username, future = st.session_state['_login_pending']
+    if not future.done():
+        st.info("Signing in...")
+        return
+    del st.session_state['_login_pending']
+    with perf.span("auth.finish_login"):
+        user_data = finish_authentication(username, future.result())
+
+    if user_data is not None:
+        st.session_state['authenticated'] = True
+        st.session_state['username'] = username
+        st.session_state['user_role'] = user_data['role']
+        st.session_state['child_link'] = user_data['child_link'] # For parents
+        # The center whose data this user works with (blank: the main center)
+        center = user_data.get('center')
+        st.session_state['center'] = center if isinstance(center, str) and center else None
+    else:
+        st.session_state['_login_failed'] = True
+    st.rerun()
 
 def logout_user():
     """Logs out the current user."""
-    keys_to_delete = ['authenticated', 'username', 'user_role', 'menu_selection', 'child_link']
+    keys_to_delete = ['authenticated', 'username', 'user_role', 'menu_selection', 'child_link', 'center',
+                      '_principal_views', '_progress_summaries']
     for key in keys_to_delete:
         if key in st.session_state:
             del st.session_state[key]
@@ -75,7 +181,7 @@ def show_child_management():
         if submitted:
             if not child_name or not parent_username:
                 st.error("Child Name and Parent Username are required.")
-            elif db.get_data('users')[db.get_data('users')['username'] == parent_username].empty:
+            elif not db.user_exists(parent_username):
                 st.error(f"User '{parent_username}' does not exist. Please create the parent account first.")
             else:
                 new_child = {
@@ -89,14 +195,20 @@ def show_child_management():
                     st.error("Failed to add child.")
 
     st.markdown("#### 👶 Existing Children")
-    children_df = db.get_data('children')
+    children_df = db.get_data('children', columns=['id'])
     if not children_df.empty:
-        st.dataframe(children_df)
+        paginated_table('children', key="children_table", default_sort='child_name', ascending=True)
         
         # Simple Delete functionality
         child_to_delete = st.selectbox("Select Child to Delete (ID)", [''] + children_df['id'].unique().astype(str).tolist(), key="del_child")
+        if child_to_delete:
+            # Progress notes and their media go with the child
+            progress_ids, media_ids = relations.dependents(int(child_to_delete))
+            if progress_ids:
+                st.warning(f"This also deletes {len(progress_ids)} progress note(s) and {len(media_ids)} media file record(s).")
         if child_to_delete and st.button("Delete Selected Child", key="del_child_btn"):
-            if db.delete_data('children', int(child_to_delete)):
+            deleted = relations.delete_child(int(child_to_delete))
+            if deleted and deleted['children']:
                 st.success("Child deleted successfully! Click 'Save Data to GitHub Permanently'.")
                 st.rerun()
             else:
@@ -134,7 +246,7 @@ def show_child_management():
 # --- USER MANAGEMENT FUNCTIONS (Placeholder) ---
 
 # Since you don't have a separate user_management.py, we assume this function
-# is also located in admin_tool.py.
+# is also located in admin_tools.py.
 def show_user_management():
     """Displays forms to add/manage users (Admin role only)."""
     st.subheader("Manage Users (Staff/Parent Accounts)")
@@ -150,16 +262,21 @@ def show_user_management():
             new_role = st.selectbox("Role", ['staff', 'parent', 'admin'])
             # Only required for parent accounts (parent needs to be linked to a child)
             child_link_id = st.text_input("Child Link (e.g., All or specific child ID for parent)")
+            new_center = st.text_input("Center (blank for the main center)", value=db.current_center() or "")
         
         submitted = st.form_submit_button("Create User")
 
         if submitted:
-            if db.get_data('users')[db.get_data('users')['username'] == new_username].empty:
+            new_center = new_center.strip()
+            if new_center and not db.valid_center_name(new_center):
+                st.error("Center names may only contain letters, digits, '-' and '_'.")
+            elif not db.user_exists(new_username):
                 new_user = {
                     'username': new_username,
                     'password': hash_password(new_password),
                     'role': new_role,
-                    'child_link': child_link_id if new_role == 'parent' else 'All' 
+                    'child_link': child_link_id if new_role == 'parent' else 'All',
+                    'center': new_center or None,
                 }
                 if db.add_data('users', new_user):
                     st.success(f"User '{new_username}' created successfully! Click 'Save Data to GitHub Permanently'.")
@@ -169,10 +286,8 @@ def show_user_management():
                 st.error("Username already exists.")
 
     st.markdown("#### 📝 Existing Users")
-    users_df = db.get_data('users')
-    if not users_df.empty:
+    if db.get_columns('users'):
         # Hide passwords before displaying
-        display_df = users_df.drop(columns=['password'], errors='ignore')
-        st.dataframe(display_df)
+        paginated_table('users', key="users_table", default_sort='username', ascending=True, hide_columns=['password'])
     else:
         st.info("No user accounts found.")
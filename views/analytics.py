@@ -0,0 +1,263 @@
+# views/analytics.py (Vectorized progress metrics for the Dashboard and Data & Analytics pages)
+import threading
+import streamlit as st
+import pandas as pd
+from views import database as db
+
+STATUS_MET = "Met Goal"
+
+# A "goal" is one child working on one goal area within one discipline
+GOAL_KEYS = ['child_name', 'discipline', 'goal_area']
+PROGRESS_COLUMNS = ['id', 'date', 'child_name', 'discipline', 'goal_area', 'status']
+DAILY_KEYS = ['child_name', 'day', 'discipline', 'goal_area', 'status']
+TRANSITION_KEYS = GOAL_KEYS + ['month', 'from_status', 'to_status']
+
+_SUMMARIES = {} # data dir -> ProgressSummary
+_LOCK = threading.Lock()
+
+
+# --- HELPER FUNCTIONS ---
+
+def _prepare(df):
+    """Keeps the columns the metrics need, drops undated rows and orders by observation."""
+    df = df[[c for c in PROGRESS_COLUMNS if c in df.columns]]
+    df = df[df['date'].notna()] if 'date' in df.columns else df.iloc[0:0]
+    df = df.assign(day=df['date'].dt.normalize())
+    return df.sort_values(['date', 'id'], kind='stable')
+
+def _add_counts(frames, keys):
+    """Adds up 'count' over identical keys (how the incremental refresh merges summaries)."""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=keys + ['count'])
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.groupby(keys, observed=True, dropna=False, sort=False)['count'].sum().reset_index()
+
+def _daily_counts(df):
+    return df.groupby(DAILY_KEYS, observed=True, dropna=False, sort=False).size().rename('count').reset_index()
+
+def _transition_counts(df, counted):
+    """Counts status changes between consecutive observations of the same goal.
+
+    `df` must be ordered by observation; only rows where `counted` is True are counted
+    as the 'to' side (earlier rows just supply the previous status).
+    """
+    previous = df.groupby(GOAL_KEYS, observed=True, dropna=False, sort=False)['status'].shift()
+    mask = previous.notna() & counted
+    transitions = df[mask].assign(
+        month=df.loc[mask, 'day'].dt.to_period('M').dt.to_timestamp(),
+        from_status=previous[mask],
+        to_status=df.loc[mask, 'status'],
+    )
+    return transitions.groupby(TRANSITION_KEYS, observed=True, dropna=False, sort=False).size().rename('count').reset_index()
+
+def _last_status(df):
+    return df.groupby(GOAL_KEYS, observed=True, dropna=False, sort=False).tail(1)[GOAL_KEYS + ['date', 'id', 'status']]
+
+
+# --- SUMMARY FRAMES ---
+
+class ProgressSummary:
+    """Pre-aggregated frames for the whole progress table.
+
+    daily:       notes per child / day / discipline / goal area / status ('count')
+    transitions: status changes per goal and month ('from_status' -> 'to_status', 'count')
+    last_status: the latest observation of every goal
+
+    Every metric below is a small groupby over these frames, so it costs the same
+    whether it is asked for one child or the whole cohort.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.max_id = 0
+        self.daily = pd.DataFrame(columns=DAILY_KEYS + ['count'])
+        self.transitions = pd.DataFrame(columns=TRANSITION_KEYS + ['count'])
+        self.last_status = pd.DataFrame(columns=GOAL_KEYS + ['date', 'id', 'status'])
+        self.derived = {}
+
+    def rebuild(self, progress_df):
+        """Recomputes everything from the full table."""
+        df = _prepare(progress_df)
+        self.daily = _daily_counts(df)
+        self.transitions = _transition_counts(df, pd.Series(True, index=df.index))
+        self.last_status = _last_status(df)
+        self.max_id = int(progress_df['id'].max()) if 'id' in progress_df.columns and not progress_df.empty else 0
+        self.derived = {}
+
+    def extend(self, new_rows):
+        """Folds newly inserted rows into the summaries. Returns False if it can't.
+
+        Notes entered out of order (dated before the goal's latest observation) would
+        reorder earlier transitions, so those need a rebuild instead.
+        """
+        if new_rows.empty:
+            return True
+        df = _prepare(new_rows)
+        if not self.last_status.empty and not df.empty:
+            latest = df.merge(self.last_status[GOAL_KEYS + ['date']], on=GOAL_KEYS, how='inner', suffixes=('', '_last'))
+            if (latest['date'] < latest['date_last']).any():
+                return False
+
+        # Prefix each goal's new rows with its previous observation to count the first change
+        previous = self.last_status.assign(day=self.last_status['date'].dt.normalize())
+        combined = pd.concat([previous, df], ignore_index=True)
+        counted = pd.Series([False] * len(previous) + [True] * len(df))
+
+        self.daily = _add_counts([self.daily, _daily_counts(df)], DAILY_KEYS)
+        self.transitions = _add_counts([self.transitions, _transition_counts(combined, counted)], TRANSITION_KEYS)
+        self.last_status = _last_status(combined)
+        self.max_id = max(self.max_id, int(new_rows['id'].max()))
+        self.derived = {}
+        return True
+
+    def cached(self, key, compute):
+        """Memoizes a derived frame until the summaries change."""
+        if key not in self.derived:
+            self.derived[key] = compute()
+        return self.derived[key]
+
+
+def get_summary():
+    """Returns the summaries for the current data folder, refreshing them if progress changed.
+
+    For a parent they cover only their own children (see db.current_scope).
+    """
+    scope = db.current_scope()
+    if scope is not None:
+        return _scoped_summary(scope)
+    return _shared_summary()
+
+def _shared_summary():
+    """Summaries over all children, shared by every staff session."""
+    key = db.get_data_dir()
+    version, rewrite_version = db.table_version('progress')
+    with _LOCK:
+        summary = _SUMMARIES.setdefault(key, ProgressSummary())
+        if summary.version == version:
+            return summary
+
+        progress_df = db.get_data('progress', columns=PROGRESS_COLUMNS)
+        if 'id' not in progress_df.columns:
+            summary.rebuild(pd.DataFrame(columns=PROGRESS_COLUMNS))
+        elif summary.version is not None and rewrite_version <= summary.version:
+            # Only inserts since the last refresh: aggregate just the new rows
+            if not summary.extend(progress_df[progress_df['id'] > summary.max_id]):
+                summary.rebuild(progress_df)
+        else:
+            summary.rebuild(progress_df)
+        summary.version = version
+        return summary
+
+def _scoped_summary(scope):
+    """Summaries built from a parent's own rows and kept in their session."""
+    version = db.table_version('progress')[0]
+    summaries = st.session_state.setdefault('_progress_summaries', {})
+    key = (db.get_data_dir(), scope)
+    summary = summaries.get(key)
+    if summary is None or summary.version != version:
+        progress_df = db.get_principal_view('progress', scope)
+        summary = ProgressSummary()
+        summary.rebuild(progress_df[[c for c in PROGRESS_COLUMNS if c in progress_df.columns]])
+        summary.version = version
+        summaries[key] = summary
+    return summary
+
+def refresh():
+    """Brings the shared summaries up to date (e.g. from a background job) and returns them."""
+    return _shared_summary()
+
+
+# --- METRICS ---
+
+def _for_child(df, child_name):
+    return df if child_name is None else df[df['child_name'] == child_name]
+
+def attainment(by='discipline', child_name=None):
+    """Share of observations marked 'Met Goal', per child and `by` ('discipline' or 'goal_area')."""
+    summary = get_summary()
+
+    def compute():
+        daily = summary.daily.assign(met=(summary.daily['status'] == STATUS_MET) * summary.daily['count'])
+        grouped = daily.groupby(['child_name', by], observed=True, dropna=False)
+        result = grouped.agg(total=('count', 'sum'), met=('met', 'sum')).reset_index()
+        result['attainment_rate'] = result['met'] / result['total']
+        return result
+
+    return _for_child(summary.cached(('attainment', by), compute), child_name).reset_index(drop=True)
+
+def status_transitions(child_name=None):
+    """How often goals moved from one status to another, per child and month."""
+    summary = get_summary()
+    return _for_child(summary.transitions, child_name).sort_values(['child_name', 'month']).reset_index(drop=True)
+
+def rollup(freq='W', child_name=None):
+    """Notes per child, period and status. `freq` is a pandas period alias: 'W' or 'M'."""
+    summary = get_summary()
+
+    def compute():
+        daily = summary.daily
+        period = daily['day'].dt.to_period(freq).dt.start_time
+        result = daily.assign(period=period).groupby(['child_name', 'period', 'status'], observed=True, dropna=False)['count'].sum()
+        return result.reset_index().sort_values(['child_name', 'period'])
+
+    return _for_child(summary.cached(('rollup', freq), compute), child_name).reset_index(drop=True)
+
+def last_observations(today=None):
+    """Latest note per child and the number of days since it."""
+    summary = get_summary()
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+
+    def compute():
+        last = summary.last_status.groupby('child_name', observed=True)['date'].max().rename('last_observation')
+        return last.reset_index()
+
+    result = summary.cached('last_observations', compute)
+    return result.assign(days_since_last=(today - result['last_observation'].dt.normalize()).dt.days)
+
+def cohort_overview(today=None, recent_days=30):
+    """One row per child: notes, goal-attainment rate, last observation and recent activity."""
+    summary = get_summary()
+    today = pd.Timestamp(today or pd.Timestamp.today()).normalize()
+
+    def compute():
+        daily = summary.daily
+        recent_start = today - pd.Timedelta(days=recent_days)
+        per_child = daily.assign(
+            met=(daily['status'] == STATUS_MET) * daily['count'],
+            recent=(daily['day'] > recent_start) * daily['count'],
+        ).groupby('child_name', observed=True).agg(
+            total_notes=('count', 'sum'), met=('met', 'sum'), notes_last_30_days=('recent', 'sum')
+        )
+        per_child['attainment_rate'] = per_child['met'] / per_child['total_notes']
+        overview = per_child.drop(columns='met').reset_index()
+        overview = overview.merge(last_observations(today), on='child_name', how='left')
+
+        # Children with no notes yet still belong in the overview
+        scope = db.current_scope()
+        if scope is None:
+            children = db.get_data('children', columns=['child_name'])
+        else:
+            children = pd.DataFrame({'child_name': list(scope)})
+        if 'child_name' in children.columns:
+            overview = children[['child_name']].drop_duplicates().merge(overview, on='child_name', how='left')
+            overview[['total_notes', 'notes_last_30_days']] = overview[['total_notes', 'notes_last_30_days']].fillna(0).astype(int)
+        return overview.sort_values('child_name').reset_index(drop=True)
+
+    children_version = db.table_version('children')
+    return summary.cached(('cohort_overview', today, recent_days, children_version), compute)
+
+def child_metrics(child_name, today=None):
+    """Headline numbers for one child's dashboard."""
+    overview = cohort_overview(today)
+    row = overview[overview['child_name'] == child_name]
+    if row.empty or pd.isna(row['total_notes'].iloc[0]) or row['total_notes'].iloc[0] == 0:
+        return None
+    row = row.iloc[0]
+    return {
+        'total_notes': int(row['total_notes']),
+        'attainment_rate': float(row['attainment_rate']),
+        'last_observation': row['last_observation'],
+        'days_since_last': int(row['days_since_last']),
+        'notes_last_30_days': int(row['notes_last_30_days']),
+    }
@@ -0,0 +1,171 @@
+# views/bulk.py (Streaming bulk import and export of progress notes and session plans)
+import os
+import tempfile
+import streamlit as st
+import pandas as pd
+from views import database as db
+from views import storage
+from views import schema
+from views import relations
+from views import templates
+
+CHUNK_ROWS = 20_000
+
+
+# --- READING ---
+
+def read_chunks(source, file_name, chunk_rows=CHUNK_ROWS):
+    """Yields DataFrames of at most `chunk_rows` rows from a CSV or XLSX file.
+
+    `source` is a path or a file-like object (e.g. from st.file_uploader). CSV values
+    are read as text; types are applied once the rows are validated.
+    """
+    if file_name.lower().endswith(('.xlsx', '.xlsm')):
+        yield from _read_xlsx_chunks(source, chunk_rows)
+    else:
+        yield from pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+
+def _read_xlsx_chunks(source, chunk_rows):
+    # openpyxl is only needed for spreadsheets; its read-only mode streams the rows
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Reading .xlsx files needs the 'openpyxl' package.")
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else '' for c in next(rows, [])]
+        batch = []
+        for values in rows:
+            batch.append(['' if v is None else v for v in values])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+# --- VALIDATION ---
+
+def _reference_sets(table_name):
+    """What rows of `table_name` may refer to, as sets for O(1) membership checks."""
+    if table_name == 'session_plans':
+        return {'template_id': set(templates.get_library().templates)}
+    disciplines = db.get_list_data('disciplines')
+    goal_areas = db.get_list_data('goal_areas')
+    return {
+        'child_name': set(relations.get_index().children_by_name),
+        'discipline': set(disciplines['name']) if 'name' in disciplines.columns else set(),
+        'goal_area': set(goal_areas['name']) if 'name' in goal_areas.columns else set(),
+    }
+
+def validate_chunk(table_name, chunk, references=None):
+    """Splits a chunk into (valid rows, rejected rows with a 'reason' column).
+
+    Every row gets the same schema checks as a form save (see schema.validate), plus
+    the reference checks in `references`.
+    """
+    columns = [c for c in storage.TABLES[table_name] if c != 'id']
+    chunk = chunk.rename(columns=lambda c: str(c).strip()).reindex(columns=columns)
+    chunk = chunk.apply(lambda col: col.str.strip() if pd.api.types.is_string_dtype(col) else col)
+    reason = schema.validate_frame(table_name, chunk)
+
+    for column, known in (references or {}).items():
+        values = chunk[column]
+        if schema.kind_of(table_name, column) == 'int':
+            values = pd.to_numeric(values, errors='coerce')
+        unknown = values.notna() & (values.astype(str) != '') & ~values.isin(known)
+        reason = reason.mask(unknown & (reason == ''), f"unknown {column.replace('_', ' ')}")
+
+    ok = reason == ''
+    dates = pd.to_datetime(chunk['date'][ok], errors='coerce', format='mixed')
+    valid = chunk[ok].assign(date=dates)
+    rejected = chunk[~ok].assign(reason=reason[~ok])
+    return valid, rejected
+
+def import_rows(table_name, source, file_name, chunk_rows=CHUNK_ROWS):
+    """Reads, validates and stores a whole file. Valid rows are saved in one write.
+
+    Returns (number of rows imported, DataFrame of rejected rows with 'line' and 'reason').
+    """
+    references = _reference_sets(table_name)
+    valid_chunks, rejected_chunks = [], []
+    line = 2 # First data row, after the header
+    for chunk in read_chunks(source, file_name, chunk_rows):
+        chunk.index = range(line, line + len(chunk))
+        line += len(chunk)
+        valid, rejected = validate_chunk(table_name, chunk, references)
+        valid_chunks.append(valid)
+        rejected_chunks.append(rejected)
+
+    rejected = pd.concat(rejected_chunks) if rejected_chunks else pd.DataFrame(columns=['reason'])
+    rejected = rejected.rename_axis('line').reset_index()
+    valid = pd.concat(valid_chunks, ignore_index=True) if valid_chunks else pd.DataFrame()
+    if valid.empty:
+        return 0, rejected
+    stored = db.add_many(table_name, valid)
+    return len(stored), rejected
+
+
+# --- EXPORT ---
+
+def export_chunks(table_name, child_name=None, start_date=None, end_date=None, chunk_rows=CHUNK_ROWS):
+    """Yields the matching rows as CSV bytes, `chunk_rows` rows at a time (header first).
+
+    Rows are read from the backend a chunk at a time and come out in stored order.
+    """
+    filters = {'child_name': child_name} if child_name else None
+    yield (','.join(db.get_columns(table_name)) + '\n').encode('utf-8')
+    for chunk in db.iter_chunks(table_name, filters=filters, start_date=start_date, end_date=end_date, chunk_rows=chunk_rows):
+        yield chunk.to_csv(index=False, header=False, date_format='%Y-%m-%d').encode('utf-8')
+
+
+# --- UI ---
+
+def show_bulk_tools(table_name):
+    """Import/export panel for a table, shown under an expander on its page."""
+    label = table_name.replace('_', ' ')
+    with st.expander(f"📦 Bulk import / export {label}"):
+        st.markdown(f"**Import** a CSV or Excel file with the columns: {', '.join(c for c in storage.TABLES[table_name] if c != 'id')}")
+        uploaded = st.file_uploader("File", type=['csv', 'xlsx'], key=f"{table_name}_import_file")
+        if uploaded is not None and st.button("Import Rows", key=f"{table_name}_import_btn"):
+            try:
+                with st.spinner("Importing..."):
+                    imported, rejected = import_rows(table_name, uploaded, uploaded.name)
+            except (ValueError, pd.errors.ParserError) as e:
+                st.error(f"Could not read the file: {e}")
+            else:
+                st.success(f"Imported {imported} row(s). Click 'Save Data to GitHub Permanently' to keep them.")
+                if not rejected.empty:
+                    st.warning(f"{len(rejected)} row(s) were skipped.")
+                    st.dataframe(rejected.head(100), hide_index=True)
+                    st.download_button("Download skipped rows", rejected.to_csv(index=False),
+                                       file_name=f"{table_name}_skipped.csv", key=f"{table_name}_rejects")
+
+        st.markdown("**Export**")
+        col1, col2, col3 = st.columns(3)
+        child_name = None
+        if table_name == 'progress':
+            with col1:
+                children = db.get_data('children', columns=['child_name'])
+                names = sorted(children['child_name'].dropna().unique().tolist()) if 'child_name' in children.columns else []
+                child_name = st.selectbox("Child", ['All'] + names, key=f"{table_name}_export_child")
+                child_name = None if child_name == 'All' else child_name
+        with col2:
+            start_date = st.date_input("From", value=None, key=f"{table_name}_export_start")
+        with col3:
+            end_date = st.date_input("To", value=None, key=f"{table_name}_export_end")
+        if st.button("Prepare Export", key=f"{table_name}_export_btn"):
+            # Written to disk a chunk at a time rather than joined in memory
+            with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as export_file:
+                for part in export_chunks(table_name, child_name, start_date, end_date):
+                    export_file.write(part)
+            try:
+                with open(export_file.name, 'rb') as f:
+                    st.download_button("Download CSV", f, file_name=f"{table_name}_export.csv",
+                                       mime="text/csv", key=f"{table_name}_export_download")
+            finally:
+                os.remove(export_file.name)
@@ -0,0 +1,70 @@
+# views/centers.py (Admin overview across all centers)
+import os
+import streamlit as st
+import pandas as pd
+from views import database as db
+from views import analytics
+
+
+def _folder_size(data_dir):
+    """Bytes of the files directly in a center's folder (tables, change logs, database)."""
+    try:
+        entries = list(os.scandir(data_dir))
+    except OSError:
+        return 0
+    return sum(entry.stat().st_size for entry in entries if entry.is_file())
+
+def center_summary(center, today=None):
+    """Headline numbers for one center, from its own cached progress summaries.
+
+    Returns (one-row dict, attainment per discipline).
+    """
+    with db.use_center(center):
+        overview = analytics.cohort_overview(today)
+        by_discipline = analytics.attainment('discipline')
+        data_dir = db.get_data_dir()
+    notes = int(overview['total_notes'].sum()) if not overview.empty else 0
+    met = int(by_discipline['met'].sum()) if not by_discipline.empty else 0
+    row = {
+        'center': db.center_label(center),
+        'children': len(overview),
+        'progress_notes': notes,
+        'notes_last_30_days': int(overview['notes_last_30_days'].sum()) if not overview.empty else 0,
+        'attainment_rate': met / notes if notes else None,
+        'last_observation': overview['last_observation'].max() if not overview.empty else None,
+        'data_size_kb': round(_folder_size(data_dir) / 1024),
+    }
+    disciplines = by_discipline.groupby('discipline', observed=True)[['total', 'met']].sum().reset_index()
+    return row, disciplines.assign(center=row['center'])
+
+def show_centers_overview():
+    """Admin page: every center side by side (each one is loaded from its own folder)."""
+    st.subheader("All Centers")
+    centers = db.list_centers()
+    rows, disciplines = [], []
+    for center in centers:
+        row, by_discipline = center_summary(center)
+        rows.append(row)
+        disciplines.append(by_discipline)
+
+    overview = pd.DataFrame(rows)
+    totals = {
+        'center': "All centers",
+        'children': overview['children'].sum(),
+        'progress_notes': overview['progress_notes'].sum(),
+        'notes_last_30_days': overview['notes_last_30_days'].sum(),
+        'attainment_rate': None,
+        'last_observation': overview['last_observation'].max(),
+        'data_size_kb': overview['data_size_kb'].sum(),
+    }
+    disciplines = pd.concat(disciplines, ignore_index=True)
+    if totals['progress_notes']:
+        totals['attainment_rate'] = disciplines['met'].sum() / totals['progress_notes']
+    st.dataframe(pd.concat([overview, pd.DataFrame([totals])], ignore_index=True), hide_index=True)
+
+    st.markdown("#### Goal Attainment by Discipline")
+    if disciplines.empty:
+        st.info("No progress notes recorded in any center yet.")
+        return
+    rates = disciplines.assign(rate=disciplines['met'] / disciplines['total'])
+    st.dataframe(rates.pivot_table(index='discipline', columns='center', values='rate', observed=True))
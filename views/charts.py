@@ -0,0 +1,103 @@
+# views/charts.py (Downsampled, memoized Plotly trend charts built from the analytics summaries)
+import threading
+from collections import OrderedDict
+import pandas as pd
+from views import database as db
+from views import analytics
+
+# A series never has more points than this, however long the history
+MAX_POINTS = 120
+
+# Bucket sizes tried from finest to coarsest (pandas period aliases)
+FREQUENCIES = [('D', 'Daily'), ('W', 'Weekly'), ('M', 'Monthly'), ('Q', 'Quarterly')]
+
+RANGE_OPTIONS = {
+    "Last 3 Months": pd.DateOffset(months=3),
+    "Last 12 Months": pd.DateOffset(years=1),
+    "All Time": None,
+}
+
+METRICS = {
+    'attainment_rate': "Goal Attainment Rate",
+    'count': "Progress Notes",
+}
+
+_FIGURES = OrderedDict() # memo key -> plotly Figure
+_FIGURE_LIMIT = 64
+_LOCK = threading.Lock()
+
+
+def choose_frequency(start, end):
+    """Picks the finest bucket size that keeps a date range under MAX_POINTS points."""
+    span_days = max((pd.Timestamp(end) - pd.Timestamp(start)).days, 0) + 1
+    days_per_bucket = {'D': 1, 'W': 7, 'M': 30.4, 'Q': 91.3}
+    for freq, _label in FREQUENCIES:
+        if span_days / days_per_bucket[freq] <= MAX_POINTS:
+            return freq
+    return FREQUENCIES[-1][0]
+
+def trend_series(child_name, group_by='discipline', start=None, end=None):
+    """Notes and attainment rate per time bucket for one child, split by `group_by`.
+
+    Works from the pre-aggregated daily counts, so the cost depends on the number of
+    days with notes, not the number of notes. Returns (frame, frequency).
+    """
+    daily = analytics.get_summary().daily
+    daily = daily[daily['child_name'] == child_name]
+    if start is not None:
+        daily = daily[daily['day'] >= pd.Timestamp(start)]
+    if end is not None:
+        daily = daily[daily['day'] <= pd.Timestamp(end)]
+    if daily.empty:
+        return pd.DataFrame(columns=['bucket', group_by, 'count', 'met', 'attainment_rate']), 'D'
+
+    freq = choose_frequency(daily['day'].min(), daily['day'].max())
+    bucketed = daily.assign(
+        bucket=daily['day'].dt.to_period(freq).dt.start_time,
+        met=(daily['status'] == analytics.STATUS_MET) * daily['count'],
+    )
+    series = bucketed.groupby(['bucket', group_by], observed=True, dropna=False)[['count', 'met']].sum().reset_index()
+    series['attainment_rate'] = series['met'] / series['count']
+    return series.sort_values('bucket'), freq
+
+def trend_figure(child_name, group_by='discipline', range_label="All Time", metric='attainment_rate'):
+    """Returns the Plotly figure for a child's trend, memoized by data version and view."""
+    summary = analytics.get_summary()
+    offset = RANGE_OPTIONS.get(range_label)
+    start = pd.Timestamp.today().normalize() - offset if offset is not None else None
+    # Relative ranges move with the calendar, so their window start is part of the key
+    key = (db.get_data_dir(), summary.version, child_name, group_by, range_label, metric, start)
+    with _LOCK:
+        if key in _FIGURES:
+            _FIGURES.move_to_end(key)
+            return _FIGURES[key]
+
+    series, freq = trend_series(child_name, group_by, start=start)
+    figure = _build_figure(series, group_by, metric, dict(FREQUENCIES)[freq])
+
+    with _LOCK:
+        _FIGURES[key] = figure
+        while len(_FIGURES) > _FIGURE_LIMIT:
+            _FIGURES.popitem(last=False)
+    return figure
+
+def _build_figure(series, group_by, metric, frequency_label):
+    # Plotly is only needed once a chart is drawn
+    import plotly.graph_objects as go
+
+    figure = go.Figure()
+    for name, group in series.groupby(group_by, observed=True, dropna=False, sort=True):
+        figure.add_trace(go.Scatter(
+            x=group['bucket'], y=group[metric], name=str(name),
+            mode='lines+markers', customdata=group[['count']],
+            hovertemplate="%{x|%Y-%m-%d}<br>%{y}<br>%{customdata[0]} note(s)<extra>%{fullData.name}</extra>",
+        ))
+    figure.update_layout(
+        title=f"{METRICS[metric]} ({frequency_label})",
+        legend_title=group_by.replace('_', ' ').title(),
+        margin=dict(l=10, r=10, t=40, b=10),
+        height=360,
+    )
+    if metric == 'attainment_rate':
+        figure.update_yaxes(tickformat='.0%', range=[0, 1.05])
+    return figure
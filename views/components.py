@@ -0,0 +1,71 @@
+# views/components.py (Shared UI widgets used by several pages)
+import math
+import streamlit as st
+from views import database as db
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+def paginated_table(table_name, key, filters=None, default_sort='date', ascending=False,
+                    hide_columns=None, query=None):
+    """Displays one page of a table with search, sorting and Previous/Next controls.
+
+    Only the rows on the current page are fetched (see db.query_page) and sent to the
+    browser, so the page stays fast however large the table grows. `query`, if given,
+    replaces db.query_page (same arguments) for tables shown differently from how
+    they are stored.
+    """
+    hide_columns = hide_columns or []
+    all_columns = [c for c in db.get_columns(table_name) if c not in hide_columns]
+    if not all_columns:
+        st.info("Table is empty or failed to load.")
+        return
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search = st.text_input("Search", key=f"{key}_search", placeholder="Type to filter rows...")
+    with col2:
+        sort_index = all_columns.index(default_sort) if default_sort in all_columns else 0
+        order_by = st.selectbox("Sort By", all_columns, index=sort_index, key=f"{key}_sort")
+    with col3:
+        direction = st.selectbox("Order", ["Descending", "Ascending"], index=1 if ascending else 0, key=f"{key}_dir")
+    with col4:
+        page_size = st.selectbox("Rows", PAGE_SIZES, index=1, key=f"{key}_size")
+
+    # Go back to the first page whenever the view changes
+    view = (search, order_by, direction, page_size, repr(filters))
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_page"] = 0
+    page = st.session_state.get(f"{key}_page", 0)
+
+    def fetch(page):
+        return (query or db.query_page)(
+            table_name, offset=page * page_size, limit=page_size, order_by=order_by,
+            ascending=direction == "Ascending", search=search.strip() or None,
+            filters=filters, columns=all_columns,
+        )
+
+    rows, total = fetch(page)
+    page_count = max(math.ceil(total / page_size), 1)
+    if page > page_count - 1:
+        # Rows were deleted since the page was chosen: show the last page there is
+        page = st.session_state[f"{key}_page"] = page_count - 1
+        rows, total = fetch(page)
+        page_count = max(math.ceil(total / page_size), 1)
+    if total == 0:
+        st.info("No matching rows." if search else "No rows found.")
+        return
+
+    st.dataframe(rows, hide_index=True)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", key=f"{key}_prev", disabled=page == 0):
+            st.session_state[f"{key}_page"] = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1} of {page_count} ({total} rows)")
+    with col3:
+        if st.button("Next ▶", key=f"{key}_next", disabled=page >= page_count - 1):
+            st.session_state[f"{key}_page"] = page + 1
+            st.rerun()
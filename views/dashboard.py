@@ -2,36 +2,81 @@
 import streamlit as st
 import pandas as pd
 from views import database as db # Required to fetch data
+from views import analytics # Precomputed progress metrics
+from views import charts # Downsampled Plotly trend charts
+from views import media # Photo/video gallery
+from views import relations # Parent -> children lookups
+
+def show_dashboard_page():
+    """The Dashboard page: the child picked in the sidebar, if any."""
+    if st.session_state.get('user_role') == 'parent':
+        show_my_children()
+    if st.session_state.get('child_link', 'All') != 'All':
+        display_child_dashboard(st.session_state['child_link'])
+    else:
+        st.info("Select a child from the filter to view their individual dashboard.")
+
+def show_my_children():
+    """The children linked to the logged-in parent, from the relationship index."""
+    username = st.session_state.get('username')
+    user = db.get_user(username) or {}
+    children = relations.children_of(username, user.get('child_link'))
+    if len(children) > 1:
+        st.markdown("#### My Children")
+        st.dataframe(children[['child_name', 'date_of_birth']], hide_index=True)
 
 def display_child_dashboard(child_name):
     """
     Displays the dashboard for a single selected child.
-    NOTE: This is a placeholder. You need to implement your chart logic here.
+    Metrics come from the precomputed summaries in views/analytics.py.
     """
-    st.subheader(f"Dashboard for: {child_name}")
-
-    progress_df = db.get_data('progress')
-    
-    if progress_df.empty:
-        st.info("No progress data available yet.")
+    scope = db.current_scope()
+    if scope is not None and child_name not in scope:
+        st.error("Access Denied. You can only view your own child's dashboard.")
         return
 
-    # Filter data for the selected child
-    child_progress_df = progress_df[progress_df['child_name'] == child_name]
+    st.subheader(f"Dashboard for: {child_name}")
 
-    if child_progress_df.empty:
+    metrics = analytics.child_metrics(child_name)
+    if metrics is None:
         st.info(f"No progress entries found for {child_name}.")
         return
 
-    # --- Example Visualization Placeholder ---
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Progress Notes", metrics['total_notes'])
+    col2.metric("Goal Attainment", f"{metrics['attainment_rate']:.0%}")
+    col3.metric("Notes (Last 30 Days)", metrics['notes_last_30_days'])
+    col4.metric("Days Since Last Note", metrics['days_since_last'])
+
     st.markdown("#### Progress Trend")
-    # You would typically use plotly or matplotlib here.
-    
-    # Example: Simple count of unique disciplines
-    discipline_counts = child_progress_df['discipline'].value_counts().reset_index()
-    discipline_counts.columns = ['Discipline', 'Count']
-    
-    st.bar_chart(discipline_counts, x='Discipline', y='Count')
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        group_label = st.selectbox("Group By", ["Discipline", "Goal Area"], key="trend_group")
+    with col2:
+        metric = st.selectbox("Metric", list(charts.METRICS), format_func=charts.METRICS.get, key="trend_metric")
+    with col3:
+        range_label = st.selectbox("Date Range", list(charts.RANGE_OPTIONS), index=len(charts.RANGE_OPTIONS) - 1, key="trend_range")
+    group_by = 'discipline' if group_label == "Discipline" else 'goal_area'
+    st.plotly_chart(charts.trend_figure(child_name, group_by, range_label, metric))
+
+    st.markdown("#### Goal Attainment by Discipline")
+    by_discipline = analytics.attainment('discipline', child_name)
+    st.bar_chart(by_discipline, x='discipline', y='attainment_rate')
+
+    st.markdown("#### Goal Attainment by Goal Area")
+    st.dataframe(analytics.attainment('goal_area', child_name).drop(columns='child_name'), hide_index=True)
+
+    st.markdown("#### Status Changes")
+    transitions = analytics.status_transitions(child_name)
+    transitions = transitions[transitions['from_status'].astype(str) != transitions['to_status'].astype(str)]
+    if transitions.empty:
+        st.caption("No goal has changed status yet.")
+    else:
+        st.dataframe(transitions.drop(columns='child_name').sort_values('month', ascending=False, kind='stable'),
+                     hide_index=True)
     
+    st.markdown("#### Media")
+    media.show_gallery(child_name)
+
     st.markdown("#### Recent Progress Notes")
-    st.dataframe(child_progress_df.sort_values(by='date', ascending=False).head(5))
+    st.dataframe(db.query('progress', filters={'child_name': child_name}, order_by='date', ascending=False, limit=5))
@@ -1,57 +1,295 @@
 # views/database.py (UPDATED for GitHub CSV Persistence)
 import pandas as pd
 import os
+import re
+import threading
+from contextlib import contextmanager
 import streamlit as st # CRITICAL: Needed for st.secrets and st.error
+from views import storage
+from views import schema
+from views import perf
 
 DATA_DIR = "data"
 
-def init_db():
+# --- STORAGE BACKEND ---
+# 'csv' (default) keeps one CSV file per table in DATA_DIR. 'sqlite' keeps the tables in
+# a SQLite file (migrate once with `python -m views.storage migrate`) and exports CSVs
+# only when syncing to GitHub.
+STORAGE_BACKEND = os.environ.get("TILP_STORAGE_BACKEND", "csv")
+SQLITE_FILE = "tilp.db"
+
+_BACKENDS = {}
+_BACKEND_LOCK = threading.Lock()
+
+# --- CENTERS ---
+# Each center (clinic) keeps its tables in its own folder, DATA_DIR/centers/<center>, so
+# a session loads, caches and syncs only its own center's rows. Users are shared: the
+# users table always lives in DATA_DIR itself and a user's 'center' column says which
+# folder they work in. A blank center means DATA_DIR, so a single-clinic install keeps
+# its data where it always was.
+CENTERS_DIR = "centers"
+GLOBAL_TABLES = {'users'}
+CENTER_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+_center = threading.local() # the center this thread works in (set per rerun by app.py)
+
+
+def init_db(data_dir=None):
     """Ensure the data directory exists (local development only)."""
     # In Streamlit Cloud, the 'data' directory is already created by Git checkout
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+    data_dir = data_dir or DATA_DIR
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+def valid_center_name(center):
+    """True for names usable as a center folder (letters, digits, '-' and '_')."""
+    return bool(CENTER_NAME.match(center or ''))
+
+def center_dir(center):
+    """The data folder of a center (DATA_DIR itself for the blank/main center)."""
+    if not center:
+        return DATA_DIR
+    if not valid_center_name(center):
+        raise ValueError(f"Invalid center name: {center!r}")
+    return os.path.join(DATA_DIR, CENTERS_DIR, center)
+
+def set_center(center):
+    """Makes this thread work in `center` (None for the main center) until changed."""
+    _center.name = center or None
+
+def current_center():
+    return getattr(_center, 'name', None)
+
+@contextmanager
+def use_center(center):
+    """Temporarily works in another center (cross-center views, background jobs)."""
+    previous = current_center()
+    set_center(center)
+    try:
+        yield
+    finally:
+        set_center(previous)
+
+def list_centers():
+    """Every center: the main one (None), those with a folder and those named on a user."""
+    centers = set()
+    root = os.path.join(DATA_DIR, CENTERS_DIR)
+    if os.path.isdir(root):
+        centers.update(name for name in os.listdir(root) if valid_center_name(name) and os.path.isdir(os.path.join(root, name)))
+    centers.update(c for c in (user.get('center') for user in get_user_index().values()) if isinstance(c, str) and valid_center_name(c))
+    return [None] + sorted(centers)
+
+def center_label(center):
+    return center or "Main center"
 
 # --- HELPER FUNCTIONS ---
 
-def _get_csv_path(table_name):
-    """Returns the absolute path to a CSV file for a given table name."""
-    return os.path.join(DATA_DIR, f"{table_name}.csv")
+def _detached(df):
+    """A copy of a backend's cached frame that callers may change freely.
+
+    Under copy-on-write (always on from pandas 3.0) a shallow copy shares memory with
+    the cache and a caller's mutation copies first; without it the copy must be deep.
+    """
+    copy_on_write = int(pd.__version__.split('.')[0]) >= 3 or pd.options.mode.copy_on_write is True
+    return df.copy(deep=not copy_on_write)
+
+def _table_dir(table_name=None):
+    """Folder holding `table_name` for the current center (shared tables live in DATA_DIR)."""
+    if table_name in GLOBAL_TABLES:
+        return DATA_DIR
+    return center_dir(current_center())
+
+def _get_backend(table_name=None):
+    """Returns the storage backend holding `table_name` (or the current center's, if
+    no table is given), creating it on first use."""
+    data_dir = _table_dir(table_name)
+    key = (STORAGE_BACKEND, os.path.abspath(data_dir))
+    with _BACKEND_LOCK:
+        backend = _BACKENDS.get(key)
+        if backend is None:
+            init_db(data_dir)
+            # A center folder holds every table except the shared ones
+            tables = None if data_dir == DATA_DIR else {t: c for t, c in storage.TABLES.items() if t not in GLOBAL_TABLES}
+            if STORAGE_BACKEND == 'sqlite':
+                backend = storage.SQLiteBackend(os.path.join(data_dir, SQLITE_FILE), data_dir, tables=tables)
+            else:
+                backend = storage.CSVBackend(data_dir, tables=tables)
+            _BACKENDS[key] = backend
+    return backend
 
-def _load_data(table_name):
-    """Loads a DataFrame from a CSV file."""
-    csv_path = _get_csv_path(table_name)
+def _load_data(table_name, columns=None):
+    """Loads a table from the storage backend (served from its cache when unchanged)."""
     try:
-        df = pd.read_csv(csv_path)
-        # Handle the special case where 'date' columns might need to be parsed
-        if table_name in ['progress', 'session_plans', 'children']:
-            for col in ['date', 'date_of_birth']:
-                if col in df.columns:
-                    # Coerce invalid dates to NaT (Not a Time)
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
+        with perf.span(f"db.read:{table_name}") as span:
+            df = _detached(_get_backend(table_name).read(table_name, columns=columns))
+            span.note(rows=len(df))
         return df
     except FileNotFoundError:
         # This will happen if the initial empty CSV files were not committed to 'data'
-        st.error(f"FATAL: Database file not found: {csv_path}. Please check your 'data' folder.")
+        st.error(f"FATAL: Database table not found: {table_name}. Please check your 'data' folder.")
         return pd.DataFrame()
     except Exception as e:
         # Catches errors like empty files without headers
         st.error(f"Error loading data for {table_name}: {e}. Check file headers.")
         return pd.DataFrame()
 
-def _save_data(df, table_name):
-    """Saves a DataFrame back to its CSV file (temporarily on the server)."""
-    csv_path = _get_csv_path(table_name)
-    # Use index=False to prevent saving the DataFrame row index
-    df.to_csv(csv_path, index=False)
-    # NOTE: The 'Save to GitHub' function in app.py makes this permanent.
+# --- WRITE LISTENERS ---
+# Derived indexes (see views/relations.py) register here to be told about every write,
+# so they can update themselves instead of rebuilding from the whole table.
+_WRITE_LISTENERS = []
+
+def register_write_listener(callback):
+    """Calls `callback(event)` after every successful add/update/delete.
+
+    `event` is a dict with 'data_dir', 'center', 'table', 'op' ('insert', 'update' or 'delete'),
+    'before'/'after' (the table version around the write) and 'rows' (inserts),
+    'key' + 'values' (updates) or 'keys' (deletes).
+    """
+    if callback not in _WRITE_LISTENERS:
+        _WRITE_LISTENERS.append(callback)
+
+def _write(table_name, write):
+    """Runs `write(backend)` holding the table's write lock.
+
+    Returns (result, version before, version after). Reading both versions under the
+    lock ties them to this write alone, even with other sessions writing at once.
+    """
+    backend = _get_backend(table_name)
+    with perf.span(f"db.write:{table_name}"), backend.locked(table_name):
+        before = backend.data_version(table_name)[0]
+        result = write(backend)
+        after = backend.data_version(table_name)[0]
+    return result, before, after
+
+def _notify(table_name, op, before, after, **details):
+    # Called after the lock is released: listeners may read other tables
+    event = {'data_dir': os.path.abspath(_table_dir(table_name)), 'table': table_name, 'op': op,
+             'center': None if table_name in GLOBAL_TABLES else current_center(),
+             'before': before, 'after': after, **details}
+    with perf.span(f"db.listeners:{table_name}"):
+        for callback in list(_WRITE_LISTENERS):
+            callback(event)
+
+# --- USER INDEX ---
+# Login and "does this username exist" checks look users up by name in a dict that is
+# built once per version of the users table, instead of scanning users.csv each time.
+_USER_INDEXES = {} # data dir -> (users table version, {username: user row})
+_USER_INDEX_LOCK = threading.Lock()
+
+def get_user_index():
+    """Returns {username: user row dict}, rebuilt only when the users table changes."""
+    key = os.path.abspath(_table_dir('users'))
+    version = table_version('users')[0]
+    with _USER_INDEX_LOCK:
+        entry = _USER_INDEXES.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+    users_df = _load_data('users')
+    index = {}
+    if 'username' in users_df.columns:
+        for row in users_df.to_dict('records'):
+            # Keep the first row if a username was ever duplicated by hand
+            index.setdefault(row['username'], row)
+    with _USER_INDEX_LOCK:
+        _USER_INDEXES[key] = (version, index)
+    return index
+
+def get_user(username):
+    """Returns the user's row as a dict, or None if there is no such user."""
+    return get_user_index().get(username)
+
+def user_exists(username):
+    """True if a user with this username exists."""
+    return username in get_user_index()
+
+# --- PRINCIPAL VIEWS ---
+# A parent's pages work from their own children's rows only. Those rows are fetched
+# through the child_name index and materialized in the parent's session, so a page
+# load costs in proportion to one family's data and other families' rows never end
+# up in that session. A view is refetched when its table's version moves on.
+SCOPE_COLUMNS = {'progress': 'child_name', 'children': 'child_name'}
+
+def current_scope():
+    """Child names the logged-in user may see, or None for staff and admins (everyone)."""
+    if st.session_state.get('user_role') != 'parent':
+        return None
+    from views import relations
+    username = st.session_state.get('username')
+    user = get_user(username) or {}
+    return tuple(relations.child_names_for_parent(username, user.get('child_link')))
+
+def get_principal_view(table_name, child_names):
+    """The rows of `table_name` belonging to `child_names`, cached in the session."""
+    child_names = tuple(child_names)
+    key = (get_data_dir(), table_name, child_names)
+    version = table_version(table_name)[0]
+    views = st.session_state.setdefault('_principal_views', {})
+    entry = views.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    if child_names:
+        df = query(table_name, filters={SCOPE_COLUMNS[table_name]: list(child_names)})
+    else:
+        df = pd.DataFrame(columns=get_columns(table_name))
+    views[key] = (version, df)
+    return df
+
+def get_data_dir():
+    """Absolute path of the current center's data folder; other modules key their caches by it."""
+    return os.path.abspath(_table_dir())
+
+def table_version(table_name):
+    """Returns (version, rewrite_version) for a table.
+
+    Caches built from a table can compare `version` to know whether they are stale,
+    and if `rewrite_version` is not newer than the version they were built at, only
+    inserts have happened since, so they can be refreshed incrementally.
+    """
+    return _get_backend(table_name).data_version(table_name)
+
+def clear_cache(table_name=None):
+    """Drops cached tables (all of the current center's, or just one)."""
+    _get_backend(table_name).clear_cache(table_name)
+
+def compact_tables():
+    """Folds the current center's pending change logs into its table files (the main
+    center's folder includes the shared tables). Returns the tables compacted."""
+    return _get_backend().compact_all()
+
+def prepare_for_sync():
+    """Brings the current center's CSV files up to date before they are committed to GitHub.
+    Returns the tables whose CSV was left alone because the store had none of its rows."""
+    return _get_backend().export_csv()
+
+def shrunken_tables(min_ratio):
+    """Tables of the current center's folder holding fewer than `min_ratio` of the rows in
+    their CSV file, as {table: (rows stored, rows in the CSV)}. A sync replaces the CSV
+    with the stored table, so a sudden drop is worth a look before it is pushed."""
+    data_dir = _table_dir()
+    backend = _get_backend()
+    found = {}
+    for table_name in storage.TABLES:
+        if table_name in GLOBAL_TABLES and data_dir != DATA_DIR:
+            continue
+        try:
+            on_disk = len(pd.read_csv(os.path.join(data_dir, f"{table_name}.csv"), usecols=[0]))
+            stored = len(backend.read(table_name, columns=[storage.primary_key(table_name)]))
+        except (OSError, ValueError):
+            continue # no CSV (or table) yet: nothing to overwrite
+        if on_disk and stored < on_disk * min_ratio:
+            found[table_name] = (stored, on_disk)
+    return found
 
 
 # --- PUBLIC FUNCTIONS (The API used by the app) ---
-# NOTE: The logic here remains the same as our previous successful CSV migration code.
+# Rows are addressed by their primary key: 'id' for most tables, 'username' for users
+# and 'name' for disciplines/goal_areas.
 
-def get_data(table_name):
-    """Retrieves all data from a specified table (CSV file)."""
-    return _load_data(table_name)
+def get_data(table_name, columns=None):
+    """Retrieves all rows of a table; pass `columns` to load only the ones a view needs."""
+    return _load_data(table_name, columns)
 
 def get_list_data(table_name):
     """A wrapper for get_data, currently only used for disciplines and goal_areas."""
@@ -61,79 +299,179 @@ def get_list_data(table_name):
         return df
     return pd.DataFrame()
 
-def add_data(table_name, new_data):
-    """Adds a new row of data to the specified table."""
-    df = _load_data(table_name)
-    
-    # 1. Determine new ID
-    if table_name not in ['users', 'disciplines', 'goal_areas']: 
-        # Only assign ID if the column exists and the table isn't one of the list tables
-        if 'id' in df.columns:
-            next_id = df['id'].max() + 1 if not df.empty and pd.notna(df['id'].max()) else 1
-            new_data['id'] = next_id
-    
-    # 2. Convert new data to DataFrame row
-    # Ensure new_data keys match df columns if df is not empty
-    # Handle the case where the DF is empty (first insert)
-    columns = df.columns.tolist() if not df.empty else list(new_data.keys())
-    new_row = pd.DataFrame([new_data], columns=columns)
-    
-    # 3. Concatenate and Save
-    updated_df = pd.concat([df, new_row], ignore_index=True)
-    _save_data(updated_df, table_name)
-    
-    return True # Success
+def query(table_name, filters=None, start_date=None, end_date=None, date_column='date',
+          order_by=None, ascending=True, limit=None, columns=None):
+    """Retrieves only the rows a page needs, letting the storage backend do the filtering.
+
+    `filters` maps column -> value (or list of values), e.g. {'child_name': 'Sam'};
+    `start_date`/`end_date` bound `date_column` (inclusive); `order_by`/`limit` return
+    e.g. the newest N rows without sorting the whole table.
+    """
+    try:
+        with perf.span(f"db.query:{table_name}") as span:
+            df = _get_backend(table_name).query(
+                table_name, filters=filters, start_date=start_date, end_date=end_date,
+                date_column=date_column, order_by=order_by, ascending=ascending,
+                limit=limit, columns=columns,
+            )
+            df = _detached(df)
+            span.note(rows=len(df))
+        return df
+    except FileNotFoundError:
+        st.error(f"FATAL: Database table not found: {table_name}. Please check your 'data' folder.")
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"Error querying {table_name}: {e}. Check file headers.")
+        return pd.DataFrame()
+
+def query_page(table_name, offset=0, limit=25, order_by=None, ascending=True,
+               search=None, filters=None, columns=None):
+    """Returns (rows, total matching rows) for one page of a table.
+
+    Sorting, the text `search` (any of the returned `columns`) and `filters` are
+    applied by the storage backend, so only `limit` rows ever reach the page.
+    """
+    try:
+        with perf.span(f"db.page:{table_name}") as span:
+            rows, total = _get_backend(table_name).page(
+                table_name, offset=offset, limit=limit, order_by=order_by, ascending=ascending,
+                search=search, filters=filters, columns=columns,
+            )
+            span.note(rows=len(rows))
+        return _detached(rows), total
+    except FileNotFoundError:
+        st.error(f"FATAL: Database table not found: {table_name}. Please check your 'data' folder.")
+        return pd.DataFrame(), 0
+    except Exception as e:
+        st.error(f"Error loading {table_name}: {e}. Check file headers.")
+        return pd.DataFrame(), 0
+
+def iter_chunks(table_name, filters=None, start_date=None, end_date=None, date_column='date', chunk_rows=50_000):
+    """Yields the matching rows (in stored order) a chunk at a time, so an export never
+    holds the whole table. Same filters as query()."""
+    try:
+        yield from _get_backend(table_name).iter_chunks(
+            table_name, filters=filters, start_date=start_date, end_date=end_date,
+            date_column=date_column, chunk_rows=chunk_rows,
+        )
+    except FileNotFoundError:
+        st.error(f"FATAL: Database table not found: {table_name}. Please check your 'data' folder.")
+
+def get_columns(table_name):
+    """Returns a table's column names without loading its rows."""
+    return _get_backend(table_name).columns(table_name) or []
+
+VERSION_CONFLICT_MESSAGE = "This record was changed by someone else while you were editing. Please reload and try again."
+
+def locked(table_name):
+    """Holds a table's write lock across several writes from this thread, so they
+    land as one edit (the lock is re-entrant)."""
+    return _get_backend(table_name).locked(table_name)
+
+def add_data(table_name, new_data, expected_version=None):
+    """Adds a new row of data to the specified table ('id' is assigned by the backend).
+
+    Rows that break the table's schema (missing required values, bad dates or ids,
+    see views/schema.py) or point at a missing child, parent or progress note are
+    rejected (False), as are inserts whose `expected_version` (see update_data) is no
+    longer current. Blank columns get their defaults. On success the stored row is
+    returned, so callers can use its new 'id'.
+    """
+    # Imported here because views/relations.py itself imports this module
+    from views import relations
+
+    new_data, problem = schema.validate(table_name, new_data)
+    if problem:
+        st.error(f"Can't add to {table_name}: {problem}")
+        return False
+    problem = relations.check_references(table_name, new_data)
+    if problem:
+        st.error(problem)
+        return False
+
+    try:
+        row, before, after = _write(table_name, lambda backend: backend.insert(table_name, new_data, expected_version))
+    except storage.VersionConflict:
+        st.error(VERSION_CONFLICT_MESSAGE)
+        return False
+    _notify(table_name, 'insert', before, after, rows=[row])
+    return row # Success
+
+def add_many(table_name, rows_df):
+    """Adds a DataFrame of rows in a single write (ids are assigned as one block).
+
+    The rows are not checked here; see views/bulk.py for validated imports. Returns
+    the rows as stored.
+    """
+    if rows_df.empty:
+        return rows_df
+    stored, before, after = _write(table_name, lambda backend: backend.insert_many(table_name, rows_df))
+    _notify(table_name, 'insert', before, after, rows=stored.to_dict('records'))
+    return stored
 
 def delete_data(table_name, row_id):
-    """Deletes a row by its 'id'."""
-    df = _load_data(table_name)
-    
-    if 'id' not in df.columns:
-        return False # Cannot delete if no ID column exists
+    """Deletes a row by its primary key (see relations.delete_child for cascading deletes)."""
+    deleted, before, after = _write(table_name, lambda backend: backend.delete(table_name, row_id))
+    if not deleted:
+        return False
+    _notify(table_name, 'delete', before, after, keys=[row_id])
+    return True
 
-    # Filter out the row to be deleted
-    updated_df = df[df['id'] != row_id].copy()
-    
-    # Save the updated DataFrame
-    _save_data(updated_df, table_name)
-    
-    return True # Success
+def delete_many(table_name, row_ids):
+    """Deletes several rows by primary key in one write. Returns the number deleted."""
+    row_ids = list(row_ids)
+    if not row_ids:
+        return 0
+    deleted, before, after = _write(table_name, lambda backend: backend.delete_many(table_name, row_ids))
+    if deleted:
+        _notify(table_name, 'delete', before, after, keys=row_ids)
+    return deleted
 
-def update_data(table_name, row_id, updated_data):
-    """Updates an existing row by its 'id'."""
-    df = _load_data(table_name)
-    
-    if 'id' not in df.columns:
-        return False # Cannot update if no ID column exists
+def update_data(table_name, row_id, updated_data, expected_version=None):
+    """Updates an existing row by its primary key.
 
-    # Find the index of the row to update
-    index_to_update = df[df['id'] == row_id].index
-    
-    if not index_to_update.empty:
-        # Update the row with the new values
-        for key, value in updated_data.items():
-            df.loc[index_to_update, key] = value
-            
-        # Save the updated DataFrame
-        _save_data(df, table_name)
-        return True # Success
-        
-    return False # Row not found
+    Pass the table_version(table_name)[0] the edit was based on as `expected_version`
+    to refuse the update if someone else changed the table in the meantime. Values
+    that break the table's schema are rejected (False).
+    """
+    _checked, problem = schema.validate(table_name, updated_data, partial=True)
+    if problem:
+        st.error(f"Can't update {table_name}: {problem}")
+        return False
+    try:
+        updated, before, after = _write(
+            table_name, lambda backend: backend.update(table_name, row_id, updated_data, expected_version)
+        )
+    except storage.VersionConflict:
+        st.error(VERSION_CONFLICT_MESSAGE)
+        return False
+    if not updated:
+        return False
+    _notify(table_name, 'update', before, after, key=row_id, values=dict(updated_data))
+    return True
 
 def show_data_analytics():
-    """Placeholder function for the Data & Analytics page."""
-    # This assumes the function name is show_data_analytics()
+    """Displays the cohort overview and the raw tables for the Data & Analytics page."""
+    # Imported here because these modules themselves import this one
+    from views import analytics
+    from views.components import paginated_table
+
+    st.markdown("### Cohort Overview")
+    overview = analytics.cohort_overview()
+    if not overview.empty:
+        st.dataframe(overview, hide_index=True)
+        rollup_label = st.radio("Notes per", ["Week", "Month"], horizontal=True)
+        rollup_df = analytics.rollup('W' if rollup_label == "Week" else 'M')
+        if not rollup_df.empty:
+            st.bar_chart(rollup_df.groupby(['period', 'status'], observed=True)['count'].sum().unstack(fill_value=0))
+    else:
+        st.info("No children or progress notes yet.")
+
     st.markdown("### Raw Data View")
     
     # Simple example to display the tables. You can replace this with your actual analytics logic.
     table_options = ["progress", "session_plans", "children", "users", "disciplines", "goal_areas", "progress_media"]
     selected_table = st.selectbox("Select Table to View", table_options)
     
-    df = get_data(selected_table)
-    if not df.empty:
-        st.dataframe(df)
-    else:
-        st.info("Table is empty or failed to load.")
-
-# Initialize the data directory (only runs in local environment)
-init_db()
+    hidden = ['password'] if selected_table == 'users' else []
+    paginated_table(selected_table, key=f"raw_{selected_table}", default_sort=storage.primary_key(selected_table), hide_columns=hidden)
@@ -0,0 +1,144 @@
+# views/github_sync.py (Incremental, batched commit of the data folder to GitHub)
+import os
+import json
+import hashlib
+import datetime
+import threading
+from views import database as db
+from views import perf
+
+BRANCH = "main"
+
+# Blob SHAs of the files as of the last successful sync (local only, not committed)
+SYNC_STATE_FILE = "_sync_state.json"
+
+_status = {'state': 'idle', 'message': '', 'updated_at': None, 'files': []}
+_status_lock = threading.Lock()
+_run_lock = threading.Lock() # one sync at a time
+
+
+# --- CHANGE DETECTION ---
+
+def git_blob_sha(content):
+    """The SHA GitHub gives a file with these bytes, so local and remote can be compared."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+def _repo_path(data_dir, file_name):
+    # Paths in the repository are relative to the app's working directory (the checkout)
+    return os.path.relpath(os.path.join(data_dir, file_name)).replace(os.sep, '/')
+
+def _load_state(data_dir):
+    try:
+        with open(os.path.join(data_dir, SYNC_STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(data_dir, state):
+    path = os.path.join(data_dir, SYNC_STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+def find_dirty_files(data_dir):
+    """Returns {repo path: (content bytes, blob sha)} for CSVs that changed since the last sync."""
+    state = _load_state(data_dir)
+    dirty = {}
+    for file_name in sorted(os.listdir(data_dir)):
+        if not file_name.endswith('.csv'):
+            continue
+        with open(os.path.join(data_dir, file_name), 'rb') as f:
+            content = f.read()
+        perf.note(bytes_read=len(content))
+        sha = git_blob_sha(content)
+        path = _repo_path(data_dir, file_name)
+        if state.get(path) != sha:
+            dirty[path] = (content, sha)
+    return dirty
+
+
+# --- SYNC ---
+
+def _tree_element(path, content):
+    from github import InputGitTreeElement
+    return InputGitTreeElement(path, '100644', 'blob', content=content.decode('utf-8'))
+
+def sync_data(repo, data_dir=None, branch=BRANCH, message=None):
+    """Commits every changed CSV in `data_dir` (default: the current center's folder)
+    to `branch` as a single commit.
+
+    Unchanged files cost nothing; when something did change the sync makes a fixed
+    handful of API calls (read ref, commit and tree; write tree, commit and ref)
+    whatever the number of files. Returns a dict describing what was committed.
+    """
+    data_dir = data_dir or db.get_data_dir()
+    dirty = find_dirty_files(data_dir)
+    if not dirty:
+        return {'committed': [], 'commit_sha': None}
+
+    state = _load_state(data_dir)
+    ref = repo.get_git_ref(f"heads/{branch}")
+    head = repo.get_git_commit(ref.object.sha)
+
+    # Files may already match the branch (first sync, or another instance pushed them)
+    remote = {element.path: element.sha for element in repo.get_git_tree(head.tree.sha, recursive=True).tree}
+    changed = {path: content for path, (content, sha) in dirty.items() if remote.get(path) != sha}
+    if not changed:
+        state.update({path: sha for path, (_content, sha) in dirty.items()})
+        _save_state(data_dir, state)
+        return {'committed': [], 'commit_sha': None}
+
+    tree = repo.create_git_tree([_tree_element(path, content) for path, content in changed.items()], base_tree=head.tree)
+    message = message or f"AUTO-SAVE: Updated {', '.join(os.path.basename(p) for p in changed)} from Streamlit app"
+    commit = repo.create_git_commit(message, tree, [head])
+    ref.edit(commit.sha)
+
+    state.update({path: sha for path, (_content, sha) in dirty.items()})
+    _save_state(data_dir, state)
+    return {'committed': sorted(changed), 'commit_sha': commit.sha}
+
+
+# --- STATUS ---
+
+def _set_status(state, message, files=None):
+    with _status_lock:
+        _status.update({
+            'state': state,
+            'message': message,
+            'updated_at': datetime.datetime.now(),
+            'files': files or [],
+        })
+
+def get_status():
+    """Returns a copy of the last sync status ('idle', 'running', 'success' or 'error')."""
+    with _status_lock:
+        return dict(_status)
+
+def _default_client(token):
+    from github import Github
+    return Github(token)
+
+def run_sync(token, repo_name, data_dir=None, client_factory=None):
+    """Runs one sync on the calling thread and records the outcome in the status."""
+    with _run_lock:
+        return _run_sync(token, repo_name, data_dir, client_factory)
+
+def _run_sync(token, repo_name, data_dir, client_factory):
+    _set_status('running', "⏳ Saving data to GitHub...")
+    try:
+        with perf.trace("github_sync"):
+            # With the SQLite backend this first exports the tables back to CSV
+            with perf.span("sync.prepare"):
+                db.prepare_for_sync()
+            repo = (client_factory or _default_client)(token).get_repo(repo_name)
+            with perf.span("sync.commit") as span:
+                result = sync_data(repo, data_dir)
+                span.note(files=len(result['committed']))
+        if result['committed']:
+            _set_status('success', f"✅ Saved {len(result['committed'])} changed file(s) to GitHub.", result['committed'])
+        else:
+            _set_status('success', "✅ Everything is already saved to GitHub.")
+        return result
+    except Exception as e:
+        _set_status('error', f"❌ Error saving to GitHub: {e.__class__.__name__}. Check token permissions.")
+        return None
@@ -0,0 +1,169 @@
+# views/media.py (Content-addressed media store for progress photos and videos)
+import os
+import hashlib
+import tempfile
+import threading
+import streamlit as st
+from views import database as db
+from views import relations
+
+# Blobs live next to the tables but outside the CSVs, so they are never part of a
+# GitHub sync (which only commits the *.csv files) or loaded with a table.
+MEDIA_DIR_NAME = "_media"
+
+# progress_media.media_path values for stored files look like "sha256:<hex>/<file name>"
+REF_PREFIX = "sha256:"
+
+CHUNK_BYTES = 1024 * 1024
+THUMBNAIL_SIZE = 320
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.webm', '.m4v')
+
+_thumbnail_lock = threading.Lock()
+
+
+# --- PATHS AND REFERENCES ---
+
+def media_dir():
+    return os.path.join(db.get_data_dir(), MEDIA_DIR_NAME)
+
+def blob_path(digest):
+    """Blobs are fanned out by the first two hex digits to keep directories small."""
+    return os.path.join(media_dir(), "blobs", digest[:2], digest)
+
+def thumbnail_path(digest, size=THUMBNAIL_SIZE):
+    return os.path.join(media_dir(), "thumbs", f"{digest}_{size}.jpg")
+
+def make_ref(digest, file_name):
+    return f"{REF_PREFIX}{digest}/{os.path.basename(file_name)}"
+
+def parse_ref(media_path):
+    """Returns (digest, file name) for a stored file, or None for a free-text link."""
+    if not isinstance(media_path, str) or not media_path.startswith(REF_PREFIX):
+        return None
+    digest, _, file_name = media_path[len(REF_PREFIX):].partition('/')
+    return digest, file_name
+
+def is_image(file_name):
+    return file_name.lower().endswith(IMAGE_EXTENSIONS)
+
+def is_video(file_name):
+    return file_name.lower().endswith(VIDEO_EXTENSIONS)
+
+
+# --- STORING ---
+
+def store(stream, chunk_bytes=CHUNK_BYTES):
+    """Copies a file-like object into the store chunk by chunk. Returns (digest, size).
+
+    The SHA-256 is computed while copying to a temporary file; if a blob with that
+    digest already exists the copy is dropped, so identical uploads are stored once.
+    """
+    os.makedirs(os.path.join(media_dir(), "tmp"), exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.join(media_dir(), "tmp"))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = stream.read(chunk_bytes)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        digest = sha.hexdigest()
+        path = blob_path(digest)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return digest, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def attach(progress_id, stream, file_name):
+    """Stores an uploaded file and links it to a progress note. Returns True on success."""
+    digest, _size = store(stream)
+    return bool(db.add_data('progress_media', {'progress_id': progress_id, 'media_path': make_ref(digest, file_name)}))
+
+
+# --- THUMBNAILS ---
+
+def thumbnail(media_path, size=THUMBNAIL_SIZE):
+    """Path of a JPEG thumbnail for a stored image, generated on first request.
+
+    Returns None for videos, links, missing blobs, or when Pillow is not installed.
+    """
+    ref = parse_ref(media_path)
+    if ref is None or not is_image(ref[1]) or not os.path.exists(blob_path(ref[0])):
+        return None
+    path = thumbnail_path(ref[0], size)
+    if os.path.exists(path):
+        return path
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    with _thumbnail_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with Image.open(blob_path(ref[0])) as image:
+                # For JPEGs this decodes at a reduced scale instead of full resolution
+                image.draft('RGB', (size, size))
+                image.thumbnail((size, size))
+                image.convert('RGB').save(path + '.tmp', 'JPEG', quality=80)
+            os.replace(path + '.tmp', path)
+        except (OSError, ValueError):
+            return None
+    return path
+
+
+# --- LOOKUPS ---
+
+def media_for_child(child_name, limit=None):
+    """progress_media rows for a child's notes, newest note first, found via the relation index."""
+    index = relations.get_index()
+    progress_ids = sorted(index.progress_by_child.get(child_name, ()), reverse=True)
+    media_ids = [m for p in progress_ids for m in sorted(index.media_by_progress.get(p, ()))]
+    if limit is not None:
+        media_ids = media_ids[:limit]
+    if not media_ids:
+        return db.get_data('progress_media').iloc[0:0]
+    rows = db.query('progress_media', filters={'id': media_ids})
+    return rows.sort_values(['progress_id', 'id'], ascending=False)
+
+
+# --- UI ---
+
+def show_gallery(child_name, limit=12, columns=4):
+    """Thumbnail grid of a child's most recent media. Videos only load when played."""
+    rows = media_for_child(child_name, limit)
+    if rows.empty:
+        st.info("No media attached to this child's notes yet.")
+        return
+
+    grid = st.columns(columns)
+    for i, row in enumerate(rows.itertuples(index=False)):
+        with grid[i % columns]:
+            ref = parse_ref(row.media_path)
+            if ref is None:
+                st.markdown(f"[Linked media]({row.media_path}) (note {row.progress_id})")
+                continue
+            digest, file_name = ref
+            thumb = thumbnail(row.media_path)
+            if thumb is not None:
+                st.image(thumb, caption=f"{file_name} (note {row.progress_id})")
+            elif is_video(file_name) and os.path.exists(blob_path(digest)):
+                size_mb = os.path.getsize(blob_path(digest)) / (1024 * 1024)
+                st.caption(f"🎬 {file_name} ({size_mb:.1f} MB, note {row.progress_id})")
+                if st.button("Play", key=f"play_{row.id}"):
+                    st.video(blob_path(digest))
+            else:
+                st.caption(f"📎 {file_name} (note {row.progress_id})")
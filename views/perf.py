@@ -0,0 +1,214 @@
+# views/perf.py (Per-rerun timing spans, an admin panel and a JSONL log for offline analysis)
+import os
+import json
+import time
+import datetime
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Off unless TILP_PERF=1 (an admin can also switch it on from the Performance page).
+# When off, span() and @timed cost one attribute lookup and a branch.
+ENABLED = os.environ.get("TILP_PERF") == "1"
+
+# One JSON object per traced rerun / background job is appended here when set. It lives
+# outside the data folder, which is what gets synced. Once the file passes LOG_MAX_BYTES
+# it is moved to "<LOG_PATH>.1" (replacing the previous one) and a new file is started.
+LOG_PATH = os.environ.get("TILP_PERF_LOG", os.path.join("logs", "perf.jsonl"))
+LOG_MAX_BYTES = int(os.environ.get("TILP_PERF_LOG_MAX_BYTES", 5 * 1024 * 1024))
+
+MAX_TRACES = 200 # recent traces kept in memory for the panel (all sessions)
+
+_local = threading.local()
+_traces = deque(maxlen=MAX_TRACES)
+_traces_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+class _Trace:
+    __slots__ = ('label', 'user', 'started', 'start', 'spans', 'stack')
+
+    def __init__(self, label, user):
+        self.label = label
+        self.user = user
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.spans = []
+        self.stack = []
+
+
+class _NoSpan:
+    """Stand-in returned when tracing is off, so callers can still call note()."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def note(self, **values):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('trace', 'record')
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.record = {'name': name, 'depth': len(trace.stack), **attrs}
+
+    def __enter__(self):
+        self.record['start_ms'] = (time.perf_counter() - self.trace.start) * 1000
+        self.trace.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        self.record['ms'] = (time.perf_counter() - self.trace.start) * 1000 - self.record['start_ms']
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        self.trace.stack.pop()
+        self.trace.spans.append(self.record)
+        return False
+
+    def note(self, **values):
+        """Adds counters (e.g. rows=, bytes_read=) to the span."""
+        for key, value in values.items():
+            self.record[key] = self.record.get(key, 0) + value
+
+
+# --- RECORDING ---
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+def span(name, **attrs):
+    """Context manager timing a block inside the current trace (no-op when off)."""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name, attrs)
+
+def note(**values):
+    """Adds counters to the innermost open span, if any."""
+    trace = getattr(_local, 'trace', None)
+    if trace is not None and trace.stack:
+        trace.stack[-1].note(**values)
+
+def timed(name):
+    """Decorator: records each call of the function as a span named `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = getattr(_local, 'trace', None)
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(trace, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def trace(label, user=None):
+    """Collects the spans of one rerun (or background job) on this thread.
+
+    `label` and `user` may be callables, evaluated when the trace ends (e.g. the page
+    a rerun ended up showing).
+    """
+    if not ENABLED or getattr(_local, 'trace', None) is not None:
+        yield
+        return
+    current = _Trace(label, user)
+    _local.trace = current
+    try:
+        yield
+    finally:
+        _local.trace = None
+        _finish(current)
+
+def _finish(current):
+    record = {
+        'started': current.started,
+        'label': current.label() if callable(current.label) else current.label,
+        'user': current.user() if callable(current.user) else current.user,
+        'ms': round((time.perf_counter() - current.start) * 1000, 3),
+        'spans': sorted(current.spans, key=lambda s: s['start_ms']),
+    }
+    with _traces_lock:
+        _traces.append(record)
+    if LOG_PATH:
+        try:
+            line = json.dumps(record, default=str) + '\n'
+            with _log_lock:
+                _roll_log()
+                with open(LOG_PATH, 'a', encoding='utf-8') as f:
+                    f.write(line)
+        except OSError:
+            pass # Diagnostics must never break the page
+
+def _roll_log():
+    """Starts a new log file once the current one is full (called holding _log_lock)."""
+    try:
+        full = os.path.getsize(LOG_PATH) >= LOG_MAX_BYTES
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(LOG_PATH) or '.', exist_ok=True)
+        return
+    if full:
+        os.replace(LOG_PATH, LOG_PATH + '.1')
+
+def recent_traces():
+    """The most recent traces, newest first."""
+    with _traces_lock:
+        return list(reversed(_traces))
+
+
+# --- PANEL ---
+
+def show_perf_panel():
+    """Admin page: switch tracing on/off and inspect recent reruns."""
+    # Imported here so the recording side stays free of UI dependencies
+    import streamlit as st
+    import pandas as pd
+
+    enabled = st.toggle("Record timings", value=ENABLED, help="Adds a little overhead to every page load while on.")
+    if enabled != ENABLED:
+        set_enabled(enabled)
+        st.rerun()
+    st.caption(f"Timings are kept for the last {MAX_TRACES} page loads and appended to `{LOG_PATH}` "
+               f"(rolled over to `{LOG_PATH}.1` every {LOG_MAX_BYTES // (1024 * 1024)} MB).")
+
+    from views import scheduler
+    st.markdown("#### Background Jobs")
+    st.dataframe(pd.DataFrame(scheduler.status()), hide_index=True)
+
+    traces = recent_traces()
+    if not traces:
+        st.info("No page loads recorded yet. Turn recording on and use the app.")
+        return
+
+    summary = pd.DataFrame([{
+        'started': t['started'], 'page': t['label'], 'user': t['user'], 'ms': round(t['ms'], 1),
+        'spans': len(t['spans']),
+        'rows': sum(s.get('rows', 0) for s in t['spans']),
+        'bytes_read': sum(s.get('bytes_read', 0) for s in t['spans']),
+    } for t in traces])
+    st.markdown("#### Recent Page Loads")
+    st.dataframe(summary, hide_index=True)
+
+    st.markdown("#### Slowest Operations")
+    spans = pd.DataFrame([s for t in traces for s in t['spans']], columns=['name', 'ms'])
+    by_name = spans.groupby('name')['ms'].agg(calls='count', total_ms='sum', mean_ms='mean', p95_ms=lambda x: x.quantile(0.95))
+    st.dataframe(by_name.sort_values('total_ms', ascending=False).round(2))
+
+    st.markdown("#### Single Page Load")
+    choice = st.selectbox("Page load", range(len(traces)),
+                          format_func=lambda i: f"{traces[i]['started']} {traces[i]['label']} ({traces[i]['ms']:.0f} ms)")
+    detail = pd.DataFrame(traces[choice]['spans'])
+    if detail.empty:
+        st.info("No spans recorded for this page load.")
+        return
+    detail['name'] = detail['depth'].map(lambda d: '  ' * d) + detail['name']
+    st.dataframe(detail.drop(columns='depth').round(2), hide_index=True)
@@ -2,7 +2,9 @@
 import streamlit as st
 import pandas as pd
 from views import database as db # Required to save/load data
-from views import admin_tool # Required if planner needs user info from admin_tool
+from views.components import paginated_table
+from views import bulk
+from views import templates # Reusable plan templates and activity blocks
 
 def show_session_planning():
     """
@@ -10,7 +12,11 @@ def show_session_planning():
     """
     st.markdown("### Create New Session Plan")
 
-    with st.form("session_plan_form", clear_on_submit=True):
+    # Picking a template prefills the form; the plan then stores only what was changed
+    template_id = templates.template_picker(key="plan_template")
+    prefill = templates.template_fields(template_id) or {}
+
+    with st.form(f"session_plan_form_{template_id}", clear_on_submit=True):
         col1, col2 = st.columns(2)
         
         with col1:
@@ -20,20 +26,20 @@ def show_session_planning():
 
         with col2:
             # Fetch children list for selection
-            children_df = db.get_data('children')
+            children_df = db.get_data('children', columns=['child_name'])
             child_names = children_df['child_name'].unique().tolist()
             selected_child = st.selectbox("Select Child", child_names)
         
         st.markdown("---")
         st.subheader("Plan Components")
 
-        warm_up = st.text_area("Warm-up Activity")
-        learning_block = st.text_area("Learning Block/Main Activity")
-        regulation_break = st.text_area("Regulation Break Activity")
-        social_play = st.text_area("Social Play/Integration")
-        closing_routine = st.text_area("Closing Routine")
+        warm_up = st.text_area("Warm-up Activity", value=prefill.get('warm_up', ""))
+        learning_block = st.text_area("Learning Block/Main Activity", value=prefill.get('learning_block', ""))
+        regulation_break = st.text_area("Regulation Break Activity", value=prefill.get('regulation_break', ""))
+        social_play = st.text_area("Social Play/Integration", value=prefill.get('social_play', ""))
+        closing_routine = st.text_area("Closing Routine", value=prefill.get('closing_routine', ""))
         
-        materials_needed = st.text_input("Materials Needed (Comma separated)")
+        materials_needed = st.text_input("Materials Needed (Comma separated)", value=prefill.get('materials_needed', ""))
         internal_notes = st.text_area("Internal Notes/Reflections")
         
         submitted = st.form_submit_button("Save Session Plan")
@@ -51,17 +57,17 @@ def show_session_planning():
                 'materials_needed': materials_needed, 
                 'internal_notes': internal_notes
             }
-            if db.add_data('session_plans', new_plan):
+            if db.add_data('session_plans', templates.compact_plan(new_plan, template_id)):
                 st.success("Session Plan saved successfully! Remember to click 'Save Data to GitHub Permanently' in the sidebar.")
             else:
                 st.error("Failed to save session plan.")
 
+    with st.expander("📚 Plan Templates"):
+        templates.show_template_library()
+
+    bulk.show_bulk_tools('session_plans')
+
     st.markdown("---")
     st.markdown("### Saved Session Plans")
-    session_plans_df = db.get_data('session_plans')
-    
-    if not session_plans_df.empty:
-        # Display plan details, perhaps with an option to delete
-        st.dataframe(session_plans_df.sort_values(by='date', ascending=False))
-    else:
-        st.info("No session plans found.")
+    paginated_table('session_plans', key="session_plans_table", default_sort='date', ascending=False,
+                    hide_columns=[templates.INHERITED_COLUMN], query=templates.query_plans_page)
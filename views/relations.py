@@ -0,0 +1,261 @@
+# views/relations.py (In-memory referential index: parents -> children -> progress -> media)
+import threading
+from collections import defaultdict
+import pandas as pd
+from views import database as db
+from views import templates
+
+# Tables the index is built from, and the columns it needs from each
+SOURCES = {
+    'children': ['id', 'child_name', 'parent_username'],
+    'progress': ['id', 'child_name'],
+    'progress_media': ['id', 'progress_id'],
+}
+
+_INDEXES = {} # data dir -> RelationIndex
+_LOCK = threading.RLock()
+
+
+def _key(value):
+    """Normalizes ids so 7, 7.0, '7' and numpy.int64(7) all find the same entry."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+# --- THE INDEX ---
+
+class RelationIndex:
+    """Who points at whom, kept as dicts so lookups never touch the tables.
+
+    children:          child id -> (child_name, parent_username)
+    children_by_name:  child_name -> {child ids}
+    children_by_parent: parent username -> {child ids}
+    progress:          progress id -> child_name
+    progress_by_child: child_name -> {progress ids}
+    media:             media id -> progress id
+    media_by_progress: progress id -> {media ids}
+
+    Progress rows reference children by name, so "a child's progress" means the notes
+    filed under that child's name.
+    """
+
+    def __init__(self):
+        self.versions = {} # table -> table version the entries below were built at
+        self.early = defaultdict(dict) # table -> {version before: event} for events that overtook another
+        self.children = {}
+        self.children_by_name = defaultdict(set)
+        self.children_by_parent = defaultdict(set)
+        self.progress = {}
+        self.progress_by_child = defaultdict(set)
+        self.media = {}
+        self.media_by_progress = defaultdict(set)
+
+    # --- single-row maintenance ---
+
+    def _add(self, table_name, row):
+        row_id = _key(row.get('id'))
+        if row_id is None:
+            return
+        if table_name == 'children':
+            name, parent = row.get('child_name'), row.get('parent_username')
+            self.children[row_id] = (name, parent)
+            self.children_by_name[name].add(row_id)
+            self.children_by_parent[parent].add(row_id)
+        elif table_name == 'progress':
+            name = row.get('child_name')
+            self.progress[row_id] = name
+            self.progress_by_child[name].add(row_id)
+        elif table_name == 'progress_media':
+            progress_id = _key(row.get('progress_id'))
+            self.media[row_id] = progress_id
+            self.media_by_progress[progress_id].add(row_id)
+
+    def _remove(self, table_name, row_id):
+        """Forgets a row and returns what was known about it (as a row dict), or None."""
+        row_id = _key(row_id)
+        if table_name == 'children' and row_id in self.children:
+            name, parent = self.children.pop(row_id)
+            _discard(self.children_by_name, name, row_id)
+            _discard(self.children_by_parent, parent, row_id)
+            return {'id': row_id, 'child_name': name, 'parent_username': parent}
+        if table_name == 'progress' and row_id in self.progress:
+            name = self.progress.pop(row_id)
+            _discard(self.progress_by_child, name, row_id)
+            return {'id': row_id, 'child_name': name}
+        if table_name == 'progress_media' and row_id in self.media:
+            progress_id = self.media.pop(row_id)
+            _discard(self.media_by_progress, progress_id, row_id)
+            return {'id': row_id, 'progress_id': progress_id}
+        return None
+
+    # --- whole-table (re)builds ---
+
+    def load(self, table_name, version):
+        """Replaces the entries for one table with its current contents."""
+        if table_name == 'children':
+            self.children, self.children_by_name, self.children_by_parent = {}, defaultdict(set), defaultdict(set)
+        elif table_name == 'progress':
+            self.progress, self.progress_by_child = {}, defaultdict(set)
+        else:
+            self.media, self.media_by_progress = {}, defaultdict(set)
+
+        df = db.get_data(table_name, columns=SOURCES[table_name])
+        if 'id' in df.columns:
+            for row in df.to_dict('records'):
+                self._add(table_name, row)
+        self.versions[table_name] = version
+        self.early.pop(table_name, None)
+
+    def apply(self, event):
+        """Applies a write event from views/database.py.
+
+        Events are applied in version order. Sessions announce their writes after
+        releasing the table lock, so one may arrive before the write it follows; it
+        waits in `early` until that one is in. Events from before the version the
+        table was loaded at are already part of it. A gap that is never filled (e.g.
+        a file edited outside the app) leaves the table stale, and it is reloaded
+        on next use.
+        """
+        table_name = event['table']
+        version = self.versions.get(table_name)
+        if version is None or event['before'] < version:
+            return
+        if event['before'] > version:
+            self.early[table_name][event['before']] = event
+            return
+        self._apply(event)
+        # Anything that was waiting on this one
+        early = self.early.get(table_name, {})
+        while self.versions[table_name] in early:
+            self._apply(early.pop(self.versions[table_name]))
+
+    def _apply(self, event):
+        table_name = event['table']
+        if event['op'] == 'insert':
+            for row in event['rows']:
+                self._add(table_name, row)
+        elif event['op'] == 'delete':
+            for row_id in event['keys']:
+                self._remove(table_name, row_id)
+        elif event['op'] == 'update':
+            old = self._remove(table_name, event['key'])
+            if old is not None:
+                self._add(table_name, {**old, **event['values']})
+        self.versions[table_name] = event['after']
+
+
+def _discard(mapping, key, value):
+    ids = mapping.get(key)
+    if ids is not None:
+        ids.discard(value)
+        if not ids:
+            del mapping[key]
+
+def _on_write(event):
+    if event['table'] not in SOURCES:
+        return
+    with _LOCK:
+        index = _INDEXES.get(event['data_dir'])
+        if index is not None:
+            index.apply(event)
+
+db.register_write_listener(_on_write)
+
+def get_index(tables=tuple(SOURCES)):
+    """Returns the index for the current data folder, reloading any of `tables` that changed."""
+    with _LOCK:
+        index = _INDEXES.setdefault(db.get_data_dir(), RelationIndex())
+        for table_name in tables:
+            version = db.table_version(table_name)[0]
+            if index.versions.get(table_name) != version:
+                index.load(table_name, version)
+        return index
+
+
+# --- VALIDATION ---
+
+def check_references(table_name, row):
+    """Returns an error message if `row` points at something that doesn't exist, else None."""
+    if table_name == 'children':
+        parent = row.get('parent_username')
+        if parent and not db.user_exists(parent):
+            return f"User '{parent}' does not exist. Please create the parent account first."
+    elif table_name == 'progress':
+        name = row.get('child_name')
+        if name not in get_index(['children']).children_by_name:
+            return f"Child '{name}' does not exist."
+    elif table_name == 'progress_media':
+        progress_id = _key(row.get('progress_id'))
+        if progress_id not in get_index(['progress']).progress:
+            return f"Progress note {row.get('progress_id')} does not exist."
+    elif table_name == 'session_plans':
+        template_id = _key(row.get('template_id'))
+        if template_id is not None and templates.template_fields(template_id) is None:
+            return f"Plan template {template_id} does not exist."
+    return None
+
+
+# --- LOOKUPS ---
+
+def child_ids_for_parent(parent_username, child_link=None):
+    """Ids of the children a parent may see: those listing them as parent, plus the
+    child their account is linked to (by id or by name) if any."""
+    index = get_index()
+    ids = set(index.children_by_parent.get(parent_username, ()))
+    link = _key(child_link)
+    if link in index.children:
+        ids.add(link)
+    elif isinstance(link, str):
+        ids.update(index.children_by_name.get(link, ()))
+    return sorted(ids)
+
+def child_names_for_parent(parent_username, child_link=None):
+    """Names of the children a parent may see (see child_ids_for_parent)."""
+    index = get_index()
+    names = {index.children[i][0] for i in child_ids_for_parent(parent_username, child_link)}
+    return sorted(name for name in names if isinstance(name, str))
+
+def children_of(parent_username, child_link=None):
+    """The parent's children as a DataFrame (looked up by id, not by scanning the table)."""
+    ids = child_ids_for_parent(parent_username, child_link)
+    if not ids:
+        return db.get_data('children').iloc[0:0]
+    return db.query('children', filters={'id': ids}, order_by='child_name')
+
+def dependents(child_id):
+    """Progress and media ids that would be removed along with a child.
+
+    If another child shares the name, the notes can't be told apart, so none are
+    counted as this child's.
+    """
+    with _LOCK:
+        index = get_index()
+        entry = index.children.get(_key(child_id))
+        if entry is None or len(index.children_by_name.get(entry[0], ())) > 1:
+            return [], []
+        progress_ids = sorted(index.progress_by_child.get(entry[0], ()))
+        media_ids = sorted(m for p in progress_ids for m in index.media_by_progress.get(p, ()))
+        return progress_ids, media_ids
+
+
+# --- CASCADING DELETES ---
+
+def delete_child(child_id):
+    """Deletes a child with its progress notes and their media.
+
+    Children go last, so an interrupted delete never leaves notes without a child.
+    Returns {table: rows deleted}, or None if there is no such child.
+    """
+    child_id = _key(child_id)
+    if child_id not in get_index().children:
+        return None
+    progress_ids, media_ids = dependents(child_id)
+    return {
+        'progress_media': db.delete_many('progress_media', media_ids),
+        'progress': db.delete_many('progress', progress_ids),
+        'children': 1 if db.delete_data('children', child_id) else 0,
+    }
@@ -0,0 +1,187 @@
+# views/report_render.py (Renders one child's progress report; runs in the report worker processes)
+#
+# Only pandas and the standard library are imported here, so a worker process starts
+# quickly and never touches Streamlit or the storage backends: it gets the child's rows
+# from views/reports.py and writes the finished file itself.
+import os
+import html
+import base64
+import hashlib
+import datetime
+import pandas as pd
+
+# Bump when the layout changes, so reports cached on disk are rebuilt
+RENDER_VERSION = 1
+
+STATUS_MET = "Met Goal"
+STATUS_COLORS = {"Met Goal": "#2e7d32", "Working Towards": "#f9a825", "Not Observed": "#9e9e9e"}
+OTHER_COLOR = "#5c6bc0"
+RECENT_NOTES = 20
+
+STYLE = """
+body { font-family: -apple-system, 'Segoe UI', Helvetica, Arial, sans-serif; color: #222; margin: 2em; }
+h1 { margin-bottom: 0.1em; } h2 { border-bottom: 1px solid #ddd; padding-bottom: 0.2em; margin-top: 1.6em; }
+.meta { color: #666; }
+.metrics { display: flex; gap: 1em; } .metric { border: 1px solid #ddd; border-radius: 6px; padding: 0.6em 1em; }
+.metric b { display: block; font-size: 1.5em; }
+table { border-collapse: collapse; width: 100%; font-size: 0.9em; }
+th, td { border-bottom: 1px solid #eee; padding: 0.3em 0.5em; text-align: left; vertical-align: top; }
+.media img { max-width: 160px; max-height: 160px; margin: 0.3em; }
+@media print { body { margin: 0.5cm; } h2 { page-break-after: avoid; } tr { page-break-inside: avoid; } }
+"""
+
+
+def lower_priority():
+    """Pool initializer: report workers yield the CPU to the app's own processes."""
+    if hasattr(os, 'nice'):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+def report_key(child, progress, media, start_date, end_date, fmt):
+    """Hash of everything a report shows: unchanged data means the cached file is reused."""
+    digest = hashlib.sha1()
+    digest.update(repr((RENDER_VERSION, fmt, str(start_date), str(end_date), sorted(child.items()))).encode('utf-8'))
+    if not progress.empty:
+        digest.update(pd.util.hash_pandas_object(progress, index=False).to_numpy().tobytes())
+    digest.update(repr([(m['media_path'], m['progress_id'], m.get('thumbnail') is not None) for m in media]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+# --- SECTIONS ---
+
+def _e(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return html.escape(str(value))
+
+def _table(df, columns):
+    """HTML table of `df` with {column: heading} columns."""
+    head = ''.join(f"<th>{_e(heading)}</th>" for heading in columns.values())
+    rows = ''.join(
+        '<tr>' + ''.join(f"<td>{_e(value)}</td>" for value in row) + '</tr>'
+        for row in df[list(columns)].itertuples(index=False, name=None)
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>"
+
+def _monthly_chart(progress, width=640, height=220):
+    """Inline SVG: notes per month, stacked by status."""
+    counts = (progress.assign(month=progress['date'].dt.to_period('M'))
+              .groupby(['month', 'status'], observed=True).size().unstack(fill_value=0))
+    if counts.empty:
+        return ""
+    counts = counts.reindex(pd.period_range(counts.index.min(), counts.index.max(), freq='M'), fill_value=0)
+    top = max(int(counts.sum(axis=1).max()), 1)
+    left, bottom, plot_height = 30, 30, height - 50
+    slot = (width - left) / len(counts)
+    bar = max(slot * 0.7, 1)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-size="10">',
+             f'<text x="0" y="12">{top}</text><text x="0" y="{height - bottom}">0</text>']
+    for i, (month, row) in enumerate(counts.iterrows()):
+        x = left + i * slot
+        y = height - bottom
+        for status, count in row.items():
+            if not count:
+                continue
+            h = count / top * plot_height
+            y -= h
+            color = STATUS_COLORS.get(status, OTHER_COLOR)
+            parts.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{bar:.1f}" height="{h:.1f}" fill="{color}">'
+                         f'<title>{_e(month)} {_e(status)}: {count}</title></rect>')
+        if len(counts) <= 12 or i % max(len(counts) // 12, 1) == 0:
+            parts.append(f'<text x="{x:.1f}" y="{height - bottom + 14}">{month.strftime("%b %y")}</text>')
+    legend_x = left
+    for status in counts.columns:
+        color = STATUS_COLORS.get(status, OTHER_COLOR)
+        parts.append(f'<rect x="{legend_x}" y="{height - 10}" width="8" height="8" fill="{color}"/>'
+                     f'<text x="{legend_x + 11}" y="{height - 2}">{_e(status)}</text>')
+        legend_x += 12 + 6 * len(str(status)) + 14
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def _attainment(progress, by):
+    grouped = progress.assign(met=progress['status'] == STATUS_MET).groupby(by, observed=True)
+    result = grouped.agg(total=('status', 'size'), met=('met', 'sum')).reset_index()
+    result['rate'] = (result['met'] / result['total']).map('{:.0%}'.format)
+    return result
+
+def _media_section(media):
+    items = []
+    for item in media:
+        label = f"{_e(item['file_name'])} <span class='meta'>(note {_e(item['progress_id'])}, {_e(item.get('date'))})</span>"
+        thumbnail = item.get('thumbnail')
+        if thumbnail and os.path.exists(thumbnail):
+            with open(thumbnail, 'rb') as f:
+                data = base64.b64encode(f.read()).decode('ascii')
+            items.append(f"<div><img src='data:image/jpeg;base64,{data}' alt='{_e(item['file_name'])}'><br>{label}</div>")
+        else:
+            items.append(f"<div>📎 {label}</div>")
+    return f"<div class='media'>{''.join(items)}</div>"
+
+
+# --- THE REPORT ---
+
+def render_html(child, progress, media, start_date, end_date):
+    """The full report as one self-contained HTML page."""
+    name = child.get('child_name')
+    progress = progress.sort_values('date')
+    total = len(progress)
+    met = int((progress['status'] == STATUS_MET).sum())
+    last = progress['date'].max() if total else None
+    period_end = pd.Timestamp(end_date) if end_date else (last or pd.Timestamp.today())
+    recent = int((progress['date'] > period_end - pd.Timedelta(days=30)).sum())
+    period = f"{_e(start_date) or 'start'} – {_e(end_date) or 'today'}"
+
+    sections = [
+        f"<h1>Progress Report: {_e(name)}</h1>",
+        f"<p class='meta'>Period {period} · Date of birth {_e(child.get('date_of_birth')) or 'n/a'}"
+        f" · Generated {datetime.date.today():%Y-%m-%d}</p>",
+        "<div class='metrics'>"
+        f"<div class='metric'><b>{total}</b>Progress notes</div>"
+        f"<div class='metric'><b>{(met / total if total else 0):.0%}</b>Goal attainment</div>"
+        f"<div class='metric'><b>{recent}</b>Notes in the last 30 days</div>"
+        f"<div class='metric'><b>{_e(last) or '–'}</b>Last observation</div>"
+        "</div>",
+    ]
+    if not total:
+        sections.append("<p>No progress notes were recorded in this period.</p>")
+    else:
+        latest = progress.drop_duplicates(['discipline', 'goal_area'], keep='last').sort_values(['discipline', 'goal_area'])
+        sections += [
+            "<h2>Notes per Month</h2>", _monthly_chart(progress),
+            "<h2>Goal Attainment by Discipline</h2>",
+            _table(_attainment(progress, 'discipline'), {'discipline': "Discipline", 'total': "Notes", 'met': "Met", 'rate': "Rate"}),
+            "<h2>Goal Attainment by Goal Area</h2>",
+            _table(_attainment(progress, 'goal_area'), {'goal_area': "Goal Area", 'total': "Notes", 'met': "Met", 'rate': "Rate"}),
+            "<h2>Current Status of Each Goal</h2>",
+            _table(latest, {'discipline': "Discipline", 'goal_area': "Goal Area", 'status': "Status", 'date': "As Of"}),
+            f"<h2>Recent Notes (last {min(RECENT_NOTES, total)})</h2>",
+            _table(progress.tail(RECENT_NOTES).iloc[::-1],
+                   {'date': "Date", 'discipline': "Discipline", 'goal_area': "Goal Area", 'status': "Status", 'notes': "Notes"}),
+        ]
+    if media:
+        sections += ["<h2>Photos and Videos</h2>", _media_section(media)]
+    body = '\n'.join(sections)
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Progress Report: {_e(name)}</title>"
+            f"<style>{STYLE}</style></head><body>\n{body}\n</body></html>")
+
+def render_to_file(job):
+    """Worker entry point: renders `job` (see reports._job) and writes it to job['path'].
+
+    The file is written next to its final name and renamed, so a report is either
+    complete or absent. Returns (child name, path).
+    """
+    document = render_html(job['child'], job['progress'], job['media'], job['start_date'], job['end_date'])
+    path = job['path']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if job['format'] == 'pdf':
+        import weasyprint # optional: PDF output is only offered when it is installed
+        weasyprint.HTML(string=document).write_pdf(path + '.tmp')
+    else:
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(document)
+    os.replace(path + '.tmp', path)
+    return job['child'].get('child_name'), path
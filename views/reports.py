@@ -0,0 +1,264 @@
+# views/reports.py (Batched per-child progress reports, built on a process pool)
+import os
+import time
+import zipfile
+import datetime
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import streamlit as st
+import pandas as pd
+from views import database as db
+from views import media
+from views import report_render
+
+# Reports are written next to the tables, like media, and never synced to GitHub
+REPORT_DIR_NAME = "_reports"
+REPORT_WORKERS = int(os.environ.get("TILP_REPORT_WORKERS", min(4, os.cpu_count() or 1)))
+KEEP_DAYS = 60 # cached reports not reused for this long are removed
+
+_pool = None
+_pool_lock = threading.Lock()
+_status_lock = threading.Lock()
+_status = {'state': 'idle', 'message': None, 'total': 0, 'done': 0, 'cached': 0, 'failed': 0,
+           'files': [], 'zip': None, 'last_error': None, 'center': None, 'start_date': None, 'end_date': None,
+           'format': None, 'started_at': None, 'finished_at': None}
+_cancel = threading.Event()
+_worker = None
+
+
+def pdf_available():
+    """PDF output needs the optional weasyprint package; HTML always works."""
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def report_dir():
+    return os.path.join(db.get_data_dir(), REPORT_DIR_NAME)
+
+def _get_pool():
+    """One pool per process, started on first use. Workers are spawned rather than
+    forked so they don't inherit the app's threads and locks."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=report_render.lower_priority)
+        return _pool
+
+
+# --- COLLECTING ONE CHILD'S DATA ---
+
+def _job(child, start_date, end_date, fmt):
+    """Everything the worker needs for one report: the child's rows for the period, as
+    plain data. Returns the job with the path its report is cached at."""
+    name = child['child_name']
+    progress = db.query('progress', filters={'child_name': name}, start_date=start_date, end_date=end_date,
+                        order_by='date', columns=['id', 'date', 'discipline', 'goal_area', 'status', 'notes'])
+    notes_in_period = dict(zip(progress['id'].tolist(), progress['date'].tolist()))
+    attached = []
+    for row in media.media_for_child(name).itertuples(index=False):
+        if row.progress_id not in notes_in_period:
+            continue
+        ref = media.parse_ref(row.media_path)
+        attached.append({
+            'media_path': row.media_path,
+            'progress_id': int(row.progress_id),
+            'date': notes_in_period[row.progress_id],
+            'file_name': ref[1] if ref else row.media_path,
+            'thumbnail': media.thumbnail(row.media_path),
+        })
+    child = {k: (None if pd.isna(v) else v) for k, v in child.items() if k in ('child_name', 'date_of_birth')}
+    key = report_render.report_key(child, progress, attached, start_date, end_date, fmt)
+    return {
+        'child': child, 'progress': progress, 'media': attached, 'format': fmt,
+        'start_date': start_date, 'end_date': end_date,
+        'path': os.path.join(report_dir(), f"{key}.{fmt}"),
+    }
+
+def _file_name(child_name, start_date, end_date, fmt):
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(child_name))
+    return f"{safe}_{start_date or 'start'}_{end_date or 'today'}.{fmt}"
+
+
+# --- THE BATCH ---
+
+def _update(**values):
+    with _status_lock:
+        _status.update(values)
+
+def get_status():
+    """A copy of the current (or last) batch's progress."""
+    with _status_lock:
+        return {**_status, 'files': list(_status['files'])}
+
+def _prune(directory, keep_days=KEEP_DAYS):
+    """Removes reports not written or reused for `keep_days`."""
+    cutoff = time.time() - keep_days * 86400
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+def start_batch(child_names, start_date=None, end_date=None, fmt='html'):
+    """Starts building reports for `child_names` in the background. Returns False if
+    a batch is already running in this process."""
+    global _worker
+    with _status_lock:
+        if _worker is not None and _worker.is_alive():
+            return False
+        _cancel.clear()
+        _status.update({'state': 'running', 'message': "⏳ Preparing reports...", 'total': len(child_names),
+                        'done': 0, 'cached': 0, 'failed': 0, 'files': [], 'zip': None, 'last_error': None,
+                        'center': db.current_center(), 'start_date': start_date, 'end_date': end_date, 'format': fmt,
+                        'started_at': datetime.datetime.now(), 'finished_at': None})
+        _worker = threading.Thread(target=_run_batch, name="report-batch", daemon=True,
+                                   args=(db.current_center(), list(child_names), start_date, end_date, fmt))
+        _worker.start()
+    return True
+
+def cancel_batch():
+    _cancel.set()
+
+def _run_batch(center, child_names, start_date, end_date, fmt):
+    with db.use_center(center):
+        try:
+            _build(child_names, start_date, end_date, fmt)
+        except Exception as e:
+            _update(state='error', message=f"❌ Report batch failed: {e.__class__.__name__}: {e}",
+                    finished_at=datetime.datetime.now())
+
+def _build(child_names, start_date, end_date, fmt):
+    """Feeds the pool a few children at a time, so only the reports in flight are held
+    in memory, and records each file as soon as it is on disk."""
+    directory = report_dir()
+    os.makedirs(directory, exist_ok=True)
+    _prune(directory)
+    children = db.get_data('children', columns=['child_name', 'date_of_birth'])
+    children = {row['child_name']: row for row in children.to_dict('records')}
+    pool = _get_pool()
+    in_flight = {}
+    queue = iter(child_names)
+
+    def finished(name, path):
+        with _status_lock:
+            _status['done'] += 1
+            _status['files'].append((name, path))
+
+    while True:
+        while not _cancel.is_set() and len(in_flight) < REPORT_WORKERS * 2:
+            name = next(queue, None)
+            if name is None:
+                break
+            job = _job(children.get(name, {'child_name': name}), start_date, end_date, fmt)
+            if os.path.exists(job['path']):
+                os.utime(job['path']) # still in use: keep it past the next prune
+                with _status_lock:
+                    _status['cached'] += 1
+                finished(name, job['path'])
+            else:
+                in_flight[pool.submit(report_render.render_to_file, job)] = name
+        if not in_flight:
+            break
+        completed, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in completed:
+            name = in_flight.pop(future)
+            try:
+                finished(*future.result())
+            except Exception as e:
+                with _status_lock:
+                    _status['failed'] += 1
+                    _status['last_error'] = f"{name}: {e.__class__.__name__}: {e}"
+
+    status = get_status()
+    if _cancel.is_set():
+        _update(state='cancelled', message=f"Cancelled after {status['done']} of {status['total']} reports.",
+                finished_at=datetime.datetime.now())
+        return
+    _update(message="⏳ Packing the reports...")
+    zip_path = os.path.join(directory, f"batch_{datetime.datetime.now():%Y%m%d_%H%M%S}.zip")
+    # Each report is copied into the archive from disk, one at a time
+    with zipfile.ZipFile(zip_path + '.tmp', 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, path in status['files']:
+            archive.write(path, _file_name(name, start_date, end_date, fmt))
+    os.replace(zip_path + '.tmp', zip_path)
+    failed = f", {status['failed']} failed" if status['failed'] else ""
+    _update(state='done', zip=zip_path, finished_at=datetime.datetime.now(),
+            message=f"✅ {status['done']} report(s) ready ({status['cached']} unchanged since last time{failed}).")
+
+
+# --- UI ---
+
+def _previous_month(today=None):
+    first_of_month = (today or datetime.date.today()).replace(day=1)
+    end = first_of_month - datetime.timedelta(days=1)
+    return end.replace(day=1), end
+
+def show_reports_page():
+    """Build progress reports for many children at once and download them."""
+    st.subheader("Progress Reports")
+    status = get_status()
+    running = status['state'] == 'running'
+
+    children = db.get_data('children', columns=['child_name'])
+    names = sorted(children['child_name'].dropna().tolist()) if 'child_name' in children.columns else []
+    start_default, end_default = _previous_month()
+    with st.form("report_batch_form"):
+        selected = st.multiselect("Children (leave empty for all)", names)
+        col1, col2, col3 = st.columns(3)
+        start_date = col1.date_input("From", value=start_default)
+        end_date = col2.date_input("To", value=end_default)
+        formats = ['html', 'pdf'] if pdf_available() else ['html']
+        fmt = col3.selectbox("Format", formats, format_func=str.upper)
+        submitted = st.form_submit_button("Build Reports", disabled=running)
+    if len(formats) == 1:
+        st.caption("PDF output needs the weasyprint package; HTML reports print cleanly from any browser.")
+
+    if submitted:
+        if start_date > end_date:
+            st.error("'From' must not be after 'To'.")
+        elif not start_batch(selected or names, start_date.isoformat(), end_date.isoformat(), fmt):
+            st.error("A batch of reports is already being built. Please wait for it to finish.")
+        else:
+            status = get_status()
+            running = True
+
+    if status['state'] == 'idle':
+        return
+    if status['center'] != db.current_center():
+        st.info(f"The last batch was built for {db.center_label(status['center'])}.")
+        return
+    st.markdown("#### Current Batch")
+    total = max(status['total'], 1)
+    st.progress(status['done'] / total, text=f"{status['done']} of {status['total']} reports")
+    if status['message']:
+        st.info(status['message'])
+    if status['last_error']:
+        st.warning(f"Last failure: {status['last_error']}")
+    if running:
+        col1, col2 = st.columns(2)
+        if col1.button("Refresh progress"):
+            st.rerun()
+        if col2.button("Cancel batch"):
+            cancel_batch()
+            st.rerun()
+        return
+    if status['zip'] and os.path.exists(status['zip']):
+        with open(status['zip'], 'rb') as f:
+            st.download_button("Download all reports (.zip)", f, file_name=os.path.basename(status['zip']),
+                               mime="application/zip")
+    files = dict(status['files'])
+    if files:
+        name = st.selectbox("Single Report", sorted(files))
+        path = files[name]
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                st.download_button("Download report", f, file_name=_file_name(name, status['start_date'], status['end_date'], status['format']))
@@ -0,0 +1,240 @@
+# views/scheduler.py (One background thread per process for debounced and periodic jobs)
+import os
+import time
+import datetime
+import threading
+from views import database as db
+from views import perf
+
+# Auto-save needs GITHUB_TOKEN and STREAMLIT_GITHUB_REPO; set TILP_AUTO_SYNC=0 to keep saving manual
+AUTO_SYNC = os.environ.get("TILP_AUTO_SYNC", "1") != "0"
+
+SYNC_DEBOUNCE = float(os.environ.get("TILP_SYNC_DEBOUNCE", 60))   # quiet seconds after the last edit
+SYNC_MAX_WAIT = float(os.environ.get("TILP_SYNC_MAX_WAIT", 600))  # ...but never later than this after the first
+COMPACT_DEBOUNCE = 120
+COMPACT_INTERVAL = 30 * 60
+AGGREGATE_DEBOUNCE = 2
+
+# Auto-save holds off on a center when a table has shrunk below this share of the rows in
+# its CSV (a manual save goes ahead)
+SYNC_MIN_ROW_RATIO = float(os.environ.get("TILP_SYNC_MIN_ROW_RATIO", 0.5))
+
+BACKOFF_START = 30    # seconds before the first retry of a failed job
+BACKOFF_MAX = 30 * 60
+
+_jobs = {}
+_condition = threading.Condition()
+_thread = None
+_sync_target = None # (token, repo name) once a session has supplied the secrets
+# Centers (None: the main center) with changes a job has not handled yet
+_pending = {'github_sync': set(), 'refresh_aggregates': set(), 'confirmed_sync': set()}
+
+
+class _Job:
+    __slots__ = ('name', 'function', 'debounce', 'max_wait', 'interval', 'due', 'first_trigger',
+                 'running', 'runs', 'failures', 'last_run', 'last_duration', 'last_error')
+
+    def __init__(self, name, function, debounce, max_wait, interval):
+        self.name = name
+        self.function = function
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.interval = interval
+        self.due = time.monotonic() + interval if interval else None
+        self.first_trigger = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+
+
+# --- JOBS ---
+
+def register(name, function, debounce=0, max_wait=None, interval=None):
+    """Adds (or replaces) a job. `interval` makes it also run every so many seconds.
+
+    A job runs on the scheduler thread only, so two runs of it never overlap.
+    """
+    with _condition:
+        _jobs[name] = _Job(name, function, debounce, max_wait, interval)
+        _condition.notify()
+
+def trigger(name, delay=None):
+    """Asks for a run of `name` once things have been quiet for its debounce time.
+
+    Each trigger pushes the run back, up to `max_wait` after the first trigger, so a
+    burst of edits leads to one run. `delay=0` runs it as soon as the thread is free.
+    """
+    now = time.monotonic()
+    with _condition:
+        job = _jobs.get(name)
+        if job is None:
+            return False
+        if job.failures and delay is None:
+            # Backing off after a failure: leave the retry time alone
+            return True
+        if job.first_trigger is None:
+            job.first_trigger = now
+        due = now + (job.debounce if delay is None else delay)
+        if job.max_wait is not None:
+            due = min(due, job.first_trigger + job.max_wait)
+        job.due = due
+        _condition.notify()
+    _ensure_thread()
+    return True
+
+def status():
+    """One dict per job: state, next run (seconds from now), runs, failures, last error."""
+    now = time.monotonic()
+    with _condition:
+        return [{
+            'job': job.name,
+            'state': 'running' if job.running else ('retrying' if job.failures else ('scheduled' if job.due else 'idle')),
+            'next_run_in': None if job.due is None else max(round(job.due - now, 1), 0),
+            'runs': job.runs,
+            'failures': job.failures,
+            'last_run': job.last_run,
+            'last_duration_ms': job.last_duration,
+            'last_error': job.last_error,
+        } for job in _jobs.values()]
+
+
+# --- THE THREAD ---
+
+def _ensure_thread():
+    global _thread
+    with _condition:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_loop, name="tilp-scheduler", daemon=True)
+            _thread.start()
+
+def _next_due_job():
+    """Waits until a job is due and returns it (marked running)."""
+    with _condition:
+        while True:
+            now = time.monotonic()
+            due = [job for job in _jobs.values() if job.due is not None]
+            if due:
+                job = min(due, key=lambda j: j.due)
+                if job.due <= now:
+                    job.due = None
+                    job.first_trigger = None
+                    job.running = True
+                    return job
+                _condition.wait(job.due - now)
+            else:
+                _condition.wait()
+
+def _loop():
+    while True:
+        job = _next_due_job()
+        started = time.perf_counter()
+        error = None
+        try:
+            with perf.trace(f"job:{job.name}"):
+                job.function()
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        with _condition:
+            job.running = False
+            job.runs += 1
+            job.last_run = datetime.datetime.now()
+            job.last_duration = round((time.perf_counter() - started) * 1000, 1)
+            job.last_error = error
+            if error is None:
+                job.failures = 0
+            else:
+                job.failures += 1
+                retry = min(BACKOFF_START * 2 ** (job.failures - 1), BACKOFF_MAX)
+                # Edits made meanwhile don't bring the retry forward
+                job.due = time.monotonic() + retry
+            if job.interval and job.due is None:
+                job.due = time.monotonic() + job.interval
+
+
+# --- APP JOBS ---
+# Each center's folder is synced, compacted and summarized on its own, so a burst of
+# edits at one clinic doesn't make the jobs touch every other clinic's files.
+
+def _take_pending(name):
+    with _condition:
+        centers, _pending[name] = _pending[name], set()
+    return sorted(centers, key=db.center_label)
+
+def _add_pending(name, centers):
+    with _condition:
+        _pending[name].update(centers)
+
+def _sync_job():
+    from views import github_sync # PyGithub is only needed once a sync runs
+    if _sync_target is None:
+        return
+    token, repo_name = _sync_target
+    centers = _take_pending('github_sync')
+    confirmed = set(_take_pending('confirmed_sync'))
+    held = []
+    for i, center in enumerate(centers):
+        with db.use_center(center):
+            shrunk = {} if center in confirmed else db.shrunken_tables(SYNC_MIN_ROW_RATIO)
+            if shrunk:
+                held.append((center, shrunk))
+                continue
+            if github_sync.run_sync(token, repo_name, db.get_data_dir()) is None:
+                # Retried (with the rest) after the backoff
+                _add_pending('github_sync', centers[i:] + [c for c, _shrunk in held])
+                _add_pending('confirmed_sync', confirmed & set(centers[i:]))
+                raise RuntimeError(github_sync.get_status()['message'])
+    if held:
+        _add_pending('github_sync', [center for center, _shrunk in held])
+        center, shrunk = held[0]
+        table_name, (stored, on_disk) = next(iter(shrunk.items()))
+        raise RuntimeError(f"Not saving {db.center_label(center)}: {table_name} has {stored} rows but "
+                           f"{table_name}.csv has {on_disk}. Save manually if the rows were removed on purpose.")
+
+def _compact_job():
+    for center in db.list_centers():
+        with db.use_center(center):
+            db.compact_tables()
+
+def _aggregate_job():
+    from views import analytics
+    for center in _take_pending('refresh_aggregates'):
+        with db.use_center(center):
+            analytics.refresh()
+
+def configure_sync(token, repo_name):
+    """Remembers where to sync (secrets are read by a session and handed over here)."""
+    global _sync_target
+    with _condition:
+        _sync_target = (token, repo_name)
+
+def sync_enabled():
+    return _sync_target is not None
+
+def sync_now(centers):
+    """Queues an immediate sync of the given centers' folders. Asked for by a person, so
+    it goes ahead even if a table shrank a lot since the last save."""
+    _add_pending('github_sync', centers)
+    _add_pending('confirmed_sync', centers)
+    return trigger('github_sync', delay=0)
+
+def _on_write(event):
+    center = event.get('center')
+    trigger('compact')
+    if event['table'] == 'progress':
+        _add_pending('refresh_aggregates', [center])
+        trigger('refresh_aggregates')
+    if AUTO_SYNC and _sync_target is not None:
+        _add_pending('github_sync', [center])
+        trigger('github_sync')
+
+register('github_sync', _sync_job, debounce=SYNC_DEBOUNCE, max_wait=SYNC_MAX_WAIT)
+register('compact', _compact_job, debounce=COMPACT_DEBOUNCE, interval=COMPACT_INTERVAL)
+register('refresh_aggregates', _aggregate_job, debounce=AGGREGATE_DEBOUNCE)
+db.register_write_listener(_on_write)
+
+def start():
+    """Starts the thread (once per process) so the periodic jobs run."""
+    _ensure_thread()
@@ -0,0 +1,284 @@
+# views/schema.py (Declarative table schemas: column types, required fields and defaults)
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+# Column kinds:
+#   'int'      nullable integer (pandas 'Int64'), for ids and references to ids
+#   'date'     datetime64, invalid or blank values become NaT
+#   'category' repeated short text stored as categorical codes (categories kept sorted,
+#              so sorting and comparisons stay alphabetical)
+#   'text'     free text
+
+
+class Column:
+    """One column of a table: its kind, whether a new row must give it, and its default."""
+
+    __slots__ = ('name', 'kind', 'required', 'default', 'choices')
+
+    def __init__(self, name, kind='text', required=False, default=None, choices=None):
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.choices = choices
+
+
+# --- TABLE SCHEMAS ---
+# Column order matches the CSV headers committed in the 'data' folder.
+SCHEMAS = {
+    'children': [
+        Column('id', 'int'),
+        Column('child_name', required=True),
+        Column('parent_username'),
+        Column('date_of_birth', 'date'),
+    ],
+    'disciplines': [Column('name', required=True)],
+    'goal_areas': [Column('name', required=True)],
+    'progress': [
+        Column('id', 'int'),
+        Column('date', 'date', required=True),
+        Column('child_name', 'category', required=True),
+        Column('discipline', 'category', required=True),
+        Column('goal_area', 'category', required=True),
+        Column('status', 'category', required=True),
+        Column('notes'),
+        Column('media_path'),
+    ],
+    'progress_media': [
+        Column('id', 'int'),
+        Column('progress_id', 'int', required=True),
+        Column('media_path', required=True),
+    ],
+    'session_plans': [
+        Column('id', 'int'),
+        Column('date', 'date', required=True),
+        Column('lead_staff', 'category'),
+        Column('support_staff', 'category'),
+        Column('warm_up'),
+        Column('learning_block'),
+        Column('regulation_break'),
+        Column('social_play'),
+        Column('closing_routine'),
+        Column('materials_needed'),
+        Column('internal_notes'),
+        Column('template_id', 'int'),
+        Column('inherited_fields'), # fields taken from the template (see views/templates.py)
+    ],
+    'users': [
+        Column('username', required=True),
+        Column('password', required=True),
+        Column('role', 'category', required=True, choices=('admin', 'staff', 'parent')),
+        Column('child_link', default='All'),
+        Column('center'), # blank: the main center (see views/database.py)
+    ],
+    # Reusable session-plan content (see views/templates.py)
+    'activity_blocks': [
+        Column('id', 'int'),
+        Column('component', 'category', required=True),
+        Column('name'),
+        Column('text', required=True),
+    ],
+    'plan_templates': [
+        Column('id', 'int'),
+        Column('name', required=True),
+        Column('warm_up_block', 'int'),
+        Column('learning_block_block', 'int'),
+        Column('regulation_break_block', 'int'),
+        Column('social_play_block', 'int'),
+        Column('closing_routine_block', 'int'),
+        Column('materials_needed'),
+        Column('replaced_by', 'int'),
+    ],
+}
+
+_BY_NAME = {table: {c.name: c for c in columns} for table, columns in SCHEMAS.items()}
+
+
+def column_names(table_name):
+    return [c.name for c in SCHEMAS.get(table_name, [])]
+
+def columns_of_kind(table_name, kind):
+    return [c.name for c in SCHEMAS.get(table_name, []) if c.kind == kind]
+
+def kind_of(table_name, column):
+    spec = _BY_NAME.get(table_name, {}).get(column)
+    return spec.kind if spec is not None else None
+
+
+# --- APPLYING TO FRAMES ---
+
+def _is_blank(value):
+    return value is None or value is pd.NA or value is pd.NaT or value == '' or (isinstance(value, float) and pd.isna(value))
+
+def _as_int(series):
+    if series.dtype == 'Int64':
+        return series
+    numbers = pd.to_numeric(series, errors='coerce')
+    # Fractional values can't be ids: treat them like any other unparseable value
+    return numbers.where(numbers == numbers.round()).astype('Int64')
+
+def _as_date(series):
+    if pd.api.types.is_datetime64_dtype(series):
+        return series
+    # Coerce invalid dates to NaT (Not a Time)
+    return pd.to_datetime(series, errors='coerce')
+
+def _as_text(series):
+    """Text columns that pandas inferred as numbers (e.g. usernames like '1042') back to str."""
+    if isinstance(series.dtype, CategoricalDtype):
+        return series.astype(object)
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    present = series.dropna()
+    if not pd.api.types.is_integer_dtype(series) and not present.empty and (present == present.round()).all():
+        series = series.astype('Int64') # 3.0 -> '3', as it was typed
+    return series.astype(str).where(series.notna(), None)
+
+def _as_category(series):
+    if isinstance(series.dtype, CategoricalDtype):
+        categories = series.cat.categories
+        if categories.dtype == object or pd.api.types.is_string_dtype(categories):
+            if categories.is_monotonic_increasing:
+                return series
+            return series.cat.reorder_categories(sorted(categories))
+        series = series.astype(object)
+    series = _as_text(series)
+    values = series.dropna().unique()
+    try:
+        categories = sorted(values)
+    except TypeError:
+        # Mixed str and numbers (e.g. rows added from JSON): categories are text
+        series = series.map(lambda v: v if _is_blank(v) else str(v))
+        categories = sorted(series.dropna().unique())
+    return series.astype(CategoricalDtype(categories))
+
+def read_csv_dtypes(table_name):
+    """dtype hints for pd.read_csv, so categorical columns are built while parsing."""
+    return {column: 'category' for column in columns_of_kind(table_name, 'category')}
+
+_CONVERTERS = {'int': _as_int, 'date': _as_date, 'text': _as_text, 'category': _as_category}
+
+def apply(df, table_name):
+    """Gives every known column of `df` its schema dtype, in place. Columns that already
+    have it are left alone, so applying it to a loaded table again is cheap."""
+    for spec in SCHEMAS.get(table_name, []):
+        if spec.name in df.columns:
+            series = df[spec.name]
+            converted = _CONVERTERS[spec.kind](series)
+            if converted is not series:
+                df[spec.name] = converted
+    return df
+
+def concat(frames, table_name):
+    """pd.concat for frames of one table that keeps its categorical columns categorical.
+
+    pandas falls back to plain object columns when the parts' categories differ, so each
+    part's column is first given the union of the categories (new rows, e.g. the one
+    being inserted, go straight to that dtype).
+    """
+    frames = list(frames)
+    for column in columns_of_kind(table_name, 'category'):
+        parts = {}
+        values = set()
+        for i, frame in enumerate(frames):
+            if column not in frame.columns:
+                continue
+            part = frame[column]
+            if not isinstance(part.dtype, CategoricalDtype):
+                part = _as_text(part)
+            parts[i] = part
+            values.update(part.cat.categories if isinstance(part.dtype, CategoricalDtype) else part.dropna())
+        if not parts:
+            continue
+        try:
+            categories = pd.Index(sorted(values))
+        except TypeError:
+            continue # mixed types; left to apply() below
+        for i, part in parts.items():
+            if isinstance(part.dtype, CategoricalDtype):
+                if part.cat.categories.equals(categories):
+                    continue
+                part = part.cat.set_categories(categories)
+            else:
+                part = part.astype(CategoricalDtype(categories))
+            frames[i] = frames[i].assign(**{column: part})
+    return apply(pd.concat([apply(frame, table_name) for frame in frames], ignore_index=True), table_name)
+
+def add_category(df, table_name, column, value):
+    """Makes room for `value` in a categorical column before it is assigned, in place."""
+    if kind_of(table_name, column) != 'category' or _is_blank(value) or column not in df.columns:
+        return
+    series = df[column]
+    if isinstance(series.dtype, CategoricalDtype) and value not in series.cat.categories:
+        df[column] = series.cat.set_categories(sorted([*series.cat.categories, value]))
+
+def cell_value(table_name, column, value):
+    """Converts one value to the form stored in the column's dtype."""
+    kind = kind_of(table_name, column)
+    if _is_blank(value):
+        return pd.NaT if kind == 'date' else (pd.NA if kind == 'int' else None)
+    if kind == 'date':
+        return pd.to_datetime(value, errors='coerce')
+    if kind == 'int':
+        try:
+            return int(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return pd.NA
+    if kind in ('category', 'text') and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+# --- VALIDATION ---
+
+def validate(table_name, row, partial=False):
+    """Checks a row about to be added (or, with `partial`, the values of an update).
+
+    Returns (row with defaults filled in, None) or (None, error message). Values are
+    passed through as given; only whether they fit the column is checked.
+    """
+    specs = _BY_NAME.get(table_name)
+    if specs is None:
+        return dict(row), None
+    row = dict(row)
+    if not partial:
+        for spec in specs.values():
+            if spec.default is not None and _is_blank(row.get(spec.name)):
+                row[spec.name] = spec.default
+    for name, spec in specs.items():
+        if name not in row and partial:
+            continue
+        value = row.get(name)
+        if _is_blank(value):
+            if spec.required and (name in row or not partial):
+                return None, f"'{name}' is required."
+            continue
+        if spec.kind == 'int' and cell_value(table_name, name, value) is pd.NA:
+            return None, f"'{name}' must be a whole number (got {value!r})."
+        if spec.kind == 'date' and pd.isna(pd.to_datetime(value, errors='coerce')):
+            return None, f"'{name}' must be a date (got {value!r})."
+        if spec.choices and value not in spec.choices:
+            return None, f"'{name}' must be one of {', '.join(spec.choices)} (got {value!r})."
+    return row, None
+
+def validate_frame(table_name, df):
+    """validate() for many rows at once: the first problem of each row of `df`, or ''
+    where the row is fine. Columns missing from `df` count as blank."""
+    reason = pd.Series('', index=df.index, dtype=object)
+    for name, spec in _BY_NAME.get(table_name, {}).items():
+        values = df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+        blank = values.isna() | (values.astype(str) == '')
+        problems = []
+        if spec.required and spec.default is None:
+            problems.append((blank, f"'{name}' is required."))
+        if spec.kind == 'int':
+            numbers = pd.to_numeric(values.where(~blank), errors='coerce')
+            problems.append((~blank & numbers.isna(), f"'{name}' must be a whole number."))
+        elif spec.kind == 'date':
+            dates = pd.to_datetime(values.where(~blank), errors='coerce', format='mixed')
+            problems.append((~blank & dates.isna(), f"'{name}' must be a date."))
+        if spec.choices:
+            problems.append((~blank & ~values.isin(spec.choices), f"'{name}' must be one of {', '.join(spec.choices)}."))
+        for bad, message in problems:
+            reason = reason.mask(bad & (reason == ''), message)
+    return reason
@@ -0,0 +1,273 @@
+# views/search.py (Ranked full-text search over progress notes and session plans)
+import re
+import math
+import time
+import threading
+from functools import lru_cache
+from collections import Counter, defaultdict
+import streamlit as st
+import pandas as pd
+from views import database as db
+from views import templates
+
+# Free-text columns indexed per table
+SEARCH_FIELDS = {
+    'progress': ['notes', 'discipline', 'goal_area'],
+    'session_plans': [
+        'lead_staff', 'support_staff', 'warm_up', 'learning_block', 'regulation_break',
+        'social_play', 'closing_routine', 'materials_needed', 'internal_notes',
+    ],
+}
+
+TABLE_LABELS = {'progress': "Progress Notes", 'session_plans': "Session Plans"}
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he her his in is it its of on or she that the "
+    "their they this to was were will with".split()
+)
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_INDEXES = {} # (data dir, table) -> SearchIndex
+_LOCK = threading.Lock()
+
+
+# --- TEXT PROCESSING ---
+
+@lru_cache(maxsize=100_000)
+def _stem(word):
+    """Strips a few common English endings so 'strategies' finds 'strategy'."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def _expanded(table_name, df):
+    """Session plans made from a template store only their changes; search the full text."""
+    return templates.expand_plans(df) if table_name == 'session_plans' else df
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return [_stem(word) for word in _TOKEN.findall(text.lower()) if word not in STOPWORDS]
+
+
+# --- THE INDEX ---
+
+class SearchIndex:
+    """Inverted index for one table: term -> {row id: term frequency}.
+
+    Kept up to date from the write events of views/database.py: inserts and deletes
+    are applied in place, while an update (rare) or an outside change makes the
+    next search rebuild the table's index.
+    """
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.fields = SEARCH_FIELDS[table_name]
+        self.version = None
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}   # row id -> distinct terms, to remove the row again
+        self.lengths = {}     # row id -> number of terms
+        self.total_length = 0
+        self.dates = {}       # row id -> Timestamp (undated rows are left out)
+        self.children = {}    # row id -> child_name (progress only)
+
+    def add(self, row):
+        doc_id = row.get('id')
+        if doc_id is None or pd.isna(doc_id):
+            return
+        doc_id = int(doc_id)
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+        text = ' '.join(value for value in (row.get(field) for field in self.fields) if isinstance(value, str))
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            self.postings[term][doc_id] = count
+        self.doc_terms[doc_id] = tuple(terms)
+        length = sum(terms.values())
+        self.lengths[doc_id] = length
+        self.total_length += length
+        date = row.get('date')
+        if not isinstance(date, pd.Timestamp):
+            # Rows from the form carry a datetime.date or a string
+            date = pd.to_datetime(date, errors='coerce')
+        if date is not None and not pd.isna(date):
+            self.dates[doc_id] = date
+        if 'child_name' in row:
+            self.children[doc_id] = row['child_name']
+
+    def remove(self, doc_id):
+        doc_id = int(doc_id)
+        for term in self.doc_terms.pop(doc_id, ()):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(doc_id, 0)
+        self.dates.pop(doc_id, None)
+        self.children.pop(doc_id, None)
+
+    def rebuild(self, version):
+        self.__init__(self.table_name)
+        extra = {'progress': ['child_name'], 'session_plans': ['template_id', templates.INHERITED_COLUMN]}.get(self.table_name, [])
+        df = _expanded(self.table_name, db.get_data(self.table_name, columns=['id', 'date'] + extra + self.fields))
+        if 'id' in df.columns:
+            for row in df.to_dict('records'):
+                self.add(row)
+        self.version = version
+
+    def apply(self, event):
+        if self.version != event['before'] or event['op'] == 'update':
+            self.version = None
+            return
+        if event['op'] == 'insert':
+            for row in _expanded(self.table_name, pd.DataFrame(event['rows'])).to_dict('records'):
+                self.add(row)
+        elif event['op'] == 'delete':
+            for doc_id in event['keys']:
+                self.remove(doc_id)
+        self.version = event['after']
+
+    def search(self, terms, child_name=None, start_date=None, end_date=None):
+        """BM25 scores of the rows containing every term, as {row id: score}."""
+        if not terms or not self.lengths:
+            return {}
+        postings = [self.postings.get(term) for term in set(terms)]
+        if not all(postings):
+            return {}
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        if child_name is not None:
+            candidates = {d for d in candidates if self.children.get(d) == child_name}
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            candidates = {d for d in candidates if d in self.dates and self.dates[d] >= start}
+        if end_date is not None:
+            end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            candidates = {d for d in candidates if d in self.dates and self.dates[d] < end}
+
+        count = len(self.lengths)
+        average = self.total_length / count or 1
+        scores = dict.fromkeys(candidates, 0.0)
+        for docs in postings:
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id in candidates:
+                tf = docs[doc_id]
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / average)
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+        return scores
+
+
+def _on_write(event):
+    if event['table'] not in SEARCH_FIELDS:
+        return
+    with _LOCK:
+        index = _INDEXES.get((event['data_dir'], event['table']))
+        if index is not None:
+            index.apply(event)
+
+db.register_write_listener(_on_write)
+
+def get_index(table_name):
+    """Returns the table's index for the current data folder, rebuilding it if stale."""
+    version = db.table_version(table_name)[0]
+    with _LOCK:
+        index = _INDEXES.setdefault((db.get_data_dir(), table_name), SearchIndex(table_name))
+        if index.version != version:
+            index.rebuild(version)
+        return index
+
+
+# --- QUERIES ---
+
+def _snippet(row, fields, terms, width=160):
+    """The first indexed field mentioning a term, trimmed around the first match."""
+    for field in fields:
+        text = row.get(field)
+        if not isinstance(text, str):
+            continue
+        lowered = text.lower()
+        for term in terms:
+            position = lowered.find(term)
+            if position >= 0:
+                start = max(position - width // 3, 0)
+                excerpt = text[start:start + width].replace('\n', ' ')
+                return ('…' if start else '') + excerpt + ('…' if start + width < len(text) else '')
+    return ''
+
+def search(query, tables=tuple(SEARCH_FIELDS), child_name=None, start_date=None, end_date=None, limit=50):
+    """Rows matching every word of `query`, best match first.
+
+    Session plans have no child column, so they are left out when `child_name` is given.
+    Returns a DataFrame with 'table', 'id', 'date', 'child_name', 'score' and 'snippet'.
+    """
+    terms = tokenize(query)
+    hits = []
+    for table_name in tables:
+        if child_name is not None and table_name != 'progress':
+            continue
+        scores = get_index(table_name).search(terms, child_name, start_date, end_date)
+        hits.extend((score, table_name, doc_id) for doc_id, score in scores.items())
+    hits.sort(key=lambda hit: hit[0], reverse=True)
+    hits = hits[:limit]
+
+    results = []
+    for table_name in tables:
+        ids = [doc_id for _score, table, doc_id in hits if table == table_name]
+        if not ids:
+            continue
+        rows = _expanded(table_name, db.query(table_name, filters={'id': ids})).set_index('id', drop=False)
+        # Exact words first, then their stems (for rows matched on another form of a word)
+        words = [word for word in _TOKEN.findall(query.lower()) if word not in STOPWORDS] + terms
+        for score, table, doc_id in hits:
+            if table != table_name or doc_id not in rows.index:
+                continue
+            row = rows.loc[doc_id].to_dict()
+            results.append({
+                'table': TABLE_LABELS[table_name], 'id': doc_id, 'date': row.get('date'),
+                'child_name': row.get('child_name'), 'score': round(score, 3),
+                'snippet': _snippet(row, SEARCH_FIELDS[table_name], words),
+            })
+    columns = ['table', 'id', 'date', 'child_name', 'score', 'snippet']
+    return pd.DataFrame(results, columns=columns).sort_values('score', ascending=False, ignore_index=True)
+
+
+# --- UI ---
+
+def show_search_page():
+    """Search box with child, date and table filters."""
+    query = st.text_input("Search notes and plans", placeholder="e.g. visual schedule transition")
+
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 2])
+    with col1:
+        children = db.get_data('children', columns=['child_name'])
+        names = sorted(children['child_name'].dropna().unique().tolist()) if 'child_name' in children.columns else []
+        child_name = st.selectbox("Child", ['All'] + names, key="search_child")
+    with col2:
+        start_date = st.date_input("From", value=None, key="search_start")
+    with col3:
+        end_date = st.date_input("To", value=None, key="search_end")
+    with col4:
+        tables = st.multiselect("Look In", list(SEARCH_FIELDS), default=list(SEARCH_FIELDS),
+                                format_func=TABLE_LABELS.get, key="search_tables")
+
+    if not query.strip():
+        st.info("Type one or more words; results contain all of them, best matches first.")
+        return
+
+    started = time.perf_counter()
+    results = search(query, tables, None if child_name == 'All' else child_name, start_date, end_date)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f"{len(results)} result(s) in {elapsed_ms:.0f} ms")
+    if results.empty:
+        st.info("No matches.")
+        return
+    st.dataframe(results, hide_index=True, column_config={'snippet': st.column_config.TextColumn(width='large')})
@@ -0,0 +1,1472 @@
+# views/storage.py (Storage backends behind the views/database.py API)
+import os
+import sys
+import json
+import datetime
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from views import perf
+from views import schema
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: writers are still serialized within the process, just not across processes
+    fcntl = None
+
+# --- TABLE DEFINITIONS ---
+# Column names and types come from the schemas in views/schema.py.
+TABLES = {table_name: schema.column_names(table_name) for table_name in schema.SCHEMAS}
+
+# Integer columns other than 'id' (SQLite gives them INTEGER affinity)
+INTEGER_COLUMNS = {
+    column for table_name in schema.SCHEMAS for column in schema.columns_of_kind(table_name, 'int') if column != 'id'
+}
+
+# Tables keyed by something other than a numeric 'id'
+PRIMARY_KEYS = {'users': 'username', 'disciplines': 'name', 'goal_areas': 'name'}
+
+# Secondary indexes created by the SQLite backend
+INDEXES = {
+    'progress': ['child_name', 'date'],
+    'session_plans': ['date'],
+    'children': ['child_name', 'parent_username'],
+}
+
+
+def primary_key(table_name):
+    """Returns the column that identifies a row of the given table."""
+    return PRIMARY_KEYS.get(table_name, 'id')
+
+def has_auto_id(table_name):
+    """True if rows of this table get a generated integer 'id'."""
+    return primary_key(table_name) == 'id'
+
+def coerce_types(df, table_name):
+    """Applies the column types shared by every backend (see views/schema.py)."""
+    return schema.apply(df, table_name)
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+def filter_frame(df, filters=None, start_date=None, end_date=None, date_column='date'):
+    """In-memory version of a query's WHERE clause (equality/IN filters plus a date range)."""
+    mask = pd.Series(True, index=df.index)
+    for column, value in (filters or {}).items():
+        if column not in df.columns:
+            return df.iloc[0:0]
+        mask &= df[column].isin(_as_list(value))
+    if date_column in df.columns:
+        if start_date is not None:
+            mask &= df[date_column] >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= df[date_column] <= pd.Timestamp(end_date)
+    return df[mask]
+
+def search_mask(df, search):
+    """Case-insensitive substring match of `search` against any column of `df`."""
+    mask = pd.Series(False, index=df.index)
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Match each category once, then select the rows holding a matching one
+            categories = values.cat.categories
+            mask |= values.isin(categories[categories.astype(str).str.contains(search, case=False, regex=False)])
+        elif values.dtype == object or pd.api.types.is_string_dtype(values):
+            mask |= values.astype(str).str.contains(search, case=False, regex=False, na=False)
+    return mask
+
+def order_and_limit(df, order_by=None, ascending=True, limit=None):
+    """In-memory version of a query's ORDER BY / LIMIT."""
+    if order_by is not None and order_by in df.columns:
+        df = df.sort_values(by=order_by, ascending=ascending, kind='stable')
+    if limit is not None:
+        df = df.head(limit)
+    return df
+
+def _file_signature(path):
+    """Returns (mtime_ns, size) for a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+_arrow_module = None
+
+def _arrow():
+    """Imports pyarrow on first use; returns None if it is not installed (CSV-only mode)."""
+    global _arrow_module
+    if _arrow_module is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401 (registers the submodule)
+            _arrow_module = pyarrow
+        except ImportError:
+            _arrow_module = False
+    return _arrow_module or None
+
+
+# --- LOCKING ---
+
+class VersionConflict(Exception):
+    """An update expected a table version that is no longer current."""
+
+    def __init__(self, table_name, expected, actual):
+        super().__init__(f"{table_name} is at version {actual}, expected {expected}")
+        self.table_name = table_name
+        self.expected = expected
+        self.actual = actual
+
+def _lock_file(path):
+    """Opens `path` and takes an exclusive advisory lock on it (blocks until granted)."""
+    if path is None or fcntl is None:
+        return None
+    f = open(path, 'a+b')
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    except OSError:
+        f.close()
+        raise
+    return f
+
+def _unlock_file(f):
+    if f is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        f.close()
+
+class TableLock:
+    """Readers-writer lock for one table, plus an advisory lock file for other processes.
+
+    Any number of threads can read at once; a writer waits for them and then has the
+    table to itself (waiting writers go before new readers). The write side is
+    re-entrant, and a thread holding it can also read. The outermost write also takes
+    an flock on `lock_path`, so app processes sharing the data folder take turns too.
+    """
+
+    def __init__(self, lock_path=None):
+        self.lock_path = lock_path
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting_writers = 0
+        self._file = None
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        with self._cond:
+            shared = self._writer != me
+            if shared:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if shared:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+            else:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._writer, self._depth = me, 1
+        try:
+            if self._depth == 1 and self._file is None:
+                self._file = _lock_file(self.lock_path)
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    _unlock_file(self._file)
+                    self._file = None
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+# --- BACKEND INTERFACE ---
+
+class StorageBackend:
+    """The operations views/database.py needs from a store. Rows are plain dicts."""
+
+    name = None
+
+    def __init__(self):
+        # table -> (version, rewrite_version); see data_version()
+        self._versions = {}
+        self._version_lock = threading.Lock()
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock_path(self, table_name):
+        """File to flock while writing a table, or None for in-process locking only."""
+        return None
+
+    def _table_lock(self, table_name):
+        with self._locks_lock:
+            lock = self._locks.get(table_name)
+            if lock is None:
+                lock = self._locks[table_name] = TableLock(self._lock_path(table_name))
+        return lock
+
+    def locked(self, table_name):
+        """Holds the table's write lock, e.g. to read the version before and after a
+        write without another writer slipping in between."""
+        return self._table_lock(table_name).write()
+
+    def _check_version(self, table_name, expected_version):
+        """Raises VersionConflict unless the table is still at `expected_version`."""
+        if expected_version is not None:
+            actual = self.data_version(table_name)[0]
+            if actual != expected_version:
+                raise VersionConflict(table_name, expected_version, actual)
+
+    def _bump_version(self, table_name, append_only):
+        with self._version_lock:
+            version, rewrite_version = self._versions.get(table_name, (0, 0))
+            version += 1
+            self._versions[table_name] = (version, rewrite_version if append_only else version)
+
+    def data_version(self, table_name):
+        """Returns (version, rewrite_version) for a table, as seen by this process.
+
+        `version` changes whenever the table changes. `rewrite_version` only moves when
+        existing rows were updated or deleted (or the table changed outside this process),
+        so `rewrite_version <= v` means everything since version `v` was an insert.
+        """
+        with self._version_lock:
+            return self._versions.get(table_name, (0, 0))
+
+    def read(self, table_name, columns=None):
+        """Returns the table as a DataFrame (only `columns`, if given)."""
+        raise NotImplementedError
+
+    def columns(self, table_name):
+        """Returns the table's column names, or None if the table does not exist yet."""
+        raise NotImplementedError
+
+    def query(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+              order_by=None, ascending=True, limit=None, columns=None):
+        """Returns only the matching rows. Backends override this to push the work down."""
+        df = filter_frame(self.read(table_name), filters, start_date, end_date, date_column)
+        df = order_and_limit(df, order_by, ascending, limit)
+        return df[columns] if columns else df
+
+    def page(self, table_name, offset=0, limit=25, order_by=None, ascending=True,
+             search=None, filters=None, columns=None):
+        """Returns (rows, total) for one page of a sorted, optionally searched table.
+        `search` only looks at the `columns` returned (every column if None)."""
+        df = self.query(table_name, filters=filters)
+        if search:
+            df = df[search_mask(df[columns] if columns else df, search)]
+        df = order_and_limit(df, order_by, ascending)
+        page = df.iloc[offset:offset + limit]
+        return (page[columns] if columns else page), len(df)
+
+    def iter_chunks(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+                    chunk_rows=50_000):
+        """Yields the matching rows, in stored order, at most `chunk_rows` at a time,
+        without building the whole result (for exports)."""
+        df = self.read(table_name)
+        for start in range(0, len(df), chunk_rows):
+            chunk = filter_frame(df.iloc[start:start + chunk_rows], filters, start_date, end_date, date_column)
+            if not chunk.empty:
+                yield chunk
+
+    def insert(self, table_name, row, expected_version=None):
+        """Inserts a row, assigning its 'id' if the table has one. Returns the stored row.
+
+        `expected_version` works as for update.
+        """
+        raise NotImplementedError
+
+    def insert_many(self, table_name, rows):
+        """Inserts a DataFrame of rows in one write, giving them a block of new ids.
+
+        Returns the rows as stored (with their ids).
+        """
+        return pd.DataFrame([self.insert(table_name, row) for row in rows.to_dict('records')])
+
+    def update(self, table_name, key, values, expected_version=None):
+        """Updates the row whose primary key equals `key`. Returns False if not found.
+
+        With `expected_version`, the update only happens if the table is still at that
+        version (see data_version); otherwise VersionConflict is raised.
+        """
+        raise NotImplementedError
+
+    def delete(self, table_name, key):
+        """Deletes the row whose primary key equals `key`. Returns False if not found."""
+        raise NotImplementedError
+
+    def delete_many(self, table_name, keys):
+        """Deletes every row whose primary key is in `keys`. Returns the number deleted."""
+        return sum(1 for key in keys if self.delete(table_name, key))
+
+    def clear_cache(self, table_name=None):
+        """Drops any cached tables."""
+
+    def compact_all(self):
+        """Folds any pending write log into the main store. Returns the tables compacted."""
+        return []
+
+    def export_csv(self):
+        """Makes sure the CSV files in the data folder reflect the store (used before syncing).
+        Returns the tables whose CSV was left as it was."""
+        return []
+
+
+# --- CSV BACKEND ---
+
+def _json_default(value):
+    """Serializes dates and numpy scalars found in rows for the change log."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def _is_missing(value):
+    return value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and pd.isna(value))
+
+
+class CSVBackend(StorageBackend):
+    """One CSV snapshot per table in `data_dir`, plus an append-only change log.
+
+    Inserts, updates and deletes are appended to `<table>.changes.jsonl` as one JSON line
+    each, so a mutation costs O(1) I/O and a crash mid-write can at worst leave a partial
+    last line, which replay ignores. Reads replay the log on top of the CSV snapshot;
+    once the log reaches COMPACT_THRESHOLD entries (or before a GitHub sync) it is folded
+    back into the CSV with a write-then-rename. Every logged operation is idempotent, so
+    replaying a log that was already folded in (crash during compaction) is harmless.
+
+    Streamlit re-runs the whole script on every click, so parsed tables are cached
+    in-process and reused as long as the snapshot and log have the same mtime and size;
+    writes made here refresh the entry directly.
+
+    When pyarrow is installed, each CSV also gets a typed Arrow IPC (Feather v2) copy in
+    `_snapshots/`, regenerated whenever the CSV changes. Loading it is a memory-mapped
+    read with no text parsing or date coercion, and can be limited to a few columns.
+    The CSV stays the format that is synced to GitHub.
+    """
+
+    name = 'csv'
+
+    COMPACT_THRESHOLD = 500
+
+    # Tables that are not cached yet and are larger than this are queried with a
+    # chunked scan instead of being parsed into memory whole.
+    CHUNKED_SCAN_BYTES = 32 * 1024 * 1024
+    CHUNK_ROWS = 50_000
+
+    # The next 'id' for each table comes from a persisted high-water mark rather than
+    # scanning the table for its max. The file is not synced to GitHub, so after a
+    # restart each table's mark is reconciled once against the ids in its CSV.
+    SEQUENCES_FILE = "_sequences.json"
+
+    SNAPSHOT_DIR = "_snapshots"
+
+    def __init__(self, data_dir, tables=None):
+        super().__init__()
+        self.data_dir = data_dir
+        self._version_signatures = {}
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._log_lengths = {}
+        self._sequences = {}
+        self._sequence_lock = threading.Lock()
+        # (table, column) -> (signature, {value: row positions}) for equality filters
+        self._indexes = {}
+        # (table, column, ascending) -> (signature, row positions in sorted order)
+        self._sort_orders = {}
+        if os.path.isdir(data_dir):
+            self.create_tables(tables)
+
+    def _path(self, table_name):
+        return os.path.join(self.data_dir, f"{table_name}.csv")
+
+    def _lock_path(self, table_name):
+        return os.path.join(self.data_dir, f"{table_name}.lock")
+
+    def _log_path(self, table_name):
+        return os.path.join(self.data_dir, f"{table_name}.changes.jsonl")
+
+    def _signature(self, table_name):
+        return (_file_signature(self._path(table_name)), _file_signature(self._log_path(table_name)))
+
+    # Cache entries are (signature, frame, pending rows). Inserts only add their row to
+    # `pending`, so they cost O(1) however large the table is; the next read folds the
+    # rows gathered so far into the frame in one concat.
+
+    def _cached_entry(self, table_name, signature):
+        """The cache entry for `signature` with a private copy of its pending rows, or None."""
+        with self._cache_lock:
+            entry = self._cache.get(table_name)
+            if entry is None or signature[0] is None or entry[0] != signature:
+                return None
+            return entry[0], entry[1], list(entry[2])
+
+    def _cached(self, table_name, signature):
+        entry = self._cached_entry(table_name, signature)
+        if entry is None:
+            return None
+        _signature, df, rows = entry
+        if not rows:
+            return df
+        merged = schema.concat([df, pd.DataFrame(rows, columns=df.columns)], table_name)
+        with self._cache_lock:
+            current = self._cache.get(table_name)
+            # Keep the merge unless the frame was replaced meanwhile; rows inserted
+            # since stay pending on top of it
+            if current is not None and current[1] is df:
+                self._cache[table_name] = (current[0], merged, current[2][len(rows):])
+        return merged
+
+    def _store(self, table_name, signature, df):
+        with self._cache_lock:
+            self._cache[table_name] = (signature, df, [])
+
+    def _append_cached(self, table_name, before, after, row):
+        """Adds an inserted row to the cache entry at `before`, or drops a stale entry."""
+        with self._cache_lock:
+            entry = self._cache.get(table_name)
+            if entry is None or before[0] is None or entry[0] != before:
+                self._cache.pop(table_name, None)
+                return False
+            entry[2].append(dict(row))
+            self._cache[table_name] = (after, entry[1], entry[2])
+        return True
+
+    # --- change log ---
+
+    def _read_log(self, table_name):
+        """Returns the logged operations, skipping a partially written line left by a crash."""
+        ops = []
+        try:
+            with open(self._log_path(table_name), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        self._log_lengths[table_name] = len(ops)
+        return ops
+
+    def _append_log(self, table_name, op):
+        line = (json.dumps(op, default=_json_default) + '\n').encode('utf-8')
+        with open(self._log_path(table_name), 'ab+') as f:
+            # Start on a fresh line if a crash cut the previous entry short
+            end = f.seek(0, os.SEEK_END)
+            if end > 0:
+                f.seek(end - 1)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_lengths[table_name] = self._log_lengths.get(table_name, 0) + 1
+
+    def _replay(self, df, table_name, ops):
+        """Applies logged operations to a snapshot in one pass over the frame."""
+        pk = primary_key(table_name)
+        if not ops or pk not in df.columns:
+            rows = [op['row'] for op in ops if op['op'] == 'insert']
+            return schema.concat([df, pd.DataFrame(rows)], table_name) if rows else df
+
+        inserted = {}   # key -> full row, for rows added by the log
+        updated = {}    # key -> values, for rows already in the snapshot
+        deleted = set()
+        for op in ops:
+            if op['op'] == 'delete' and 'keys' in op:
+                for key in op['keys']:
+                    inserted.pop(key, None)
+                    updated.pop(key, None)
+                    deleted.add(key)
+                continue
+            key = op['row'].get(pk) if op['op'] == 'insert' else op['key']
+            if op['op'] == 'insert':
+                updated.pop(key, None)
+                deleted.add(key)  # replaces any snapshot row with the same key
+                inserted[key] = dict(op['row'])
+            elif op['op'] == 'update':
+                if key in inserted:
+                    inserted[key].update(op['values'])
+                else:
+                    updated.setdefault(key, {}).update(op['values'])
+            elif op['op'] == 'delete':
+                inserted.pop(key, None)
+                updated.pop(key, None)
+                deleted.add(key)
+
+        if deleted:
+            df = df[~df[pk].isin(list(deleted))]
+        if updated:
+            df = df.copy()
+            keys = df[pk].to_numpy()
+            for position in df[pk].isin(list(updated)).to_numpy().nonzero()[0]:
+                for column, value in updated[keys[position]].items():
+                    if column in df.columns:
+                        self._set_cells(df, table_name, [position], column, value)
+        if inserted:
+            df = schema.concat([df, pd.DataFrame(list(inserted.values()))], table_name)
+        return coerce_types(df.reset_index(drop=True), table_name)
+
+    @staticmethod
+    def _set_cells(df, table_name, positions, column, value):
+        """Sets df[column] at the given row positions (or boolean mask), in place."""
+        value = schema.cell_value(table_name, column, value)
+        schema.add_category(df, table_name, column, value)
+        rows = df.index[positions]
+        try:
+            df.loc[rows, column] = value
+        except (TypeError, ValueError):
+            # e.g. text into a column pandas inferred as all-NaN float
+            df[column] = df[column].astype(object)
+            df.loc[rows, column] = value
+
+    # --- binary snapshots ---
+
+    def _snapshot_path(self, table_name):
+        return os.path.join(self.data_dir, self.SNAPSHOT_DIR, f"{table_name}.arrow")
+
+    def _write_snapshot(self, df, table_name, csv_signature):
+        """Writes the Arrow copy of a CSV, tagged with the CSV's (mtime_ns, size)."""
+        pa = _arrow()
+        if pa is None or csv_signature is None:
+            return
+        path = self._snapshot_path(table_name)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b'tilp_csv_signature': json.dumps(list(csv_signature)).encode(),
+            })
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Uncompressed, so memory-mapped reads are zero-copy
+            with pa.OSFile(path + '.tmp', 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(path + '.tmp', path)
+        except (pa.ArrowException, TypeError, ValueError, OSError):
+            # Mixed-type object columns can't always be converted; the CSV still works
+            pass
+
+    def _read_snapshot(self, table_name, csv_signature, columns=None):
+        """Returns the Arrow copy as a DataFrame if it matches the CSV, else None."""
+        pa = _arrow()
+        path = self._snapshot_path(table_name)
+        if pa is None or not os.path.exists(path):
+            return None
+        try:
+            with pa.memory_map(path) as source:
+                reader = pa.ipc.open_file(source)
+                metadata = reader.schema.metadata or {}
+                if json.loads(metadata.get(b'tilp_csv_signature', b'null')) != list(csv_signature):
+                    return None
+                table = reader.read_all()
+                if columns is not None:
+                    table = table.select([c for c in columns if c in table.column_names])
+                return table.to_pandas()
+        except (pa.ArrowException, OSError, ValueError):
+            return None
+
+    def _load_snapshot(self, table_name, columns=None):
+        """Loads the CSV snapshot, from its Arrow copy when that is current."""
+        csv_signature = _file_signature(self._path(table_name))
+        if csv_signature is None:
+            raise FileNotFoundError(self._path(table_name))
+        df = self._read_snapshot(table_name, csv_signature, columns)
+        if df is not None:
+            return coerce_types(df, table_name)
+        df = coerce_types(pd.read_csv(self._path(table_name), dtype=schema.read_csv_dtypes(table_name)), table_name)
+        if csv_signature == _file_signature(self._path(table_name)):
+            self._write_snapshot(df, table_name, csv_signature)
+        return df[[c for c in columns if c in df.columns]] if columns is not None else df
+
+    # --- reads ---
+
+    def _read_signed(self, table_name):
+        """The whole table, with the signature of the files it was read from.
+
+        The signature is None if the files changed while they were being read: nothing
+        built from that frame may then be cached, as it matches neither version.
+        """
+        signature = self._signature(table_name)
+        df = self._cached(table_name, signature)
+        if df is not None:
+            perf.note(cache_hits=1)
+            return df, signature
+        perf.note(cache_misses=1, bytes_read=sum(part[1] for part in signature if part is not None))
+        # Not while a writer is halfway through rewriting the files
+        with self._table_lock(table_name).read():
+            snapshot = self._load_snapshot(table_name)
+            df = self._replay(snapshot, table_name, self._read_log(table_name))
+        # Only cache the result if nothing changed while we were reading
+        if signature[0] is not None and signature == self._signature(table_name):
+            self._store(table_name, signature, df)
+            return df, signature
+        return df, None
+
+    def read(self, table_name, columns=None):
+        if columns is None:
+            return self._read_signed(table_name)[0]
+        signature = self._signature(table_name)
+        df = self._cached(table_name, signature)
+        if df is not None:
+            perf.note(cache_hits=1)
+        else:
+            perf.note(cache_misses=1, bytes_read=sum(part[1] for part in signature if part is not None))
+            # Column subset straight from the memory-mapped snapshot, without caching
+            pk = primary_key(table_name)
+            wanted = list(columns) + ([pk] if pk not in columns else [])
+            snapshot = self._load_snapshot(table_name, wanted)
+            df = self._replay(snapshot, table_name, self._read_log(table_name))
+        return df[[c for c in columns if c in df.columns]]
+
+    def columns(self, table_name):
+        entry = self._cached_entry(table_name, self._signature(table_name))
+        if entry is not None:
+            return entry[1].columns.tolist()
+        try:
+            return pd.read_csv(self._path(table_name), nrows=0).columns.tolist()
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return None
+
+    def create_tables(self, tables=None):
+        """Writes a header-only CSV for each missing table and appends any columns an
+        existing CSV lacks (tables added to TABLES after the data folder was created)."""
+        for table_name, wanted in (tables or TABLES).items():
+            with self.locked(table_name):
+                columns = self.columns(table_name)
+                if columns is None:
+                    self._save(pd.DataFrame(columns=wanted), table_name)
+                    continue
+                missing = [c for c in wanted if c not in columns]
+                if not missing:
+                    continue
+                before = self._signature(table_name)
+                df = self.read(table_name).reindex(columns=columns + missing)
+                self._save(df, table_name)
+                if os.path.exists(self._log_path(table_name)):
+                    os.remove(self._log_path(table_name))
+                self._log_lengths[table_name] = 0
+                self.clear_cache(table_name)
+                self._note_write(table_name, before, self._signature(table_name), append_only=False)
+
+    # --- writes ---
+
+    def _save(self, df, table_name):
+        """Atomically rewrites a table's CSV snapshot (temporarily on the server)."""
+        csv_path = self._path(table_name)
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            # Use index=False to prevent saving the DataFrame row index
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, csv_path)
+        self._write_snapshot(df, table_name, _file_signature(csv_path))
+
+    def compact(self, table_name):
+        """Folds the change log into the CSV snapshot and removes the log."""
+        with self.locked(table_name):
+            if not os.path.exists(self._log_path(table_name)):
+                return False
+            before = self._signature(table_name)
+            df = self.read(table_name)
+            self._save(df, table_name)
+            os.remove(self._log_path(table_name))
+            self._log_lengths[table_name] = 0
+            after = self._signature(table_name)
+            self._store(table_name, after, df)
+            # Same rows, new files: the version stays put
+            with self._version_lock:
+                if self._version_signatures.get(table_name) == before:
+                    self._version_signatures[table_name] = after
+            self._drop_indexes(table_name)
+        return True
+
+    def compact_all(self):
+        """Compacts every table that has pending changes. Returns the tables compacted."""
+        suffix = '.changes.jsonl'
+        tables = [name[:-len(suffix)] for name in sorted(os.listdir(self.data_dir)) if name.endswith(suffix)]
+        return [table_name for table_name in tables if self.compact(table_name)]
+
+    def export_csv(self):
+        # The CSVs are what gets synced, so fold in every pending change first
+        self.compact_all()
+        return []
+
+    def _log_operation(self, table_name, op, apply=None):
+        """Appends an operation to the log and applies it to the cached frame.
+
+        `apply(df)` returns the updated frame; inserts pass none, as their row is queued
+        on the cache entry instead. If the cache was stale it is dropped and the next
+        read replays the log.
+        """
+        before = self._signature(table_name)
+        self._append_log(table_name, op)
+        after = self._signature(table_name)
+        self._note_write(table_name, before, after, append_only=op['op'] == 'insert')
+
+        if apply is None:
+            self._append_cached(table_name, before, after, op['row'])
+        else:
+            entry = self._cached(table_name, before)
+            if entry is not None:
+                self._store(table_name, after, apply(entry))
+            else:
+                with self._cache_lock:
+                    self._cache.pop(table_name, None)
+
+        if self._log_lengths.get(table_name, 0) >= self.COMPACT_THRESHOLD:
+            self.compact(table_name)
+        return before, after
+
+    def _note_write(self, table_name, before, after, append_only):
+        """Advances the table version for one of our own writes."""
+        with self._version_lock:
+            known = self._version_signatures.get(table_name)
+            self._version_signatures[table_name] = after
+        # If the files had changed since we last looked, that change was not ours
+        self._bump_version(table_name, append_only and known == before)
+
+    def data_version(self, table_name):
+        signature = self._signature(table_name)
+        with self._version_lock:
+            known = self._version_signatures.get(table_name)
+            self._version_signatures[table_name] = signature
+        if known is not None and known != signature:
+            # Edited outside this process (e.g. a git pull)
+            self._bump_version(table_name, append_only=False)
+        return super().data_version(table_name)
+
+    def _next_id(self, table_name):
+        """Reserves and returns the next id for a table."""
+        return self._reserve_ids(table_name, 1)
+
+    def _reserve_ids(self, table_name, count):
+        """Reserves `count` consecutive ids for a table and returns the first."""
+        sequences_path = os.path.join(self.data_dir, self.SEQUENCES_FILE)
+        with self._sequence_lock:
+            # Other processes may have reserved ids too, so re-read the marks under the lock
+            lock = _lock_file(sequences_path + '.lock')
+            try:
+                try:
+                    with open(sequences_path) as f:
+                        persisted = json.load(f)
+                except (OSError, ValueError):
+                    persisted = {}
+                if table_name not in self._sequences:
+                    # First use in this process: reconcile the persisted mark with the table
+                    ids = self.read(table_name).get('id', pd.Series(dtype='float64'))
+                    table_max = ids.max() if not ids.empty and pd.notna(ids.max()) else 0
+                    self._sequences[table_name] = int(table_max)
+                for name, mark in persisted.items():
+                    self._sequences[name] = max(self._sequences.get(name, 0), int(mark))
+
+                next_id = self._sequences[table_name] + 1
+                self._sequences[table_name] += count
+
+                # Write-then-rename, so a crash can't leave a truncated file behind
+                tmp_path = sequences_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._sequences, f)
+                os.replace(tmp_path, sequences_path)
+            finally:
+                _unlock_file(lock)
+        return next_id
+
+    def insert(self, table_name, row, expected_version=None):
+        with self.locked(table_name):
+            self._check_version(table_name, expected_version)
+            columns = self.columns(table_name)
+            if columns is None:
+                # First insert into a table with no header yet: the row becomes the snapshot
+                self._save(pd.DataFrame([row]), table_name)
+                self.clear_cache(table_name)
+                self._note_write(table_name, None, self._signature(table_name), append_only=False)
+                return row
+            if has_auto_id(table_name) and 'id' in columns:
+                row['id'] = self._next_id(table_name)
+            row = {column: row[column] for column in columns if column in row}
+
+            before, after = self._log_operation(table_name, {'op': 'insert', 'row': row})
+            self._extend_indexes(table_name, before, after, row)
+        return row
+
+    def insert_many(self, table_name, rows):
+        with self.locked(table_name):
+            columns = self.columns(table_name) or list(rows.columns)
+            rows = rows.reindex(columns=columns)
+            if has_auto_id(table_name) and 'id' in columns:
+                first_id = self._reserve_ids(table_name, len(rows))
+                rows['id'] = range(first_id, first_id + len(rows))
+            rows = coerce_types(rows, table_name)
+
+            # A large block is cheaper as one snapshot rewrite than as thousands of log
+            # lines, so the pending log is folded in at the same time
+            before = self._signature(table_name)
+            df = schema.concat([self.read(table_name), rows], table_name) if self.columns(table_name) else rows
+            self._save(df, table_name)
+            if os.path.exists(self._log_path(table_name)):
+                os.remove(self._log_path(table_name))
+            self._log_lengths[table_name] = 0
+            after = self._signature(table_name)
+            self._store(table_name, after, df)
+            self._note_write(table_name, before, after, append_only=True)
+            self._drop_indexes(table_name)
+        return rows
+
+    def update(self, table_name, key, values, expected_version=None):
+        with self.locked(table_name):
+            self._check_version(table_name, expected_version)
+            df = self.read(table_name)
+            pk = primary_key(table_name)
+            if pk not in df.columns:
+                return False
+            mask = (df[pk] == key).to_numpy()
+            if not mask.any():
+                return False
+            values = {column: value for column, value in values.items() if column in df.columns}
+
+            def apply(df):
+                df = df.copy()
+                for column, value in values.items():
+                    self._set_cells(df, table_name, mask, column, value)
+                return df
+
+            self._log_operation(table_name, {'op': 'update', 'key': key, 'values': values}, apply)
+            self._drop_indexes(table_name)
+        return True
+
+    def delete(self, table_name, key):
+        with self.locked(table_name):
+            df = self.read(table_name)
+            pk = primary_key(table_name)
+            if pk not in df.columns:
+                return False
+            mask = (df[pk] == key).to_numpy()
+            if not mask.any():
+                return False
+            self._log_operation(
+                table_name, {'op': 'delete', 'key': key},
+                lambda df: df[~mask].reset_index(drop=True),
+            )
+            self._drop_indexes(table_name)
+        return True
+
+    def delete_many(self, table_name, keys):
+        with self.locked(table_name):
+            df = self.read(table_name)
+            pk = primary_key(table_name)
+            if pk not in df.columns:
+                return 0
+            mask = df[pk].isin(list(keys)).to_numpy()
+            if not mask.any():
+                return 0
+            # One log entry for the whole batch
+            found = df.loc[mask, pk].drop_duplicates().tolist()
+            self._log_operation(
+                table_name, {'op': 'delete', 'keys': found},
+                lambda df: df[~mask].reset_index(drop=True),
+            )
+            self._drop_indexes(table_name)
+        return int(mask.sum())
+
+    # --- indexes ---
+
+    def _extend_indexes(self, table_name, before, after, row):
+        """The inserted row is the last position; extend current column indexes to match."""
+        with self._cache_lock:
+            entry = self._cache.get(table_name)
+            if entry is None or entry[0] != after:
+                return
+            position = len(entry[1]) + len(entry[2]) - 1
+            for (indexed_table, column), (signature, index) in list(self._indexes.items()):
+                if indexed_table != table_name or signature != before:
+                    continue
+                value = row.get(column)
+                if not _is_missing(value):
+                    index[value] = index.get(value, []) + [position]
+                self._indexes[(table_name, column)] = (after, index)
+
+    def _drop_indexes(self, table_name):
+        with self._cache_lock:
+            for key in [k for k in self._indexes if k[0] == table_name]:
+                del self._indexes[key]
+            for key in [k for k in self._sort_orders if k[0] == table_name]:
+                del self._sort_orders[key]
+
+    def clear_cache(self, table_name=None):
+        with self._cache_lock:
+            if table_name is None:
+                self._cache.clear()
+                self._indexes.clear()
+                self._sort_orders.clear()
+            else:
+                self._cache.pop(table_name, None)
+        if table_name is not None:
+            self._drop_indexes(table_name)
+
+    def _index_positions(self, table_name, df, signature, column, values):
+        """Row positions whose `column` is one of `values`, via a lazily built hash index."""
+        with self._cache_lock:
+            entry = self._indexes.get((table_name, column))
+        if signature is None or entry is None or entry[0] != signature:
+            index = {value: list(positions) for value, positions in df.groupby(column, sort=False, observed=True).indices.items()}
+            if signature is not None:
+                with self._cache_lock:
+                    self._indexes[(table_name, column)] = (signature, index)
+        else:
+            index = entry[1]
+        positions = []
+        for value in values:
+            positions.extend(index.get(value, []))
+        return sorted(positions)
+
+    def query(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+              order_by=None, ascending=True, limit=None, columns=None):
+        signature = self._signature(table_name)
+        df = self._cached(table_name, signature)
+
+        snapshot, log = signature
+        if df is None and log is None and snapshot is not None and snapshot[1] > self.CHUNKED_SCAN_BYTES:
+            return self._scan(table_name, filters, start_date, end_date, date_column,
+                              order_by, ascending, limit, columns)
+        if df is None:
+            df, signature = self._read_signed(table_name)
+
+        # Narrow equality filters through the hash index before touching other columns
+        filters = dict(filters or {})
+        for column in list(filters):
+            if column in df.columns:
+                positions = self._index_positions(table_name, df, signature, column, _as_list(filters.pop(column)))
+                df = df.iloc[positions]
+                break
+
+        df = filter_frame(df, filters, start_date, end_date, date_column)
+        df = order_and_limit(df, order_by, ascending, limit)
+        return df[columns] if columns else df
+
+    def _sort_order(self, table_name, df, signature, column, ascending):
+        """Row positions of the whole table sorted by `column`, cached until it changes."""
+        key = (table_name, column, ascending)
+        with self._cache_lock:
+            entry = self._sort_orders.get(key)
+        if signature is not None and entry is not None and entry[0] == signature:
+            return entry[1]
+        order = df[column].sort_values(ascending=ascending, kind='stable', na_position='last')
+        positions = df.index.get_indexer(order.index)
+        if signature is not None:
+            with self._cache_lock:
+                self._sort_orders[key] = (signature, positions)
+        return positions
+
+    def page(self, table_name, offset=0, limit=25, order_by=None, ascending=True,
+             search=None, filters=None, columns=None):
+        if filters or search or order_by is None:
+            return super().page(table_name, offset, limit, order_by, ascending, search, filters, columns)
+        # Unfiltered browsing: reuse one sort of the cached table for every page
+        df, signature = self._read_signed(table_name)
+        if order_by not in df.columns:
+            return super().page(table_name, offset, limit, None, ascending, search, filters, columns)
+        positions = self._sort_order(table_name, df, signature, order_by, ascending)
+        page = df.iloc[positions[offset:offset + limit]]
+        return (page[columns] if columns else page), len(df)
+
+    def iter_chunks(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+                    chunk_rows=None):
+        chunk_rows = chunk_rows or self.CHUNK_ROWS
+        signature = self._signature(table_name)
+        if self._cached_entry(table_name, signature) is not None or signature[1] is not None:
+            # Already in memory, or pending changes that only a full read applies
+            yield from super().iter_chunks(table_name, filters, start_date, end_date, date_column, chunk_rows)
+            return
+        for chunk in pd.read_csv(self._path(table_name), chunksize=chunk_rows, dtype=schema.read_csv_dtypes(table_name)):
+            chunk = filter_frame(coerce_types(chunk, table_name), filters, start_date, end_date, date_column)
+            if not chunk.empty:
+                yield chunk
+
+    def _scan(self, table_name, filters, start_date, end_date, date_column,
+              order_by, ascending, limit, columns):
+        """Chunked read of a large CSV that keeps only matching rows (and only the top `limit`).
+
+        Only used while the table has no pending change log.
+        """
+        usecols = None
+        if columns:
+            needed = set(columns) | set(filters or {}) | {date_column}
+            if order_by:
+                needed.add(order_by)
+            header = self.columns(table_name) or []
+            usecols = [c for c in header if c in needed]
+
+        kept = []
+        for chunk in pd.read_csv(self._path(table_name), usecols=usecols, chunksize=self.CHUNK_ROWS,
+                                 dtype=schema.read_csv_dtypes(table_name)):
+            chunk = filter_frame(coerce_types(chunk, table_name), filters, start_date, end_date, date_column)
+            if chunk.empty:
+                continue
+            kept.append(chunk)
+            if limit is not None and order_by is None and sum(len(c) for c in kept) >= limit:
+                break
+            if limit is not None and order_by is not None:
+                # Only the best `limit` rows so far can still make the final cut
+                kept = [order_and_limit(schema.concat(kept, table_name), order_by, ascending, limit)]
+
+        df = schema.concat(kept, table_name) if kept else pd.DataFrame(columns=usecols or self.columns(table_name))
+        df = order_and_limit(df, order_by, ascending, limit)
+        return df[columns] if columns else df
+
+
+# --- SQLITE BACKEND ---
+
+def _sql_value(value):
+    """Converts a Python/pandas value into something SQLite can store."""
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat() if value == value.normalize() else value.isoformat()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # numpy scalars
+        return value.item()
+    return value
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class SQLiteBackend(StorageBackend):
+    """All tables in one SQLite file, accessed through SQLAlchemy.
+
+    Tables get real primary keys and indexes on the columns the app filters by, so
+    point updates and deletes touch one row instead of rewriting a whole file. SQLite
+    locks the file itself across processes; the table locks here keep each write and
+    its version bump together within the process.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_path, data_dir, tables=None):
+        from sqlalchemy import create_engine, event
+
+        super().__init__()
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.engine = create_engine(f"sqlite:///{db_path}")
+
+        @event.listens_for(self.engine, "connect")
+        def _set_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers in other sessions continue while a write commits
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        # Tables known to hold this folder's rows (see export_csv)
+        self._loaded = set()
+        self.create_tables(tables)
+        self._import_csvs(tables or TABLES)
+
+    def create_tables(self, tables=None):
+        """Creates any missing tables and indexes. `tables` maps table name -> columns."""
+        from sqlalchemy import text
+
+        tables = tables or TABLES
+        with self.engine.begin() as conn:
+            for table_name, columns in tables.items():
+                pk = primary_key(table_name)
+                column_defs = []
+                for column in columns:
+                    if column == pk and pk == 'id':
+                        column_defs.append(f"{_quote(column)} INTEGER PRIMARY KEY AUTOINCREMENT")
+                    elif column == pk:
+                        column_defs.append(f"{_quote(column)} TEXT PRIMARY KEY")
+                    elif column == 'id' or column in INTEGER_COLUMNS:
+                        column_defs.append(f"{_quote(column)} INTEGER")
+                    else:
+                        column_defs.append(f"{_quote(column)} TEXT")
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {_quote(table_name)} ({', '.join(column_defs)})"
+                ))
+                # Columns added to TABLES after the database was created
+                existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({_quote(table_name)})"))}
+                for column, column_def in zip(columns, column_defs):
+                    if column not in existing:
+                        conn.execute(text(f"ALTER TABLE {_quote(table_name)} ADD COLUMN {column_def}"))
+                for column in INDEXES.get(table_name, []):
+                    if column in columns:
+                        conn.execute(text(
+                            f"CREATE INDEX IF NOT EXISTS {_quote(f'ix_{table_name}_{column}')} "
+                            f"ON {_quote(table_name)} ({_quote(column)})"
+                        ))
+
+    def _csv_path(self, table_name):
+        return os.path.join(self.data_dir, f"{table_name}.csv")
+
+    def _csv_has_rows(self, table_name):
+        try:
+            return not pd.read_csv(self._csv_path(table_name), nrows=1).empty
+        except (OSError, pd.errors.EmptyDataError):
+            return False
+
+    def _row_count(self, table_name):
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {_quote(table_name)}")).scalar()
+
+    def _insert_frame(self, table_name, df):
+        """INSERT OR REPLACE of every row of `df`, keeping its ids."""
+        from sqlalchemy import text
+
+        columns = df.columns.tolist()
+        statement = text(
+            f"INSERT OR REPLACE INTO {_quote(table_name)} "
+            f"({', '.join(_quote(c) for c in columns)}) VALUES ({', '.join(f':{i}' for i in range(len(columns)))})"
+        )
+        params = [
+            {str(i): _sql_value(value) for i, value in enumerate(record)}
+            for record in df.itertuples(index=False, name=None)
+        ]
+        if params:
+            with self.engine.begin() as conn:
+                conn.execute(statement, params)
+
+    def _import_csvs(self, tables):
+        """Fills tables that are empty in the database from their committed CSV files.
+
+        The database file is local (not synced), so a fresh checkout starts with an empty
+        one while data/<table>.csv holds the real rows.
+        """
+        for table_name in tables:
+            if self._row_count(table_name):
+                self._loaded.add(table_name)
+                continue
+            if not self._csv_has_rows(table_name):
+                continue
+            df = pd.read_csv(self._csv_path(table_name), dtype=schema.read_csv_dtypes(table_name))
+            self._insert_frame(table_name, coerce_types(df, table_name))
+            self._loaded.add(table_name)
+
+    def columns(self, table_name):
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(f"PRAGMA table_info({_quote(table_name)})")).fetchall()
+        return [row[1] for row in rows] or None
+
+    def read(self, table_name, columns=None):
+        from sqlalchemy import text
+
+        with self._cache_lock:
+            df = self._cache.get(table_name)
+        if df is not None:
+            perf.note(cache_hits=1)
+            return df if columns is None else df[[c for c in columns if c in df.columns]]
+        if columns is not None:
+            # Just these columns from SQLite, without loading (or caching) the whole table
+            return self.query(table_name, columns=columns)
+        perf.note(cache_misses=1)
+        if self.columns(table_name) is None:
+            raise FileNotFoundError(f"Table '{table_name}' does not exist in {self.db_path}")
+        with self.engine.connect() as conn:
+            df = pd.read_sql_query(text(f"SELECT * FROM {_quote(table_name)}"), conn)
+        df = coerce_types(df, table_name)
+        with self._cache_lock:
+            self._cache[table_name] = df
+        return df
+
+    def _where(self, table_columns, filters=None, start_date=None, end_date=None,
+               date_column='date', search=None, search_columns=None):
+        """Builds a WHERE clause and its parameters; None if a filter column doesn't exist.
+        `search` is matched against `search_columns` (default: all of them)."""
+        clauses, params = [], {}
+        for column, value in (filters or {}).items():
+            if column not in table_columns:
+                return None
+            names = []
+            for value in _as_list(value):
+                names.append(f":p{len(params)}")
+                params[f"p{len(params)}"] = _sql_value(value)
+            clauses.append(f"{_quote(column)} IN ({', '.join(names)})")
+        if date_column in table_columns:
+            # Dates are stored as ISO text, so string comparison orders them correctly
+            if start_date is not None:
+                clauses.append(f"{_quote(date_column)} >= :start_date")
+                params['start_date'] = _sql_value(pd.Timestamp(start_date))
+            if end_date is not None:
+                clauses.append(f"{_quote(date_column)} <= :end_date")
+                params['end_date'] = _sql_value(pd.Timestamp(end_date))
+        if search:
+            # LIKE is case-insensitive for ASCII in SQLite
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params['search'] = f"%{escaped}%"
+            clauses.append("(" + " OR ".join(
+                f"CAST({_quote(c)} AS TEXT) LIKE :search ESCAPE '\\'" for c in (search_columns or table_columns)
+            ) + ")")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+              order_by=None, ascending=True, limit=None, columns=None):
+        from sqlalchemy import text
+
+        table_columns = self.columns(table_name)
+        if table_columns is None:
+            raise FileNotFoundError(f"Table '{table_name}' does not exist in {self.db_path}")
+        if columns:
+            columns = [c for c in columns if c in table_columns]
+
+        where = self._where(table_columns, filters, start_date, end_date, date_column)
+        if where is None:
+            return pd.DataFrame(columns=columns or table_columns)
+        where_sql, params = where
+
+        select = ', '.join(_quote(c) for c in columns) if columns else '*'
+        sql = f"SELECT {select} FROM {_quote(table_name)}{where_sql}"
+        if order_by is not None and order_by in table_columns:
+            sql += f" ORDER BY {_quote(order_by)} {'ASC' if ascending else 'DESC'}"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params['limit'] = int(limit)
+
+        with self.engine.connect() as conn:
+            df = pd.read_sql_query(text(sql), conn, params=params)
+        return coerce_types(df, table_name)
+
+    def page(self, table_name, offset=0, limit=25, order_by=None, ascending=True,
+             search=None, filters=None, columns=None):
+        from sqlalchemy import text
+
+        table_columns = self.columns(table_name)
+        if table_columns is None:
+            raise FileNotFoundError(f"Table '{table_name}' does not exist in {self.db_path}")
+        if columns:
+            columns = [c for c in columns if c in table_columns]
+        where = self._where(table_columns, filters, search=search, search_columns=columns)
+        if where is None:
+            return pd.DataFrame(columns=columns or table_columns), 0
+        where_sql, params = where
+
+        select = ', '.join(_quote(c) for c in columns) if columns else '*'
+        sql = f"SELECT {select} FROM {_quote(table_name)}{where_sql}"
+        if order_by is not None and order_by in table_columns:
+            # The primary key breaks ties so pages don't overlap
+            sql += f" ORDER BY {_quote(order_by)} {'ASC' if ascending else 'DESC'}, {_quote(primary_key(table_name))}"
+        sql += " LIMIT :limit OFFSET :offset"
+
+        with self.engine.connect() as conn:
+            total = conn.execute(text(f"SELECT COUNT(*) FROM {_quote(table_name)}{where_sql}"), params).scalar()
+            df = pd.read_sql_query(text(sql), conn, params={**params, 'limit': int(limit), 'offset': int(offset)})
+        return coerce_types(df, table_name), total
+
+    def iter_chunks(self, table_name, filters=None, start_date=None, end_date=None, date_column='date',
+                    chunk_rows=50_000):
+        from sqlalchemy import text
+
+        table_columns = self.columns(table_name)
+        if table_columns is None:
+            raise FileNotFoundError(f"Table '{table_name}' does not exist in {self.db_path}")
+        where = self._where(table_columns, filters, start_date, end_date, date_column)
+        if where is None:
+            return
+        where_sql, params = where
+        sql = f"SELECT * FROM {_quote(table_name)}{where_sql} ORDER BY {_quote(primary_key(table_name))}"
+        with self.engine.connect() as conn:
+            for chunk in pd.read_sql_query(text(sql), conn, params=params, chunksize=chunk_rows):
+                yield coerce_types(chunk, table_name)
+
+    def insert(self, table_name, row, expected_version=None):
+        from sqlalchemy import text
+
+        columns = self.columns(table_name) or []
+        values = {column: _sql_value(row.get(column)) for column in columns if column in row}
+        placeholders = ', '.join(f":{i}" for i in range(len(values)))
+        statement = text(
+            f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in values)}) "
+            f"VALUES ({placeholders})"
+        )
+        with self.locked(table_name):
+            self._check_version(table_name, expected_version)
+            with self.engine.begin() as conn:
+                result = conn.execute(statement, {str(i): v for i, v in enumerate(values.values())})
+                if has_auto_id(table_name) and 'id' in columns:
+                    row['id'] = result.lastrowid
+            self.clear_cache(table_name)
+            self._bump_version(table_name, append_only=True)
+        return row
+
+    def insert_many(self, table_name, rows):
+        from sqlalchemy import text
+
+        columns = [c for c in (self.columns(table_name) or []) if c in rows.columns or c == 'id']
+        rows = rows.reindex(columns=columns)
+        with self.locked(table_name):
+            with self.engine.begin() as conn:
+                if has_auto_id(table_name) and 'id' in columns:
+                    # Explicit ids in one block, so the rows can be returned with them
+                    last = conn.execute(text(f"SELECT MAX(id) FROM {_quote(table_name)}")).scalar() or 0
+                    rows['id'] = range(int(last) + 1, int(last) + 1 + len(rows))
+                statement = text(
+                    f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in columns)}) "
+                    f"VALUES ({', '.join(f':{i}' for i in range(len(columns)))})"
+                )
+                params = [{str(i): _sql_value(value) for i, value in enumerate(record)}
+                          for record in rows.itertuples(index=False, name=None)]
+                if params:
+                    conn.execute(statement, params)
+            self.clear_cache(table_name)
+            self._bump_version(table_name, append_only=True)
+        return coerce_types(rows, table_name)
+
+    def update(self, table_name, key, values, expected_version=None):
+        from sqlalchemy import text
+
+        columns = self.columns(table_name) or []
+        values = {column: _sql_value(value) for column, value in values.items() if column in columns}
+        if not values:
+            return False
+        assignments = ', '.join(f"{_quote(column)} = :{i}" for i, column in enumerate(values))
+        params = {str(i): value for i, value in enumerate(values.values())}
+        params['key'] = _sql_value(key)
+        statement = text(
+            f"UPDATE {_quote(table_name)} SET {assignments} "
+            f"WHERE {_quote(primary_key(table_name))} = :key"
+        )
+        with self.locked(table_name):
+            self._check_version(table_name, expected_version)
+            with self.engine.begin() as conn:
+                updated = conn.execute(statement, params).rowcount
+            self.clear_cache(table_name)
+            if updated:
+                self._bump_version(table_name, append_only=False)
+        return updated > 0
+
+    def delete(self, table_name, key):
+        from sqlalchemy import text
+
+        statement = text(
+            f"DELETE FROM {_quote(table_name)} WHERE {_quote(primary_key(table_name))} = :key"
+        )
+        with self.locked(table_name):
+            with self.engine.begin() as conn:
+                deleted = conn.execute(statement, {'key': _sql_value(key)}).rowcount
+            self.clear_cache(table_name)
+            if deleted:
+                self._bump_version(table_name, append_only=False)
+        return deleted > 0
+
+    def delete_many(self, table_name, keys):
+        from sqlalchemy import text
+
+        keys = [_sql_value(key) for key in keys]
+        deleted = 0
+        with self.locked(table_name):
+            with self.engine.begin() as conn:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    batch = keys[start:start + 500]
+                    names = ', '.join(f":k{i}" for i in range(len(batch)))
+                    statement = text(
+                        f"DELETE FROM {_quote(table_name)} WHERE {_quote(primary_key(table_name))} IN ({names})"
+                    )
+                    deleted += conn.execute(statement, {f"k{i}": key for i, key in enumerate(batch)}).rowcount
+            self.clear_cache(table_name)
+            if deleted:
+                self._bump_version(table_name, append_only=False)
+        return deleted
+
+    def clear_cache(self, table_name=None):
+        with self._cache_lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(table_name, None)
+
+    def export_csv(self):
+        """Writes every table back to data/<table>.csv, the format synced to GitHub.
+
+        An empty table never replaces a CSV that has rows unless this backend loaded the
+        table (an empty database would otherwise wipe the committed data). Returns the
+        names of the tables skipped for that reason.
+        """
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            names = [row[0] for row in conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            ))]
+        skipped = []
+        for table_name in names:
+            df = self.read(table_name)
+            if df.empty and table_name not in self._loaded and self._csv_has_rows(table_name):
+                skipped.append(table_name)
+                continue
+            if not df.empty:
+                self._loaded.add(table_name)
+            df.to_csv(self._csv_path(table_name), index=False)
+        return skipped
+
+
+# --- MIGRATION ---
+
+def migrate_csv_to_sqlite(data_dir, db_path):
+    """One-shot copy of every data/*.csv table into a SQLite database, keeping ids.
+
+    Returns a dict of table name -> rows copied. Existing rows with the same primary
+    key are replaced, so running it twice is harmless.
+    """
+    backend = SQLiteBackend(db_path, data_dir)
+    copied = {}
+    for file_name in sorted(os.listdir(data_dir)):
+        if not file_name.endswith('.csv'):
+            continue
+        table_name = file_name[:-len('.csv')]
+        try:
+            df = pd.read_csv(os.path.join(data_dir, file_name))
+        except pd.errors.EmptyDataError:
+            continue
+        backend.create_tables({table_name: df.columns.tolist()})
+        if not df.empty:
+            backend._insert_frame(table_name, coerce_types(df, table_name))
+        copied[table_name] = len(df)
+    backend.engine.dispose()
+    return copied
+
+
+if __name__ == '__main__':
+    # Usage: python -m views.storage migrate [data_dir] [db_path]
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        print("Usage: python -m views.storage migrate [data_dir] [db_path]")
+        sys.exit(1)
+    source_dir = sys.argv[2] if len(sys.argv) > 2 else "data"
+    target_db = sys.argv[3] if len(sys.argv) > 3 else os.path.join(source_dir, "tilp.db")
+    for name, count in migrate_csv_to_sqlite(source_dir, target_db).items():
+        print(f"{name}: {count} rows")
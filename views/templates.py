@@ -0,0 +1,226 @@
+# views/templates.py (Reusable session-plan templates and activity blocks)
+import threading
+import streamlit as st
+import pandas as pd
+from views import database as db
+from views import storage
+
+# Plan fields that can come from an activity block
+COMPONENTS = ['warm_up', 'learning_block', 'regulation_break', 'social_play', 'closing_routine']
+COMPONENT_LABELS = {
+    'warm_up': "Warm-up Activity",
+    'learning_block': "Learning Block/Main Activity",
+    'regulation_break': "Regulation Break Activity",
+    'social_play': "Social Play/Integration",
+    'closing_routine': "Closing Routine",
+}
+# Template fields: one activity block per component, plus the materials list
+TEMPLATE_FIELDS = COMPONENTS + ['materials_needed']
+# session_plans column listing the fields a plan takes from its template (comma-separated)
+INHERITED_COLUMN = 'inherited_fields'
+
+_LIBRARIES = {} # data dir -> TemplateLibrary
+_EXPANDED = {}  # data dir -> (table versions, session_plans with template text filled in)
+_LOCK = threading.Lock()
+
+
+def _block_column(component):
+    return f"{component}_block"
+
+def _inherited(value):
+    return set(value.split(',')) if isinstance(value, str) and value else set()
+
+def _key(value):
+    """Normalizes an id read from CSV (int, float or blank) to an int or None."""
+    if value is None or value is pd.NA or (isinstance(value, float) and pd.isna(value)) or value == '':
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# --- THE LIBRARY ---
+
+class TemplateLibrary:
+    """Activity blocks and templates, resolved to text, for one data folder.
+
+    Both tables are append-only: a block's text never changes and "editing" a template
+    saves a new one that points back from the old one's 'replaced_by'. Plans keep the
+    template id they were made from, so an edit never rewrites past plans.
+    """
+
+    def __init__(self):
+        self.versions = None
+        self.blocks = {}         # block id -> text
+        self.block_ids = {}      # (component, text) -> block id, to store each text once
+        self.templates = {}      # template id -> {field: text}
+        self.names = {}          # template id -> name
+        self.current = []        # ids of templates not replaced by a newer version
+
+    def rebuild(self, versions):
+        self.__init__()
+        blocks = db.get_data('activity_blocks')
+        for row in blocks.to_dict('records'):
+            block_id = _key(row.get('id'))
+            if block_id is None:
+                continue
+            text = row['text'] if isinstance(row.get('text'), str) else ''
+            self.blocks[block_id] = text
+            self.block_ids.setdefault((row.get('component'), text), block_id)
+
+        templates = db.get_data('plan_templates')
+        for row in templates.to_dict('records'):
+            template_id = _key(row.get('id'))
+            if template_id is None:
+                continue
+            fields = {c: self.blocks.get(_key(row.get(_block_column(c))), '') for c in COMPONENTS}
+            fields['materials_needed'] = row['materials_needed'] if isinstance(row.get('materials_needed'), str) else ''
+            self.templates[template_id] = fields
+            self.names[template_id] = row.get('name') or f"Template {template_id}"
+            if _key(row.get('replaced_by')) is None:
+                self.current.append(template_id)
+        self.current.sort(key=lambda t: str(self.names[t]).lower())
+        self.versions = versions
+
+
+def get_library():
+    """Returns the library for the current data folder, rebuilt when either table changes."""
+    versions = (db.table_version('activity_blocks')[0], db.table_version('plan_templates')[0])
+    with _LOCK:
+        library = _LIBRARIES.setdefault(db.get_data_dir(), TemplateLibrary())
+        if library.versions != versions:
+            library.rebuild(versions)
+        return library
+
+def template_fields(template_id):
+    """{field: text} of a template, or None if there is no such template."""
+    return get_library().templates.get(_key(template_id))
+
+
+# --- SAVING ---
+
+def _block_for(component, text):
+    """Id of the block holding `text`, adding one if this text is new. None for blank text."""
+    if not text:
+        return None
+    existing = get_library().block_ids.get((component, text))
+    if existing is not None:
+        return existing
+    row = db.add_data('activity_blocks', {'component': component, 'name': text.split('\n')[0][:60], 'text': text})
+    return row['id'] if row else None
+
+def save_template(name, fields, replaces=None, expected_version=None):
+    """Saves a template from {field: text}. Returns the new template's id, or None.
+
+    With `replaces`, the new template takes the place of an existing one in the picker;
+    plans made from the old template still show the old text. `expected_version` is
+    the plan_templates version the edit was based on: if the templates changed since,
+    nothing is saved and the user is asked to reload.
+    """
+    row = {'name': name, 'materials_needed': fields.get('materials_needed') or None}
+    for component in COMPONENTS:
+        row[_block_column(component)] = _block_for(component, fields.get(component))
+    # The new template and the link from the one it replaces are one edit
+    with db.locked('plan_templates'):
+        stored = db.add_data('plan_templates', row, expected_version=expected_version)
+        if not stored:
+            return None
+        if replaces is not None:
+            version = db.table_version('plan_templates')[0]
+            if not db.update_data('plan_templates', replaces, {'replaced_by': stored['id']}, expected_version=version):
+                return None
+    return stored['id']
+
+def compact_plan(plan, template_id):
+    """The plan as stored: fields that match the template are left blank and named in
+    'inherited_fields'. Any other blank field was cleared on purpose and stays blank.
+    """
+    fields = template_fields(template_id) if template_id is not None else None
+    if fields is None:
+        return {**plan, 'template_id': None, INHERITED_COLUMN: None}
+    stored = dict(plan, template_id=_key(template_id))
+    inherited = [field for field in TEMPLATE_FIELDS if fields[field] and stored.get(field) == fields[field]]
+    for field in inherited:
+        stored[field] = None
+    stored[INHERITED_COLUMN] = ','.join(inherited) or None
+    return stored
+
+def expand_plans(df):
+    """Fills the inherited fields of session_plans rows in from their templates."""
+    if 'template_id' not in df.columns or INHERITED_COLUMN not in df.columns or df[INHERITED_COLUMN].isna().all():
+        return df
+    library = get_library()
+    template_ids = df['template_id'].map(_key)
+    inherited = df[INHERITED_COLUMN].map(_inherited)
+    df = df.copy()
+    for field in TEMPLATE_FIELDS:
+        if field not in df.columns:
+            continue
+        takes = inherited.map(lambda fields: field in fields).astype(bool)
+        if not takes.any():
+            continue
+        text = template_ids[takes].map(lambda t: library.templates.get(t, {}).get(field))
+        df[field] = df[field].astype(object).mask(takes, text)
+    return df
+
+def expanded_plans():
+    """Every session plan with its template text filled in, cached until plans or
+    templates change."""
+    versions = tuple(db.table_version(t)[0] for t in ('session_plans', 'activity_blocks', 'plan_templates'))
+    data_dir = db.get_data_dir()
+    with _LOCK:
+        entry = _EXPANDED.get(data_dir)
+    if entry is not None and entry[0] == versions:
+        return entry[1]
+    df = expand_plans(db.get_data('session_plans'))
+    with _LOCK:
+        _EXPANDED[data_dir] = (versions, df)
+    return df
+
+def query_plans_page(table_name, offset=0, limit=25, order_by=None, ascending=True,
+                     search=None, filters=None, columns=None):
+    """db.query_page for session_plans: search and sort see the full plan text, template
+    fields included, rather than the blanks stored for them."""
+    df = storage.filter_frame(expanded_plans(), filters)
+    if search:
+        df = df[storage.search_mask(df[columns] if columns else df, search)]
+    df = storage.order_and_limit(df, order_by, ascending)
+    page = df.iloc[offset:offset + limit]
+    return (page[columns] if columns else page), len(df)
+
+
+# --- UI ---
+
+def template_picker(key):
+    """Selectbox of the current templates. Returns the chosen id, or None."""
+    library = get_library()
+    return st.selectbox("Start From Template", [None] + library.current, key=key,
+                        format_func=lambda t: "(blank plan)" if t is None else library.names[t])
+
+def show_template_library():
+    """Form to create a template, or a new version of an existing one."""
+    library = get_library()
+    base = st.selectbox("Base On", [None] + library.current, key="template_base",
+                        format_func=lambda t: "(new template)" if t is None else library.names[t])
+    fields = library.templates.get(base, {})
+    # The version the form was shown at, i.e. the one a submitted edit was based on
+    version_key = f"template_form_{base}_version"
+    expected_version = st.session_state.get(version_key)
+    st.session_state[version_key] = db.table_version('plan_templates')[0]
+    with st.form(f"template_form_{base}", clear_on_submit=True):
+        name = st.text_input("Template Name", value=library.names.get(base, ""))
+        values = {c: st.text_area(COMPONENT_LABELS[c], value=fields.get(c, "")) for c in COMPONENTS}
+        values['materials_needed'] = st.text_input("Materials Needed (Comma separated)", value=fields.get('materials_needed', ""))
+        replace = st.checkbox("Replace the base template in the list", value=base is not None, disabled=base is None)
+        submitted = st.form_submit_button("Save Template")
+
+    if submitted:
+        if not name.strip():
+            st.error("A template needs a name.")
+        elif save_template(name.strip(), values, replaces=base if replace else None,
+                           expected_version=expected_version) is not None:
+            st.session_state[version_key] = db.table_version('plan_templates')[0]
+            st.success(f"Template '{name.strip()}' saved.")
+        else:
+            st.error("Failed to save template.")
@@ -2,6 +2,9 @@
 import streamlit as st
 import pandas as pd
 from views import database as db # Required to save/load data
+from views.components import paginated_table
+from views import bulk
+from views import media
 
 def show_progress_tracking():
     """
@@ -11,7 +14,12 @@ def show_progress_tracking():
     # 1. Load list data from the database
     disciplines_df = db.get_list_data('disciplines')
     goal_areas_df = db.get_list_data('goal_areas')
-    children_df = db.get_data('children')
+    # Parents only ever get their own children's names and rows
+    scope = db.current_scope()
+    if scope is None:
+        children_df = db.get_data('children', columns=['child_name'])
+    else:
+        children_df = pd.DataFrame({'child_name': list(scope)})
 
     discipline_list = disciplines_df['name'].unique().tolist() if not disciplines_df.empty and 'name' in disciplines_df.columns else []
     goal_area_list = goal_areas_df['name'].unique().tolist() if not goal_areas_df.empty and 'name' in goal_areas_df.columns else []
@@ -34,8 +42,10 @@ def show_progress_tracking():
             
         notes = st.text_area("Progress Notes")
         
-        # NOTE: Media path handling is simplified for now as file storage on Streamlit is complex
-        media_path = st.text_input("Media Path/Link (Optional)")
+        # Uploaded files go to the content-addressed store (views/media.py), not the CSVs
+        uploads = st.file_uploader("Photos / Videos (Optional)", accept_multiple_files=True,
+                                   type=[ext.lstrip('.') for ext in media.IMAGE_EXTENSIONS + media.VIDEO_EXTENSIONS])
+        media_path = st.text_input("Media Link (Optional)")
         
         submitted = st.form_submit_button("Save Progress Note")
 
@@ -49,18 +59,26 @@ def show_progress_tracking():
                 'notes': notes, 
                 'media_path': media_path
             }
-            if db.add_data('progress', new_note):
+            saved = db.add_data('progress', new_note)
+            if saved:
+                for upload in uploads or []:
+                    media.attach(saved['id'], upload, upload.name)
                 st.success("Progress Note saved successfully! Remember to click 'Save Data to GitHub Permanently' in the sidebar.")
             else:
                 st.error("Failed to save progress note.")
 
+    # Historical notes can be loaded from a spreadsheet instead of one form at a time
+    if scope is None:
+        bulk.show_bulk_tools('progress')
+
     # 3. Display Existing Notes
     st.markdown("---")
     st.markdown("### Recent Progress Entries")
     
-    progress_df = db.get_data('progress')
-    
-    if not progress_df.empty:
-        st.dataframe(progress_df.sort_values(by='date', ascending=False))
+    if scope is None:
+        paginated_table('progress', key="progress_table", default_sort='date', ascending=False)
+    elif scope:
+        paginated_table('progress', key="progress_table", filters={'child_name': list(scope)},
+                        default_sort='date', ascending=False)
     else:
-        st.info("No progress entries found.")
+        st.info("No children are linked to your account yet.")